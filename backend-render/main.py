@@ -15,7 +15,7 @@ from urllib.parse import urlencode, parse_qs, urlparse
 from pydantic import BaseModel
 from sqlalchemy import text
 
-from typing import Optional, AsyncGenerator
+from typing import Callable, Optional, AsyncGenerator
 from aiocache import cached
 import aiohttp
 import anyio.to_thread
@@ -49,9 +49,9 @@ from starlette.responses import Response, StreamingResponse
 from starlette.datastructures import Headers
 
 # Import OpenWebUI modules
-from utils import logger
-from utils.audit import AuditLevel, AuditLoggingMiddleware
-from utils.logger import start_logger
+from open_webui.utils import logger
+from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
+from open_webui.utils.logger import start_logger
 # Simple socket functionality for chat events
 from simple_socket import socket_app, emit_chat_event, get_connected_clients
 from routers import (
@@ -226,7 +226,7 @@ AIOHTTP_CLIENT_SESSION_SSL = os.getenv("AIOHTTP_CLIENT_SESSION_SSL", "false").lo
 # Import custom middleware
 # AccessControlMiddleware not available in this version
 # from utils.access_control import AccessControlMiddleware
-from utils.audit import AuditLoggingMiddleware
+from open_webui.utils.audit import AuditLoggingMiddleware
 
 # Import SPA static files handler
 # SPAStaticFiles not available in this version
@@ -236,6 +236,10 @@ from utils.audit import AuditLoggingMiddleware
 from open_webui.env import (
     DATA_DIR,
     STATIC_DIR,
+    NON_STREAMING_RESPONSE_CHUNK_SIZE,
+    NON_STREAMING_RESPONSE_PACING_BUDGET_MS,
+    CHAT_RESPONSE_STREAM_FLUSH_INTERVAL_MS,
+    CHAT_RESPONSE_STREAM_FLUSH_MAX_BYTES,
 )
 
 # Add missing cache directory
@@ -243,7 +247,39 @@ CACHE_DIR = DATA_DIR / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # Import logger
-from utils.logger import logger as log
+from open_webui.utils.logger import logger as log
+
+from open_webui.utils.chat_save import chat_save_buffer
+from open_webui.utils.sse import SSEEvent, SSEParser, aiter_sse_events, is_side_channel_frame
+from open_webui.utils.stream_flush import StreamDeltaFlusher
+from open_webui.utils.http_client import http_client_pool, get_origin
+from open_webui.utils.shared_state import shared_state
+from open_webui.utils.response_cache import response_cache, get_completion_content, iter_sse_replay
+from open_webui.utils.chunked_response import aiter_content_chunks
+from open_webui.utils.admission import admission_controller, estimate_tokens
+from open_webui.utils.model_catalog import model_catalog
+from open_webui.utils.activity import activity_tracker
+from open_webui.utils.auth import decode_token, extract_token_from_auth_header
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Apply config changes and cache invalidations made by other workers
+    shared_state.start()
+    # Write users' last active times in bulk
+    activity_tracker.start()
+    
+    yield
+
+    # uvicorn only gets here once in-flight requests and streams have drained
+    # (or GRACEFUL_SHUTDOWN_TIMEOUT expired)
+    await shared_state.stop()
+
+    # Persist any buffered realtime chat saves and activity before exiting
+    chat_save_buffer.flush_all()
+    await activity_tracker.stop()
+    await http_client_pool.close()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -252,6 +288,7 @@ app = FastAPI(
     version="0.6.24",  # Hardcoded for now
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Initialize app state configuration
@@ -453,9 +490,24 @@ class AppConfig:
         self.MAX_TOKENS_PER_REQUEST = int(os.getenv("MAX_TOKENS_PER_REQUEST", "4000"))
         self.DEFAULT_TEMPERATURE = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
         self.DEFAULT_MAX_TOKENS = int(os.getenv("DEFAULT_MAX_TOKENS", "1000"))
+        
+        object.__setattr__(self, "_initialized", True)
+    
+    def __setattr__(self, key, value):
+        super().__setattr__(key, value)
+        # Share runtime changes (e.g. admin settings) with the other workers;
+        # private attributes are per-process state, never config
+        if self.__dict__.get("_initialized") and not key.startswith("_"):
+            shared_state.publish_config(key, value)
+            model_catalog.invalidate()
 
 # Initialize app state
 app.state.config = AppConfig()
+shared_state.attach_config(app.state.config)
+
+# Model lists are built from the connection config; rebuild them after another
+# worker changed it
+shared_state.register_invalidator("config", lambda: setattr(app.state, "BASE_MODELS", None))
 
 # Add CORS middleware for frontend communication - Configured from environment
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:6969,http://127.0.0.1:6969").split(",")
@@ -565,160 +617,67 @@ async def get_app_changelog():
     # Simplified version for testing
     return {"changelog": "Local development version"}
 
-# Simple models endpoints to fix the 404 issue
-@app.get("/api/models")
-async def get_models_simple(request: Request):
-    """Simple models endpoint for compatibility - Frontend expects res.data"""
+# Configured models per provider: (enabled flag, models list, provider, owned_by, label)
+CONFIGURED_MODEL_PROVIDERS = [
+    ("ENABLE_OPENAI_API", "OPENAI_MODELS", "openai", "openai", "OpenAI"),
+    ("ENABLE_OPENROUTER_API", "OPENROUTER_MODELS", "openrouter", "openrouter", "OpenRouter"),
+    # Atlas Cloud models are owned by "openai" for frontend compatibility
+    ("ENABLE_ATLAS_CLOUD_API", "ATLAS_CLOUD_MODELS", "atlascloud", "openai", "Atlas Cloud"),
+    ("ENABLE_ANTHROPIC_API", "ANTHROPIC_MODELS", "anthropic", "anthropic", "Anthropic"),
+    ("ENABLE_GOOGLE_API", "GOOGLE_MODELS", "google", "google", "Google"),
+    ("ENABLE_MISTRAL_API", "MISTRAL_MODELS", "mistral", "mistral", "Mistral"),
+    ("ENABLE_PERPLEXITY_API", "PERPLEXITY_MODELS", "perplexity", "perplexity", "Perplexity"),
+]
+
+def get_configured_model_name(provider: str, model_id: str) -> str:
+    if provider in ("openai", "openrouter"):
+        return model_id.split("/")[-1].replace("-", " ").title()
+    return model_id.replace("-", " ").title()
+
+def has_configured_model_vision(provider: str, model_id: str) -> bool:
+    if provider == "openai":
+        return "gpt-4o" in model_id or "vision" in model_id.lower()
+    if provider == "anthropic":
+        return "opus" in model_id or "sonnet" in model_id
+    if provider == "google":
+        return "vision" in model_id.lower()
+    return False
+
+def build_configured_models(config) -> list:
+    """Models of the enabled providers, built once per config version"""
     models = []
-    
-    # Add OpenAI models if enabled
-    if request.app.state.config.ENABLE_OPENAI_API:
-        for model_id in request.app.state.config.OPENAI_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.split("/")[-1].replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "openai",
-                "provider": "openai",
-                "info": {
-                    "meta": {
-                        "description": f"OpenAI {model_id} Model",
-                        "capabilities": {
-                            "vision": "gpt-4o" in model_id or "vision" in model_id.lower(),
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add OpenRouter models if enabled
-    if request.app.state.config.ENABLE_OPENROUTER_API:
-        for model_id in request.app.state.config.OPENROUTER_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.split("/")[-1].replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "openrouter",
-                "provider": "openrouter",
-                "info": {
-                    "meta": {
-                        "description": f"OpenRouter {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Atlas Cloud models if enabled
-    if request.app.state.config.ENABLE_ATLAS_CLOUD_API:
-        for model_id in request.app.state.config.ATLAS_CLOUD_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "openai",
-                "provider": "atlascloud",
-                "info": {
-                    "meta": {
-                        "description": f"Atlas Cloud {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Anthropic models if enabled
-    if request.app.state.config.ENABLE_ANTHROPIC_API:
-        for model_id in request.app.state.config.ANTHROPIC_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "anthropic",
-                "provider": "anthropic",
-                "info": {
-                    "meta": {
-                        "description": f"Anthropic {model_id} Model",
-                        "capabilities": {
-                            "vision": "opus" in model_id or "sonnet" in model_id,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Google models if enabled
-    if request.app.state.config.ENABLE_GOOGLE_API:
-        for model_id in request.app.state.config.GOOGLE_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "google",
-                "provider": "google",
-                "info": {
-                    "meta": {
-                        "description": f"Google {model_id} Model",
-                        "capabilities": {
-                            "vision": "vision" in model_id.lower(),
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Mistral models if enabled
-    if request.app.state.config.ENABLE_MISTRAL_API:
-        for model_id in request.app.state.config.MISTRAL_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "mistral",
-                "provider": "mistral",
-                "info": {
-                    "meta": {
-                        "description": f"Mistral {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Perplexity models if enabled
-    if request.app.state.config.ENABLE_PERPLEXITY_API:
-        for model_id in request.app.state.config.PERPLEXITY_MODELS:
+    for enabled, model_ids, provider, owned_by, label in CONFIGURED_MODEL_PROVIDERS:
+        if not getattr(config, enabled):
+            continue
+        
+        for model_id in getattr(config, model_ids):
             models.append({
                 "id": model_id,
-                "name": model_id.replace("-", " ").title(),
+                "name": get_configured_model_name(provider, model_id),
                 "object": "model",
                 "created": 1677610602,
-                "owned_by": "perplexity",
-                "provider": "perplexity",
+                "owned_by": owned_by,
+                "provider": provider,
                 "info": {
                     "meta": {
-                        "description": f"Perplexity {model_id} Model",
+                        "description": f"{label} {model_id} Model",
                         "capabilities": {
-                            "vision": False,
+                            "vision": has_configured_model_vision(provider, model_id),
                             "usage": "text-generation"
                         }
                     }
                 }
             })
     
-    return {"data": models}
+    return models
+
+# Simple models endpoints to fix the 404 issue
+@app.get("/api/models")
+async def get_models_simple(request: Request):
+    """Simple models endpoint for compatibility - Frontend expects res.data"""
+    models = await model_catalog.get("configured", lambda: build_configured_models(request.app.state.config))
+    view = model_catalog.get_view("configured", "data", lambda: {"data": models})
+    return model_catalog.get_response(request, view)
 
 @app.get("/api/v1/models")
 async def get_models_redirect():
@@ -729,159 +688,24 @@ async def get_models_redirect():
 @app.get("/api/v1/models/")
 async def get_models_v1(request: Request, user = Depends(lambda: None)):
     """Models endpoint - returns configured models"""
-    models = []
-    
-    # Add OpenAI models if enabled
-    if request.app.state.config.ENABLE_OPENAI_API:
-        for model_id in request.app.state.config.OPENAI_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.split("/")[-1].replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "openai",
-                "provider": "openai",
-                "info": {
-                    "meta": {
-                        "description": f"OpenAI {model_id} Model",
-                        "capabilities": {
-                            "vision": "gpt-4o" in model_id or "vision" in model_id.lower(),
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add OpenRouter models if enabled
-    if request.app.state.config.ENABLE_OPENROUTER_API:
-        for model_id in request.app.state.config.OPENROUTER_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.split("/")[-1].replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "openrouter",
-                "provider": "openrouter",
-                "info": {
-                    "meta": {
-                        "description": f"OpenRouter {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Atlas Cloud models if enabled
-    if request.app.state.config.ENABLE_ATLAS_CLOUD_API:
-        for model_id in request.app.state.config.ATLAS_CLOUD_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "openai",  # Changed from "atlascloud" to "openai" for frontend compatibility
-                "provider": "atlascloud",
-                "info": {
-                    "meta": {
-                        "description": f"Atlas Cloud {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Anthropic models if enabled
-    if request.app.state.config.ENABLE_ANTHROPIC_API:
-        for model_id in request.app.state.config.ANTHROPIC_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "anthropic",
-                "provider": "anthropic",
-                "info": {
-                    "meta": {
-                        "description": f"Anthropic {model_id} Model",
-                        "capabilities": {
-                            "vision": "opus" in model_id or "sonnet" in model_id,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Google models if enabled
-    if request.app.state.config.ENABLE_GOOGLE_API:
-        for model_id in request.app.state.config.GOOGLE_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "google",
-                "provider": "google",
-                "info": {
-                    "meta": {
-                        "description": f"Google {model_id} Model",
-                        "capabilities": {
-                            "vision": "vision" in model_id.lower(),
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Mistral models if enabled
-    if request.app.state.config.ENABLE_MISTRAL_API:
-        for model_id in request.app.state.config.MISTRAL_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "mistral",
-                "provider": "mistral",
-                "info": {
-                    "meta": {
-                        "description": f"Mistral {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    # Add Perplexity models if enabled
-    if request.app.state.config.ENABLE_PERPLEXITY_API:
-        for model_id in request.app.state.config.PERPLEXITY_MODELS:
-            models.append({
-                "id": model_id,
-                "name": model_id.replace("-", " ").title(),
-                "object": "model",
-                "created": 1677610602,
-                "owned_by": "perplexity",
-                "provider": "perplexity",
-                "info": {
-                    "meta": {
-                        "description": f"Perplexity {model_id} Model",
-                        "capabilities": {
-                            "vision": False,
-                            "usage": "text-generation"
-                        }
-                    }
-                }
-            })
-    
-    return models
+    models = await model_catalog.get("configured", lambda: build_configured_models(request.app.state.config))
+    view = model_catalog.get_view("configured", "list", lambda: models)
+    return model_catalog.get_response(request, view)
 
 # Admin promotion endpoint removed - admin account created successfully
 
+def get_request_user_id(request: Request) -> Optional[str]:
+    """Resolve the user id from the request's bearer token or token cookie"""
+    token = None
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        token = extract_token_from_auth_header(auth_header)
+    elif request.cookies.get("token"):
+        token = request.cookies.get("token")
+    
+    data = decode_token(token) if token else None
+    return data.get("id") if data else None
+
 # Chat completions endpoint - Frontend expects this
 @app.post("/api/chat/completions")
 async def chat_completions(request: Request):
@@ -894,6 +718,9 @@ async def chat_completions(request: Request):
         chat_id = body.get("chat_id", "default")
         message_id = body.get("id", "default")
         
+        # Chat events are only emitted to the sessions of the requesting user
+        user_id = get_request_user_id(request)
+        
         # Check if model is supported and get provider info
         if model.startswith("atlascloud/") or "atlas" in model.lower() or model.startswith("openai/gpt-oss"):
             provider = "atlascloud"
@@ -972,10 +799,49 @@ async def chat_completions(request: Request):
         else:
             raise HTTPException(status_code=400, detail="Unsupported provider")
         
+        # Deterministic (temperature 0) completions are served from the response
+        # cache when it is enabled for the model
+        cache_key = response_cache.get_key(payload)
+        cached = await response_cache.get(cache_key) if cache_key else None
+        
+        if cached is not None and stream:
+            return StreamingResponse(
+                replay_cached_completion(cached, chat_id, message_id, user_id),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Headers": "*"
+                }
+            )
+        elif cached is not None:
+            result = {**cached, "task_id": f"task_{int(time.time())}"}
+            
+            try:
+                from simple_socket import emit_chat_event
+                await emit_chat_event("chat-events", {
+                    "chat_id": chat_id,
+                    "message_id": message_id,
+                    "data": {
+                        "type": "chat:completion",
+                        "data": {
+                            "done": True,
+                            "content": get_completion_content(cached),
+                            "choices": cached.get("choices", []),
+                            "model": model
+                        }
+                    }
+                }, user_id=user_id)
+            except Exception as e:
+                pass
+            
+            return result
+        
         if stream:
             # Return streaming response
             return StreamingResponse(
-                stream_chat_completion(endpoint, payload, headers, provider, chat_id, message_id),
+                stream_chat_completion(endpoint, payload, headers, provider, chat_id, message_id, user_id, cache_key),
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
@@ -986,235 +852,320 @@ async def chat_completions(request: Request):
             )
         else:
             # Return non-streaming response
-            async with aiohttp.ClientSession() as session:
-                async with session.post(endpoint, json=payload, headers=headers) as response:
+            session = http_client_pool.get_session(endpoint)
+            admission = admission_controller.admit(get_origin(endpoint), tokens=estimate_tokens(payload), chat_id=chat_id, user_id=user_id)
+            async with admission, session.post(endpoint, json=payload, headers=headers) as response:
                     
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise HTTPException(status_code=response.status, detail=error_text)
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise HTTPException(status_code=response.status, detail=error_text)
                     
-                    result = await response.json()
+                result = await response.json()
                     
-                    # Format response for OpenWebUI
-                    if provider == "atlascloud":
-                        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                        reasoning_content = result.get("choices", [{}])[0].get("message", {}).get("reasoning_content", "")
-                    elif provider == "openai":
-                        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                        reasoning_content = result.get("choices", [{}])[0].get("message", {}).get("reasoning_content", "")
-                    elif provider == "anthropic":
-                        content = result.get("content", [{}])[0].get("text", "")
-                        reasoning_content = result.get("reasoning_content", "")
-                    else:
-                        content = ""
-                        reasoning_content = ""
+                # Format response for OpenWebUI
+                if provider == "atlascloud":
+                    content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                    reasoning_content = result.get("choices", [{}])[0].get("message", {}).get("reasoning_content", "")
+                elif provider == "openai":
+                    content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                    reasoning_content = result.get("choices", [{}])[0].get("message", {}).get("reasoning_content", "")
+                elif provider == "anthropic":
+                    content = result.get("content", [{}])[0].get("text", "")
+                    reasoning_content = result.get("reasoning_content", "")
+                else:
+                    content = ""
+                    reasoning_content = ""
                     
-                    # Format content for OpenWebUI reasoning display
-                    formatted_content = ""
-                    if reasoning_content:
-                        formatted_content += f'<details type="reasoning" done="true" duration="3"><summary>🤔 Thinking Process</summary><div class="reasoning-content">{reasoning_content}</div></details>\n\n'
+                # Format content for OpenWebUI reasoning display
+                formatted_content = ""
+                if reasoning_content:
+                    formatted_content += f'<details type="reasoning" done="true" duration="3"><summary>🤔 Thinking Process</summary><div class="reasoning-content">{reasoning_content}</div></details>\n\n'
                     
-                    formatted_content += content
+                formatted_content += content
                     
-                    # Update the result with formatted content
-                    if provider == "atlascloud" or provider == "openai":
-                        if result.get("choices"):
-                            result["choices"][0]["message"]["content"] = formatted_content
-                    elif provider == "anthropic":
-                        if result.get("content"):
-                            result["content"][0]["text"] = formatted_content
+                # Update the result with formatted content
+                if provider == "atlascloud" or provider == "openai":
+                    if result.get("choices"):
+                        result["choices"][0]["message"]["content"] = formatted_content
+                elif provider == "anthropic":
+                    if result.get("content"):
+                        result["content"][0]["text"] = formatted_content
+                    
+                if cache_key:
+                    await response_cache.set(cache_key, result)
                     
-                    # Add task_id for frontend compatibility
-                    result["task_id"] = f"task_{int(time.time())}"
+                # Add task_id for frontend compatibility
+                result["task_id"] = f"task_{int(time.time())}"
                     
-                    # Emit WebSocket event for real-time updates
-                    try:
-                        from simple_socket import emit_chat_event
-                        await emit_chat_event("chat-events", {
-                            "chat_id": chat_id,
-                            "message_id": message_id,
+                # Emit WebSocket event for real-time updates
+                try:
+                    from simple_socket import emit_chat_event
+                    await emit_chat_event("chat-events", {
+                        "chat_id": chat_id,
+                        "message_id": message_id,
+                        "data": {
+                            "type": "chat:completion",
                             "data": {
-                                "type": "chat:completion",
-                                "data": {
-                                    "done": True,
-                                    "content": formatted_content,
-                                    "choices": result.get("choices", []),
-                                    "model": model
-                                }
+                                "done": True,
+                                "content": formatted_content,
+                                "choices": result.get("choices", []),
+                                "model": model
                             }
-                        })
-                    except Exception as e:
-                        pass
+                        }
+                    }, user_id=user_id)
+                except Exception as e:
+                    pass
                     
-                    return result
+                return result
                     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def stream_chat_completion(endpoint: str, payload: dict, headers: dict, provider: str, chat_id: str, message_id: str) -> AsyncGenerator[str, None]:
-    """Stream chat completion responses word by word"""
+async def replay_cached_completion(result: dict, chat_id: str, message_id: str, user_id: Optional[str] = None) -> AsyncGenerator[str, None]:
+    """Replay a cached completion as an SSE stream"""
+    yield f"data: {json.dumps({'status': 'started'})}\n\n"
+    
+    for frame in iter_sse_replay(result, NON_STREAMING_RESPONSE_CHUNK_SIZE):
+        yield frame
+    
+    # Send completion event
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(endpoint, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    yield f"data: {json.dumps({'error': {'message': error_text}})}\n\n"
-                    return
+        from simple_socket import emit_chat_event
+        await emit_chat_event("chat-events", {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "data": {
+                "type": "chat:completion",
+                "data": {
+                    "done": True,
+                    "choices": [{"message": {"content": get_completion_content(result)}}]
+                }
+            }
+        }, user_id=user_id)
+    except Exception as e:
+        pass
+
+def get_socket_delta_flusher(chat_id: str, message_id: str, user_id: Optional[str], get_content: Callable[[], str]) -> StreamDeltaFlusher:
+    """Mirror a stream's content to the user's sockets in batches instead of per token"""
+    from simple_socket import get_stream_emitter
+    stream_emit = get_stream_emitter(chat_id, message_id, user_id)
+
+    async def emit(_):
+        await stream_emit({"type": "chat:completion", "data": {"content": get_content()}})
+
+    return StreamDeltaFlusher(
+        emit,
+        max_chunks=0,
+        max_latency_ms=CHAT_RESPONSE_STREAM_FLUSH_INTERVAL_MS,
+        max_bytes=CHAT_RESPONSE_STREAM_FLUSH_MAX_BYTES,
+        stream_id=f"{chat_id}:{message_id}",
+    )
+
+async def stream_chat_completion(endpoint: str, payload: dict, headers: dict, provider: str, chat_id: str, message_id: str, user_id: Optional[str] = None, cache_key: Optional[str] = None) -> AsyncGenerator[str, None]:
+    """Stream chat completion responses, relaying complete responses in chunks"""
+    try:
+        session = http_client_pool.get_session(endpoint)
+        admission = admission_controller.admit(get_origin(endpoint), tokens=estimate_tokens(payload), chat_id=chat_id, user_id=user_id)
+        async with admission, session.post(endpoint, json=payload, headers=headers) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                yield f"data: {json.dumps({'error': {'message': error_text}})}\n\n"
+                return
                 
-                # Send initial status
-                yield f"data: {json.dumps({'status': 'started'})}\n\n"
+            # Send initial status
+            yield f"data: {json.dumps({'status': 'started'})}\n\n"
                 
-                # Process streaming response
-                if provider == "atlascloud":
-                    # Atlas Cloud doesn't support streaming, so we'll simulate it
-                    try:
-                        # Check if the response is actually streaming or a complete response
-                        content_type = response.headers.get('Content-Type', '')
+            # Process streaming response
+            if provider == "atlascloud":
+                # Atlas Cloud doesn't support streaming, so we'll simulate it
+                try:
+                    # Check if the response is actually streaming or a complete response
+                    content_type = response.headers.get('Content-Type', '')
                         
-                        if 'text/event-stream' not in content_type:
-                            # This is a complete response, not streaming
+                    if 'text/event-stream' not in content_type:
+                        # This is a complete response, not streaming
                             
-                            # Get the full response
-                            result = await response.json()
-                            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                            reasoning_content = result.get("choices", [{}])[0].get("message", {}).get("reasoning_content", "")
+                        # Get the full response
+                        result = await response.json()
+                        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                        reasoning_content = result.get("choices", [{}])[0].get("message", {}).get("reasoning_content", "")
                             
-                            # Format content for OpenWebUI reasoning display
-                            formatted_content = ""
-                            if reasoning_content:
-                                formatted_content += f'<details type="reasoning" done="true" duration="3"><summary>🤔 Thinking Process</summary><div class="reasoning-content">{reasoning_content}</div></details>\n\n'
+                        # Format content for OpenWebUI reasoning display
+                        formatted_content = ""
+                        if reasoning_content:
+                            formatted_content += f'<details type="reasoning" done="true" duration="3"><summary>🤔 Thinking Process</summary><div class="reasoning-content">{reasoning_content}</div></details>\n\n'
                             
-                            formatted_content += content
+                        formatted_content += content
                             
-                            # Simulate streaming by sending content word by word
-                            words = formatted_content.split()
-                            for i, word in enumerate(words):
-                                # Add space after each word except the last one
-                                word_with_space = word + (" " if i < len(words) - 1 else "")
-                                
-                                # Emit WebSocket event for real-time updates
-                                try:
-                                    from simple_socket import emit_chat_event
-                                    await emit_chat_event("chat-events", {
-                                        "chat_id": chat_id,
-                                        "message_id": message_id,
-                                        "data": {
-                                            "type": "chat:message:delta",
-                                            "data": {"content": word_with_space}
-                                        }
-                                    })
-                                except Exception as e:
-                                    pass
-                                
-                                # Send streaming data
-                                streaming_data = {
-                                    "choices": [{
-                                        "delta": {"content": word_with_space},
-                                        "index": 0
-                                    }]
-                                }
-                                yield f"data: {json.dumps(streaming_data)}\n\n"
-                                
-                                # Small delay to simulate real streaming
-                                await asyncio.sleep(0.05)
+                        if cache_key and result.get("choices"):
+                            result["choices"][0].setdefault("message", {})["content"] = formatted_content
+                            await response_cache.set(cache_key, result)
                             
-                            # Send completion event
+                        # Relay the complete answer in a few large chunks (optionally paced
+                        # within a fixed time budget) instead of word by word
+                        async for chunk in aiter_content_chunks(
+                            formatted_content,
+                            NON_STREAMING_RESPONSE_CHUNK_SIZE,
+                            NON_STREAMING_RESPONSE_PACING_BUDGET_MS,
+                        ):
+                            # Emit WebSocket event for real-time updates
                             try:
                                 from simple_socket import emit_chat_event
                                 await emit_chat_event("chat-events", {
                                     "chat_id": chat_id,
                                     "message_id": message_id,
                                     "data": {
-                                        "type": "chat:completion",
-                                        "data": {
-                                            "done": True,
-                                            "choices": [{"message": {"content": formatted_content}}]
-                                        }
+                                        "type": "chat:message:delta",
+                                        "data": {"content": chunk}
                                     }
-                                })
+                                }, user_id=user_id)
                             except Exception as e:
                                 pass
-                            
-                            yield f"data: [DONE]\n\n"
-                        else:
-                            # This is actually streaming (unlikely for Atlas Cloud)
-                            async for line in response.content:
-                                line_str = line.decode('utf-8').strip()
-                                if line_str.startswith('data: '):
-                                    if line_str == 'data: [DONE]':
-                                        yield f"data: [DONE]\n\n"
-                                        break
-                                    else:
-                                        yield f"data: {line_str[6:]}\n\n"
-                        
-                    except Exception as e:
-                        pass
-                
-                elif provider == "openai":
-                    async for line in response.content:
-                        line_str = line.decode('utf-8').strip()
-                        if line_str.startswith('data: '):
-                            if line_str == 'data: [DONE]':
-                                # Send completion event
-                                try:
-                                    from simple_socket import emit_chat_event
-                                    await emit_chat_event("chat-events", {
-                                        "chat_id": chat_id,
-                                        "message_id": message_id,
-                                        "data": {
-                                            "type": "chat:completion",
-                                            "data": {
-                                                "done": True,
-                                                "choices": [{"message": {"content": ""}}]
-                                            }
-                                        }
-                                    })
-                                except Exception as e:
-                                    pass
                                 
+                            # Send streaming data
+                            streaming_data = {
+                                "choices": [{
+                                    "delta": {"content": chunk},
+                                    "index": 0
+                                }]
+                            }
+                            yield f"data: {json.dumps(streaming_data)}\n\n"
+                            
+                        # Send completion event
+                        try:
+                            from simple_socket import emit_chat_event
+                            await emit_chat_event("chat-events", {
+                                "chat_id": chat_id,
+                                "message_id": message_id,
+                                "data": {
+                                    "type": "chat:completion",
+                                    "data": {
+                                        "done": True,
+                                        "choices": [{"message": {"content": formatted_content}}]
+                                    }
+                                }
+                            }, user_id=user_id)
+                        except Exception as e:
+                            pass
+                            
+                        yield f"data: [DONE]\n\n"
+                    else:
+                        # This is actually streaming (unlikely for Atlas Cloud)
+                        async for event in aiter_sse_events(response.content.iter_any()):
+                            if event.data is None:
+                                continue
+                            if event.is_done:
                                 yield f"data: [DONE]\n\n"
                                 break
                             else:
-                                # Parse and forward the streaming data
-                                try:
-                                    data = json.loads(line_str[6:])  # Remove 'data: ' prefix
-                                    if data.get("choices") and data["choices"][0].get("delta", {}).get("content"):
-                                        content = data["choices"][0]["delta"]["content"]
-                                        
-                                        # Emit WebSocket event for real-time updates
-                                        try:
-                                            from simple_socket import emit_chat_event
-                                            await emit_chat_event("chat-events", {
-                                                "chat_id": chat_id,
-                                                "message_id": message_id,
-                                                "data": {
-                                                    "type": "chat:message:delta",
-                                                    "data": {"content": content}
-                                                }
-                                            })
-                                        except Exception as e:
-                                            pass
-                                        
-                                        yield f"data: {json.dumps(data)}\n\n"
-                                except json.JSONDecodeError:
-                                    continue
-                        else:
-                            yield f"data: {json.dumps({'raw': line_str})}\n\n"
+                                yield f"data: {event.data.decode('utf-8')}\n\n"
+                        
+                except Exception as e:
+                    pass
                 
-                elif provider == "anthropic":
-                    # Handle Anthropic streaming (different format)
-                    async for line in response.content:
-                        line_str = line.decode('utf-8').strip()
-                        if line_str.startswith('data: '):
-                            if line_str == 'data: [DONE]':
+            elif provider == "openai":
+                # Pass upstream frames through unchanged, but whole: clients parse
+                # each chunk line by line and can't join an event split across
+                # chunks. Only side-channel frames ([DONE], usage, errors) are
+                # parsed here; content frames are decoded for the socket mirror
+                # in batches, once per flush.
+                from simple_socket import get_stream_emitter
+                from open_webui.socket.main import STREAM_POOL
+                parser = SSEParser()
+                usage = None
+                error = None
+                content = ""
+                content_frames = []
+
+                def get_content():
+                    nonlocal content
+                    for frame in content_frames:
+                        try:
+                            choices = SSEEvent.from_frame(frame).json().get("choices") or [{}]
+                            content += (choices[0].get("delta") or {}).get("content") or ""
+                        except (ValueError, AttributeError):
+                            continue
+                    content_frames.clear()
+                    return content
+
+                async def aiter_frames():
+                    async for chunk in response.content.iter_any():
+                        for frame in parser.feed_frames(chunk):
+                            yield frame
+                    for frame in parser.flush_frames():
+                        yield frame
+
+                delta_flusher = get_socket_delta_flusher(chat_id, message_id, user_id, get_content)
+                stream_completed = False
+                try:
+                    async for frame in aiter_frames():
+                        yield frame + b"\n\n"
+
+                        if not is_side_channel_frame(frame):
+                            content_frames.append(frame)
+                            await delta_flusher.push(frame, len(frame))
+                            continue
+
+                        event = SSEEvent.from_frame(frame)
+                        if event.data is None:
+                            continue
+                        if event.is_done:
+                            break
+                        try:
+                            data = event.json()
+                        except ValueError:
+                            continue
+                        if not isinstance(data, dict):
+                            continue
+
+                        if data.get("usage"):
+                            usage = data["usage"]
+                        if data.get("error"):
+                            error = data["error"]
+                            log.warning(f"Upstream stream error for chat {chat_id}: {error}")
+                        if data.get("choices"):
+                            # The usage chunk may carry content too
+                            content_frames.append(frame)
+                    stream_completed = True
+                finally:
+                    # A cancelled or failed stream emits nothing more
+                    await delta_flusher.close(flush=stream_completed)
+                    if not stream_completed:
+                        await STREAM_POOL.pop(f"{chat_id}:{message_id}")
+
+                # Send completion event
+                try:
+                    await get_stream_emitter(chat_id, message_id, user_id)({
+                        "type": "chat:completion",
+                        "data": {
+                            "done": True,
+                            "content": get_content(),
+                            "choices": [{"message": {"content": ""}}],
+                            **({"usage": usage} if usage else {}),
+                            **({"error": error} if error else {}),
+                        }
+                    })
+                except Exception as e:
+                    pass
+                
+            elif provider == "anthropic":
+                # Handle Anthropic streaming (different format)
+                from open_webui.socket.main import STREAM_POOL
+                content = ""
+                delta_flusher = get_socket_delta_flusher(chat_id, message_id, user_id, lambda: content)
+                stream_completed = False
+                try:
+                    async for event in aiter_sse_events(response.content.iter_any()):
+                        if event.data is not None:
+                            if event.is_done:
                                 yield f"data: [DONE]\n\n"
                                 break
                             else:
                                 try:
-                                    data = json.loads(line_str[6:])
+                                    data = event.json()
                                     if data.get("type") == "content_block_delta" and data.get("delta", {}).get("text"):
                                         text = data["delta"]["text"]
-                                        
+                                            
                                         # Convert to OpenAI format for compatibility
                                         openai_format = {
                                             "choices": [{
@@ -1222,26 +1173,20 @@ async def stream_chat_completion(endpoint: str, payload: dict, headers: dict, pr
                                                 "index": 0
                                             }]
                                         }
-                                        
-                                        # Emit WebSocket event
-                                        try:
-                                            from simple_socket import emit_chat_event
-                                            await emit_chat_event("chat-events", {
-                                                "chat_id": chat_id,
-                                                "message_id": message_id,
-                                                "data": {
-                                                    "type": "chat:message:delta",
-                                                    "data": {"content": text}
-                                                }
-                                            })
-                                        except Exception as e:
-                                            pass
-                                        
+                                            
+                                        # Mirrored to the sockets in batches
+                                        content += text
+                                        await delta_flusher.push(text, len(text))
+                                            
                                         yield f"data: {json.dumps(openai_format)}\n\n"
-                                except json.JSONDecodeError:
+                                except ValueError:
                                     continue
-                        else:
-                            yield f"data: {json.dumps({'raw': line_str})}\n\n"
+                    stream_completed = True
+                finally:
+                    await delta_flusher.close(flush=stream_completed)
+                    # Anthropic streams have no done event here, nothing resyncs
+                    # once they end
+                    await STREAM_POOL.pop(f"{chat_id}:{message_id}")
                 
     except Exception as e:
         yield f"data: {json.dumps({'error': {'message': str(e)}})}\n\n"
@@ -1333,7 +1278,7 @@ async def update_config_models(request: Request):
 async def verify_openai_connection(request: Request):
     """Verify OpenAI API connection"""
     try:
-        from utils.auth import get_admin_user
+        from open_webui.utils.auth import get_admin_user
         from fastapi import Depends
         from pydantic import BaseModel
         
@@ -0,0 +1,64 @@
+"""Add group_member table
+
+Revision ID: 9d1a6c3e4f27
+Revises: 3af16a1c9fb6
+Create Date: 2025-09-02 10:14:51.402318
+
+"""
+
+import json
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "9d1a6c3e4f27"
+down_revision: Union[str, None] = "3af16a1c9fb6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    group_member = op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+    )
+    op.create_index(
+        "group_member_user_id_group_id_idx", "group_member", ["user_id", "group_id"]
+    )
+
+    # Backfill memberships from group.user_ids
+    group = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    created_at = int(time.time())
+
+    rows = []
+    for group_id, user_ids in conn.execute(sa.select(group.c.id, group.c.user_ids)):
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids)
+        if not user_ids:
+            continue
+
+        for user_id in dict.fromkeys(user_ids):
+            rows.append(
+                {"group_id": group_id, "user_id": user_id, "created_at": created_at}
+            )
+
+    if rows:
+        op.bulk_insert(group_member, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("group_member_user_id_group_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,51 @@
+"""Add user api_key_hash
+
+Revision ID: b3e57a0d91c4
+Revises: 9d1a6c3e4f27
+Create Date: 2025-09-04 16:42:09.118724
+
+"""
+
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e57a0d91c4"
+down_revision: Union[str, None] = "9d1a6c3e4f27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("user", sa.Column("api_key_hash", sa.String(), nullable=True))
+
+    # Backfill hashes of the existing keys
+    user = table(
+        "user",
+        column("id", sa.String()),
+        column("api_key", sa.String()),
+        column("api_key_hash", sa.String()),
+    )
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(user.c.id, user.c.api_key).where(user.c.api_key.isnot(None))
+    ).fetchall()
+
+    for user_id, api_key in rows:
+        conn.execute(
+            sa.update(user)
+            .where(user.c.id == user_id)
+            .values(api_key_hash=hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+        )
+
+    op.create_index("api_key_hash_idx", "user", ["api_key_hash"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("api_key_hash_idx", table_name="user")
+    op.drop_column("user", "api_key_hash")
@@ -4,7 +4,7 @@ import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_by_access
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
@@ -94,15 +94,13 @@ class ChannelTable:
             return [ChannelModel.model_validate(channel) for channel in channels]
 
     def get_channels_by_user_id(
-        self, user_id: str, permission: str = "read"
+        self,
+        user_id: str,
+        permission: str = "read",
+        user_group_ids: Optional[set[str]] = None,
     ) -> list[ChannelModel]:
         channels = self.get_channels()
-        return [
-            channel
-            for channel in channels
-            if channel.user_id == user_id
-            or has_access(user_id, permission, channel.access_control)
-        ]
+        return filter_by_access(user_id, permission, channels, user_group_ids)
 
     def get_channel_by_id(self, id: str) -> Optional[ChannelModel]:
         with get_db() as db:
@@ -252,6 +252,20 @@ class ChatTable:
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
+    def _upsert_message(self, chat: dict, message_id: str, message: dict) -> dict:
+        """Merge `message` into the chat's history and make it the current one."""
+        # Sanitize message content for null characters before upserting
+        if isinstance(message.get("content"), str):
+            message["content"] = message["content"].replace("\x00", "")
+
+        history = chat.get("history", {})
+        messages = history.setdefault("messages", {})
+        messages[message_id] = {**messages.get(message_id, {}), **message}
+        history["currentId"] = message_id
+
+        chat["history"] = history
+        return chat
+
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
     ) -> Optional[ChatModel]:
@@ -259,24 +273,27 @@ class ChatTable:
         if chat is None:
             return None
 
-        # Sanitize message content for null characters before upserting
-        if isinstance(message.get("content"), str):
-            message["content"] = message["content"].replace("\x00", "")
+        chat = self._upsert_message(chat.chat, message_id, message)
+        return self.update_chat_by_id(id, chat)
 
-        chat = chat.chat
-        history = chat.get("history", {})
+    def update_chat_title_and_message_by_id(
+        self,
+        id: str,
+        title: Optional[str] = None,
+        message_id: Optional[str] = None,
+        message: Optional[dict] = None,
+    ) -> Optional[ChatModel]:
+        chat = self.get_chat_by_id(id)
+        if chat is None:
+            return None
 
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+        chat = chat.chat
+        if title is not None:
+            chat["title"] = title
 
-        history["currentId"] = message_id
+        if message_id and message:
+            chat = self._upsert_message(chat, message_id, message)
 
-        chat["history"] = history
         return self.update_chat_by_id(id, chat)
 
     def add_message_status_to_chat_by_id_and_message_id(
@@ -11,8 +11,14 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
-
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Text,
+    JSON,
+    Index,
+    PrimaryKeyConstraint,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -41,6 +47,27 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    """
+    Group membership, one row per (group, user). `Group.user_ids` is still
+    written alongside it for readers of the JSON column, but membership
+    lookups go through this table.
+    """
+
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        # WHERE group_id = ... (AND user_id = ...)
+        PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+        # WHERE user_id = ... ; covers the group ids of a user
+        Index("group_member_user_id_group_id_idx", "user_id", "group_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -92,6 +119,31 @@ class GroupUpdateForm(GroupForm, UserIdsForm):
 
 
 class GroupTable:
+    def _set_group_member_ids(self, db, id: str, user_ids: list[str]):
+        """Make the group_member rows of group `id` match `user_ids`."""
+        user_ids = set(user_ids)
+        existing_user_ids = {
+            member.user_id
+            for member in db.query(GroupMember.user_id).filter_by(group_id=id).all()
+        }
+
+        removed_user_ids = existing_user_ids - user_ids
+        if removed_user_ids:
+            db.query(GroupMember).filter(
+                GroupMember.group_id == id,
+                GroupMember.user_id.in_(removed_user_ids),
+            ).delete(synchronize_session=False)
+
+        added_user_ids = user_ids - existing_user_ids
+        if added_user_ids:
+            created_at = int(time.time())
+            db.add_all(
+                [
+                    GroupMember(group_id=id, user_id=user_id, created_at=created_at)
+                    for user_id in added_user_ids
+                ]
+            )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -109,6 +161,8 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                if group.user_ids:
+                    self._set_group_member_ids(db, group.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -131,16 +185,21 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> list[str]:
+        with get_db() as db:
+            return [
+                member.group_id
+                for member in db.query(GroupMember.group_id)
+                .filter_by(user_id=user_id)
+                .all()
+            ]
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -149,12 +208,21 @@ class GroupTable:
         except Exception:
             return None
 
-    def get_group_user_ids_by_id(self, id: str) -> Optional[str]:
-        group = self.get_group_by_id(id)
-        if group:
-            return group.user_ids
-        else:
-            return None
+    def get_group_user_ids_by_id(self, id: str) -> list[str]:
+        return self.get_user_ids_by_group_ids([id])
+
+    def get_user_ids_by_group_ids(self, group_ids: list[str]) -> list[str]:
+        if not group_ids:
+            return []
+
+        with get_db() as db:
+            return [
+                member.user_id
+                for member in db.query(GroupMember.user_id)
+                .filter(GroupMember.group_id.in_(group_ids))
+                .distinct()
+                .all()
+            ]
 
     def update_group_by_id(
         self, id: str, form_data: GroupUpdateForm, overwrite: bool = False
@@ -167,6 +235,8 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_member_ids(db, id, form_data.user_ids)
                 db.commit()
                 return self.get_group_by_id(id=id)
         except Exception as e:
@@ -176,6 +246,7 @@ class GroupTable:
     def delete_group_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
                 return True
@@ -185,6 +256,7 @@ class GroupTable:
     def delete_all_groups(self) -> bool:
         with get_db() as db:
             try:
+                db.query(GroupMember).delete()
                 db.query(Group).delete()
                 db.commit()
 
@@ -198,14 +270,15 @@ class GroupTable:
                 groups = self.get_groups_by_member_id(user_id)
 
                 for group in groups:
-                    group.user_ids.remove(user_id)
                     db.query(Group).filter_by(id=group.id).update(
                         {
-                            "user_ids": group.user_ids,
+                            "user_ids": [i for i in group.user_ids if i != user_id],
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
 
                 return True
             except Exception:
@@ -251,27 +324,41 @@ class GroupTable:
 
                 # Remove user from groups not in the new list
                 existing_groups = self.get_groups_by_member_id(user_id)
+                existing_group_ids = {group.id for group in existing_groups}
 
+                removed_group_ids = []
                 for group in existing_groups:
                     if group.id not in group_ids:
-                        group.user_ids.remove(user_id)
                         db.query(Group).filter_by(id=group.id).update(
                             {
-                                "user_ids": group.user_ids,
+                                "user_ids": [i for i in group.user_ids if i != user_id],
                                 "updated_at": int(time.time()),
                             }
                         )
+                        removed_group_ids.append(group.id)
+
+                if removed_group_ids:
+                    db.query(GroupMember).filter(
+                        GroupMember.user_id == user_id,
+                        GroupMember.group_id.in_(removed_group_ids),
+                    ).delete(synchronize_session=False)
 
                 # Add user to new groups
                 for group in groups:
-                    if user_id not in group.user_ids:
-                        group.user_ids.append(user_id)
+                    if group.id not in existing_group_ids:
                         db.query(Group).filter_by(id=group.id).update(
                             {
-                                "user_ids": group.user_ids,
+                                "user_ids": [*(group.user_ids or []), user_id],
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.add(
+                            GroupMember(
+                                group_id=group.id,
+                                user_id=user_id,
+                                created_at=int(time.time()),
+                            )
+                        )
 
                 db.commit()
                 return True
@@ -288,14 +375,15 @@ class GroupTable:
                 if not group:
                     return None
 
-                if not group.user_ids:
-                    group.user_ids = []
-
+                # Assign a new list, in-place changes to JSON aren't tracked
+                group_user_ids = list(group.user_ids or [])
                 for user_id in user_ids:
-                    if user_id not in group.user_ids:
-                        group.user_ids.append(user_id)
+                    if user_id not in group_user_ids:
+                        group_user_ids.append(user_id)
 
+                group.user_ids = group_user_ids
                 group.updated_at = int(time.time())
+                self._set_group_member_ids(db, id, group_user_ids)
                 db.commit()
                 db.refresh(group)
                 return GroupModel.model_validate(group)
@@ -315,11 +403,9 @@ class GroupTable:
                 if not group.user_ids:
                     return GroupModel.model_validate(group)
 
-                for user_id in user_ids:
-                    if user_id in group.user_ids:
-                        group.user_ids.remove(user_id)
-
+                group.user_ids = [i for i in group.user_ids if i not in user_ids]
                 group.updated_at = int(time.time())
+                self._set_group_member_ids(db, id, group.user_ids)
                 db.commit()
                 db.refresh(group)
                 return GroupModel.model_validate(group)
@@ -4,7 +4,7 @@ import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_by_access
 from open_webui.models.users import Users, UserResponse
 
 
@@ -102,15 +102,13 @@ class NoteTable:
             return [NoteModel.model_validate(note) for note in notes]
 
     def get_notes_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        user_group_ids: Optional[set[str]] = None,
     ) -> list[NoteModel]:
         notes = self.get_notes()
-        return [
-            note
-            for note in notes
-            if note.user_id == user_id
-            or has_access(user_id, permission, note.access_control)
-        ]
+        return filter_by_access(user_id, permission, notes, user_group_ids)
 
     def get_note_by_id(self, id: str) -> Optional[NoteModel]:
         with get_db() as db:
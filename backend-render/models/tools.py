@@ -8,7 +8,7 @@ from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import filter_by_access
 
 
 log = logging.getLogger(__name__)
@@ -158,16 +158,14 @@ class ToolsTable:
             return tools
 
     def get_tools_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        user_group_ids: Optional[set[str]] = None,
     ) -> list[ToolUserModel]:
         tools = self.get_tools()
 
-        return [
-            tool
-            for tool in tools
-            if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control)
-        ]
+        return filter_by_access(user_id, permission, tools, user_group_ids)
 
     def get_tool_valves_by_id(self, id: str) -> Optional[dict]:
         try:
@@ -1,3 +1,4 @@
+import hashlib
 import time
 from typing import Optional
 
@@ -11,8 +12,9 @@ from open_webui.utils.misc import throttle
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, Date
+from sqlalchemy import BigInteger, Column, String, Text, Date, Index
 from sqlalchemy import or_
+from sqlalchemy.sql.expression import bindparam
 
 import datetime
 
@@ -41,6 +43,8 @@ class User(Base):
     settings = Column(JSONField, nullable=True)
 
     api_key = Column(String, nullable=True, unique=True)
+    # sha256 of api_key; API key authentication looks keys up by hash
+    api_key_hash = Column(String, nullable=True)
     oauth_sub = Column(Text, unique=True)
 
     last_active_at = Column(BigInteger)
@@ -48,6 +52,12 @@ class User(Base):
     updated_at = Column(BigInteger)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("api_key_hash_idx", "api_key_hash", unique=True),)
+
+
+def get_api_key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
 
 class UserSettings(BaseModel):
     ui: Optional[dict] = {}
@@ -184,7 +194,11 @@ class UsersTable:
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
-                user = db.query(User).filter_by(api_key=api_key).first()
+                user = (
+                    db.query(User)
+                    .filter_by(api_key_hash=get_api_key_hash(api_key))
+                    .first()
+                )
                 return UserModel.model_validate(user)
         except Exception:
             return None
@@ -351,6 +365,24 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_users_last_active_by_ids(self, last_active_at: dict[str, int]) -> int:
+        """Write the last active time of many users in one executemany UPDATE."""
+        if not last_active_at:
+            return 0
+
+        with get_db() as db:
+            db.execute(
+                User.__table__.update()
+                .where(User.__table__.c.id == bindparam("user_id"))
+                .values(last_active_at=bindparam("last_active_at")),
+                [
+                    {"user_id": id, "last_active_at": timestamp}
+                    for id, timestamp in last_active_at.items()
+                ],
+            )
+            db.commit()
+        return len(last_active_at)
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -417,7 +449,18 @@ class UsersTable:
     def update_user_api_key_by_id(self, id: str, api_key: str) -> bool:
         try:
             with get_db() as db:
-                result = db.query(User).filter_by(id=id).update({"api_key": api_key})
+                result = (
+                    db.query(User)
+                    .filter_by(id=id)
+                    .update(
+                        {
+                            "api_key": api_key,
+                            "api_key_hash": (
+                                get_api_key_hash(api_key) if api_key else None
+                            ),
+                        }
+                    )
+                )
                 db.commit()
                 return True if result == 1 else False
         except Exception:
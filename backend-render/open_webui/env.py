@@ -3,6 +3,7 @@ Environment configuration for OpenWebUI backend.
 This file provides all the environment variables and configuration needed for the backend.
 """
 
+import json
 import os
 from pathlib import Path
 from typing import Optional
@@ -74,3 +75,108 @@ VECTOR_DB = os.getenv("VECTOR_DB", "chroma")
 
 # Environment
 ENV = os.getenv("ENV", "development")
+
+# Chat streaming configuration
+ENABLE_REALTIME_CHAT_SAVE = (
+    os.getenv("ENABLE_REALTIME_CHAT_SAVE", "false").lower() == "true"
+)
+# Upper bound (ms) on how long streamed content may stay unsaved when realtime saving is on
+REALTIME_CHAT_SAVE_INTERVAL_MS = int(os.getenv("REALTIME_CHAT_SAVE_INTERVAL_MS", "1000"))
+REALTIME_CHAT_SAVE_MAX_PENDING_CHARS = int(
+    os.getenv("REALTIME_CHAT_SAVE_MAX_PENDING_CHARS", "4096")
+)
+
+# Content frames kept per streaming message for clients that reconnect mid-answer
+CHAT_STREAM_REPLAY_MAX_EVENTS = int(os.getenv("CHAT_STREAM_REPLAY_MAX_EVENTS", "2000"))
+CHAT_STREAM_REPLAY_TTL = int(os.getenv("CHAT_STREAM_REPLAY_TTL", "300"))
+
+# Streamed deltas are emitted at least this often (ms) and once this many bytes are pending
+CHAT_RESPONSE_STREAM_FLUSH_INTERVAL_MS = int(
+    os.getenv("CHAT_RESPONSE_STREAM_FLUSH_INTERVAL_MS", "50")
+)
+CHAT_RESPONSE_STREAM_FLUSH_MAX_BYTES = int(
+    os.getenv("CHAT_RESPONSE_STREAM_FLUSH_MAX_BYTES", "16384")
+)
+
+# Pooled outbound HTTP clients (one connector per provider origin)
+HTTP_CLIENT_POOL_LIMIT = int(os.getenv("HTTP_CLIENT_POOL_LIMIT", "100"))
+HTTP_CLIENT_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_CLIENT_KEEPALIVE_TIMEOUT", "30"))
+HTTP_CLIENT_DNS_CACHE_TTL = int(os.getenv("HTTP_CLIENT_DNS_CACHE_TTL", "300"))
+
+# Complete (non-streaming) provider responses are relayed in chunks of this many characters
+NON_STREAMING_RESPONSE_CHUNK_SIZE = int(
+    os.getenv("NON_STREAMING_RESPONSE_CHUNK_SIZE", "4096")
+)
+# Optional total time (ms) over which those chunks are spread; 0 sends them at once
+NON_STREAMING_RESPONSE_PACING_BUDGET_MS = int(
+    os.getenv("NON_STREAMING_RESPONSE_PACING_BUDGET_MS", "0")
+)
+
+# Multi-worker deployment: with WEBSOCKET_MANAGER=redis, Socket.IO rooms, config
+# changes and cache invalidations are shared between worker processes
+WEBSOCKET_MANAGER = os.getenv("WEBSOCKET_MANAGER", "")
+WEBSOCKET_REDIS_URL = os.getenv("WEBSOCKET_REDIS_URL", REDIS_URL)
+WEBSOCKET_REDIS_CLUSTER = (
+    os.getenv("WEBSOCKET_REDIS_CLUSTER", "false").lower() == "true"
+)
+WEBSOCKET_SENTINEL_HOSTS = os.getenv("WEBSOCKET_SENTINEL_HOSTS", "")
+WEBSOCKET_SENTINEL_PORT = os.getenv("WEBSOCKET_SENTINEL_PORT", "26379")
+
+UVICORN_WORKERS = int(os.getenv("UVICORN_WORKERS", "1"))
+# Seconds in-flight requests (including streams) get to finish on shutdown
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+
+# Exact-match cache of non-streamed completions, opt-in per model ("*" for all)
+RESPONSE_CACHE_MODELS = [
+    model.strip()
+    for model in os.getenv("RESPONSE_CACHE_MODELS", "").split(",")
+    if model.strip()
+]
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+
+# Latency-aware routing between OPENAI_API_BASE_URLS serving the same model
+ENDPOINT_ROUTING_EWMA_ALPHA = float(os.getenv("ENDPOINT_ROUTING_EWMA_ALPHA", "0.2"))
+ENDPOINT_ROUTING_CIRCUIT_FAILURES = int(
+    os.getenv("ENDPOINT_ROUTING_CIRCUIT_FAILURES", "5")
+)
+ENDPOINT_ROUTING_CIRCUIT_COOLDOWN = float(
+    os.getenv("ENDPOINT_ROUTING_CIRCUIT_COOLDOWN", "30")
+)
+# Send a second request once the first is slower than the endpoint's p95
+ENABLE_ENDPOINT_HEDGING = (
+    os.getenv("ENABLE_ENDPOINT_HEDGING", "false").lower() == "true"
+)
+ENDPOINT_HEDGING_MIN_DELAY_MS = int(os.getenv("ENDPOINT_HEDGING_MIN_DELAY_MS", "250"))
+
+# Ollama node selection: how often loaded models are polled (/api/ps) and how
+# many generations a node with the model loaded takes before others are tried
+OLLAMA_BALANCER_POLL_INTERVAL = float(os.getenv("OLLAMA_BALANCER_POLL_INTERVAL", "5"))
+OLLAMA_BALANCER_MAX_IN_FLIGHT = int(os.getenv("OLLAMA_BALANCER_MAX_IN_FLIGHT", "4"))
+
+# Per-provider admission for completion calls (0 = unlimited). Task work
+# (titles, tags, queries, ...) may take at most ADMISSION_TASK_LANE_SHARE of
+# the slots; ADMISSION_PROVIDER_LIMITS overrides the limits per upstream
+# origin, e.g. {"https://api.openai.com": {"max_concurrency": 32}}
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "0"))
+ADMISSION_TOKENS_PER_MINUTE = int(os.getenv("ADMISSION_TOKENS_PER_MINUTE", "0"))
+ADMISSION_TASK_LANE_SHARE = float(os.getenv("ADMISSION_TASK_LANE_SHARE", "0.5"))
+try:
+    ADMISSION_PROVIDER_LIMITS = json.loads(
+        os.getenv("ADMISSION_PROVIDER_LIMITS", "{}")
+    )
+except ValueError:
+    ADMISSION_PROVIDER_LIMITS = {}
+
+# Upstream model lists are fetched again after this many seconds; config,
+# model and function changes rebuild the catalog right away
+MODELS_CACHE_TTL = int(os.getenv("MODELS_CACHE_TTL", "300"))
+# Cached per-group model list responses (with their ETags)
+MODEL_CATALOG_MAX_VIEWS = int(os.getenv("MODEL_CATALOG_MAX_VIEWS", "256"))
+
+# Seconds authenticated users are cached by id (0 disables the cache)
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Seconds users' last active times are collected in memory before one bulk write
+USER_ACTIVITY_FLUSH_INTERVAL = float(os.getenv("USER_ACTIVITY_FLUSH_INTERVAL", "10"))
@@ -22,7 +22,7 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.models.notes import Notes
 
 from open_webui.retrieval.vector.main import GetResult
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 
 from open_webui.env import (
@@ -517,7 +517,12 @@ def get_sources_from_items(
             if note and (
                 user.role == "admin"
                 or note.user_id == user.id
-                or has_access(user.id, "read", note.access_control)
+                or has_access(
+                    user.id,
+                    "read",
+                    note.access_control,
+                    get_user_group_ids(user.id, request),
+                )
             ):
                 # User has access to the note
                 query_result = {
@@ -581,7 +586,12 @@ def get_sources_from_items(
 
                 if knowledge_base and (
                     user.role == "admin"
-                    or has_access(user.id, "read", knowledge_base.access_control)
+                    or has_access(
+                        user.id,
+                        "read",
+                        knowledge_base.access_control,
+                        get_user_group_ids(user.id, request),
+                    )
                 ):
 
                     file_ids = knowledge_base.data.get("file_ids", [])
@@ -49,6 +49,7 @@ from open_webui.utils.auth import (
 )
 from open_webui.utils.webhook import post_webhook
 from open_webui.utils.access_control import get_permissions
+from open_webui.utils.user_cache import user_cache
 
 from typing import Optional, List
 
@@ -148,6 +149,7 @@ async def update_profile(
             form_data.model_dump(),
         )
         if user:
+            user_cache.invalidate(user.id)
             return user
         else:
             raise HTTPException(400, detail=ERROR_MESSAGES.DEFAULT())
@@ -1034,6 +1036,8 @@ async def generate_api_key(request: Request, user=Depends(get_current_user)):
     success = Users.update_user_api_key_by_id(user.id, api_key)
 
     if success:
+        # Drop the cached lookups of the previous key
+        user_cache.invalidate(user.id)
         return {
             "api_key": api_key,
         }
@@ -1045,6 +1049,8 @@ async def generate_api_key(request: Request, user=Depends(get_current_user)):
 @router.delete("/api_key", response_model=bool)
 async def delete_api_key(user=Depends(get_current_user)):
     success = Users.update_user_api_key_by_id(user.id, None)
+    if success:
+        user_cache.invalidate(user.id)
     return success
 
 
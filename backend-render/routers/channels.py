@@ -25,7 +25,11 @@ from open_webui.env import SRC_LOG_LEVELS
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access, get_users_with_access
+from open_webui.utils.access_control import (
+    has_access,
+    get_users_with_access,
+    get_user_group_ids,
+)
 from open_webui.utils.webhook import post_webhook
 
 log = logging.getLogger(__name__)
@@ -39,15 +43,19 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[ChannelModel])
-async def get_channels(user=Depends(get_verified_user)):
-    return Channels.get_channels_by_user_id(user.id)
+async def get_channels(request: Request, user=Depends(get_verified_user)):
+    return Channels.get_channels_by_user_id(
+        user.id, user_group_ids=get_user_group_ids(user.id, request)
+    )
 
 
 @router.get("/list", response_model=list[ChannelModel])
-async def get_all_channels(user=Depends(get_verified_user)):
+async def get_all_channels(request: Request, user=Depends(get_verified_user)):
     if user.role == "admin":
         return Channels.get_channels()
-    return Channels.get_channels_by_user_id(user.id)
+    return Channels.get_channels_by_user_id(
+        user.id, user_group_ids=get_user_group_ids(user.id, request)
+    )
 
 
 ############################
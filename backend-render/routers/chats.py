@@ -23,6 +23,7 @@ from pydantic import BaseModel
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_permission
+from open_webui.utils.admission import admission_controller
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -73,6 +74,7 @@ async def delete_all_user_chats(request: Request, user=Depends(get_verified_user
         )
 
     result = Chats.delete_chats_by_user_id(user.id)
+    admission_controller.cancel(user_id=user.id)
     return result
 
 
@@ -542,6 +544,7 @@ async def delete_chat_by_id(request: Request, id: str, user=Depends(get_verified
                 Tags.delete_tag_by_name_and_user_id(tag, user.id)
 
         result = Chats.delete_chat_by_id(id)
+        admission_controller.cancel(chat_id=id)
 
         return result
     else:
@@ -559,6 +562,7 @@ async def delete_chat_by_id(request: Request, id: str, user=Depends(get_verified
                 Tags.delete_tag_by_name_and_user_id(tag, user.id)
 
         result = Chats.delete_chat_by_id_and_user_id(id, user.id)
+        admission_controller.cancel(chat_id=id)
         return result
 
 
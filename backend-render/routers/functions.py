@@ -17,6 +17,8 @@ from open_webui.utils.plugin import (
     replace_imports,
     get_function_module_from_cache,
 )
+from open_webui.utils.filter import function_valves_cache
+from open_webui.utils.shared_state import shared_state
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -147,7 +149,9 @@ async def sync_functions(
                 content=function.content,
             )
 
-        return Functions.sync_functions(user.id, form_data.functions)
+        functions = Functions.sync_functions(user.id, form_data.functions)
+        shared_state.invalidate("models")
+        return functions
     except Exception as e:
         log.exception(f"Failed to load a function: {e}")
         raise HTTPException(
@@ -187,6 +191,8 @@ async def create_new_function(
             FUNCTIONS[form_data.id] = function_module
 
             function = Functions.insert_new_function(user.id, function_type, form_data)
+            # Models list their actions and filters
+            shared_state.invalidate("models")
 
             function_cache_dir = CACHE_DIR / "functions" / form_data.id
             function_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -241,6 +247,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         function = Functions.update_function_by_id(
             id, {"is_active": not function.is_active}
         )
+        shared_state.invalidate("models")
 
         if function:
             return function
@@ -268,6 +275,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         function = Functions.update_function_by_id(
             id, {"is_global": not function.is_global}
         )
+        shared_state.invalidate("models")
 
         if function:
             return function
@@ -306,6 +314,7 @@ async def update_function_by_id(
         log.debug(updated)
 
         function = Functions.update_function_by_id(id, updated)
+        shared_state.invalidate("models")
 
         if function:
             return function
@@ -337,6 +346,8 @@ async def delete_function_by_id(
         FUNCTIONS = request.app.state.FUNCTIONS
         if id in FUNCTIONS:
             del FUNCTIONS[id]
+        function_valves_cache.invalidate(id)
+        shared_state.invalidate("models")
 
     return result
 
@@ -413,6 +424,7 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                function_valves_cache.invalidate(id)
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
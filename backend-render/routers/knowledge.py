@@ -21,7 +21,12 @@ from open_webui.storage.provider import Storage
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
-from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_control import (
+    has_access,
+    has_permission,
+    get_user_group_ids,
+)
+from open_webui.utils.shared_state import shared_state
 
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -40,13 +45,15 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[KnowledgeUserResponse])
-async def get_knowledge(user=Depends(get_verified_user)):
+async def get_knowledge(request: Request, user=Depends(get_verified_user)):
     knowledge_bases = []
 
     if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
         knowledge_bases = Knowledges.get_knowledge_bases()
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "read", get_user_group_ids(user.id, request)
+        )
 
     # Get files for each knowledge base
     knowledge_with_files = []
@@ -88,13 +95,15 @@ async def get_knowledge(user=Depends(get_verified_user)):
 
 
 @router.get("/list", response_model=list[KnowledgeUserResponse])
-async def get_knowledge_list(user=Depends(get_verified_user)):
+async def get_knowledge_list(request: Request, user=Depends(get_verified_user)):
     knowledge_bases = []
 
     if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
         knowledge_bases = Knowledges.get_knowledge_bases()
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "write", get_user_group_ids(user.id, request)
+        )
 
     # Get files for each knowledge base
     knowledge_with_files = []
@@ -627,6 +636,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
                     is_active=model.is_active,
                 )
                 Models.update_model_by_id(model.id, model_form)
+                shared_state.invalidate("models")
 
     # Clean up vector DB
     try:
@@ -9,12 +9,17 @@ from models.models import (
 )
 
 from pydantic import BaseModel
-from utils.misc import ERROR_MESSAGES
+from open_webui.utils.misc import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 
-from utils.auth import get_admin_user, get_verified_user
-from utils.access_control import has_access, has_permission
+from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.access_control import (
+    has_access,
+    has_permission,
+    get_user_group_ids,
+)
+from open_webui.utils.model_catalog import invalidate_models
 
 # Define constant
 BYPASS_ADMIN_ACCESS_CONTROL = False
@@ -28,11 +33,15 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[ModelUserResponse])
-async def get_models(id: Optional[str] = None, user=Depends(get_verified_user)):
+async def get_models(
+    request: Request, id: Optional[str] = None, user=Depends(get_verified_user)
+):
     if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
         return Models.get_models()
     else:
-        return Models.get_models_by_user_id(user.id)
+        return Models.get_models_by_user_id(
+            user.id, user_group_ids=get_user_group_ids(user.id, request)
+        )
 
 
 ###########################
@@ -74,6 +83,8 @@ async def create_new_model(
     else:
         model = Models.insert_new_model(form_data, user.id)
         if model:
+            # Custom models are part of the model catalog of every worker
+            invalidate_models()
             return model
         else:
             raise HTTPException(
@@ -105,7 +116,9 @@ class SyncModelsForm(BaseModel):
 async def sync_models(
     request: Request, form_data: SyncModelsForm, user=Depends(get_admin_user)
 ):
-    return Models.sync_models(user.id, form_data.models)
+    models = Models.sync_models(user.id, form_data.models)
+    invalidate_models()
+    return models
 
 
 ###########################
@@ -148,6 +161,7 @@ async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
             model = Models.toggle_model_by_id(id)
 
             if model:
+                invalidate_models()
                 return model
             else:
                 raise HTTPException(
@@ -196,6 +210,7 @@ async def update_model_by_id(
         )
 
     model = Models.update_model_by_id(id, form_data)
+    invalidate_models()
     return model
 
 
@@ -224,10 +239,12 @@ async def delete_model_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     result = Models.delete_model_by_id(id)
+    invalidate_models()
     return result
 
 
 @router.delete("/delete/all", response_model=bool)
 async def delete_all_models(user=Depends(get_admin_user)):
     result = Models.delete_all_models()
+    invalidate_models()
     return result
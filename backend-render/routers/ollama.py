@@ -1,7 +1,3 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
@@ -14,7 +10,6 @@ from datetime import datetime
 from typing import Optional, Union
 from urllib.parse import urlparse
 import aiohttp
-from aiocache import cached
 import requests
 from urllib.parse import quote
 
@@ -50,7 +45,21 @@ from open_webui.utils.payload import (
     apply_system_prompt_to_body,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
+from open_webui.utils.http_client import http_client_pool, get_origin
+from open_webui.utils.ollama_balancer import ollama_balancer
+from open_webui.utils.model_catalog import (
+    model_catalog,
+    get_model_access,
+    get_user_view_key,
+    filter_models_by_access,
+)
+from open_webui.utils.admission import (
+    admission_controller,
+    AdmissionCancelledError,
+    estimate_tokens,
+    get_lane,
+)
 
 
 from open_webui.config import (
@@ -81,26 +90,27 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = http_client_pool.get_session(url)
+        async with session.get(
+            url,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -109,10 +119,11 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    session: Optional[aiohttp.ClientSession] = None,
 ):
     if response:
-        response.close()
+        # Released connections go back to the pool when fully read
+        response.release()
     if session:
         await session.close()
 
@@ -125,13 +136,35 @@ async def send_post_request(
     content_type: Optional[str] = None,
     user: UserModel = None,
     metadata: Optional[dict] = None,
+    node_url: Optional[str] = None,
+    tokens: int = 0,
 ):
+    ticket = None
+    if node_url:
+        # Wait for the node's admission (task work queues behind chat replies),
+        # then count the generation against it until its response is finished
+        try:
+            ticket = await admission_controller.acquire(
+                get_origin(node_url),
+                lane=get_lane(metadata),
+                tokens=tokens,
+                chat_id=metadata.get("chat_id") if metadata else None,
+                user_id=user.id if user else None,
+            )
+        except AdmissionCancelledError as e:
+            raise HTTPException(status_code=499, detail=str(e))
+        ollama_balancer.acquire(node_url)
+
+    async def finish_response(response):
+        await cleanup_response(response)
+        if node_url:
+            ollama_balancer.release(node_url)
+            ticket.release()
 
     r = None
+    streaming = False
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = http_client_pool.get_session(url)
 
         r = await session.post(
             url,
@@ -156,12 +189,13 @@ async def send_post_request(
                 ),
             },
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -180,13 +214,12 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(finish_response, response=r),
             )
         else:
             res = await r.json()
@@ -202,8 +235,34 @@ async def send_post_request(
             detail=detail if e else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not stream:
-            await cleanup_response(r, session)
+        # A handed out stream is finished by its background task
+        if not streaming:
+            await finish_response(r)
+
+
+async def get_loaded_models_by_node(request: Request) -> dict[str, set[str]]:
+    loaded_models = await get_ollama_loaded_models(request, user=None)
+
+    nodes = {}
+    for model in loaded_models.get("models", []):
+        for idx in model.get("urls", []):
+            url = request.app.state.config.OLLAMA_BASE_URLS[idx]
+            nodes.setdefault(url, set()).add(model["model"])
+    return nodes
+
+
+def select_ollama_url_idx(request: Request, model: str, url_idxs: list[int]) -> int:
+    """Pick the node for `model`, preferring idle nodes that already have it loaded."""
+    ollama_balancer.refresh(lambda: get_loaded_models_by_node(request))
+
+    urls = {
+        request.app.state.config.OLLAMA_BASE_URLS[idx]: idx
+        for idx in url_idxs
+        if idx < len(request.app.state.config.OLLAMA_BASE_URLS)
+    }
+    if not urls:
+        return random.choice(url_idxs)
+    return urls[ollama_balancer.select(model, list(urls))]
 
 
 def get_api_key(idx, url, configs):
@@ -339,8 +398,22 @@ def merge_ollama_models_lists(model_lists):
     return list(merged_models.values())
 
 
-@cached(ttl=MODELS_CACHE_TTL)
+def get_catalog_name(user: UserModel = None) -> str:
+    # Upstreams that get the user's info may answer per user
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        return f"ollama:{user.id}"
+    return "ollama"
+
+
 async def get_all_models(request: Request, user: UserModel = None):
+    return await model_catalog.get(
+        get_catalog_name(user),
+        lambda: build_all_models(request, user=user),
+        ttl=MODELS_CACHE_TTL,
+    )
+
+
+async def build_all_models(request: Request, user: UserModel = None):
     log.info("get_all_models()")
     if request.app.state.config.ENABLE_OLLAMA_API:
         request_tasks = []
@@ -437,17 +510,16 @@ async def get_all_models(request: Request, user: UserModel = None):
     return models
 
 
-async def get_filtered_models(models, user):
-    # Filter models based on user access control
-    filtered_models = []
-    for model in models.get("models", []):
-        model_info = Models.get_model_by_id(model["model"])
-        if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            ):
-                filtered_models.append(model)
-    return filtered_models
+async def get_filtered_models(models, user, request: Optional[Request] = None):
+    # Filter models based on user access control, in one pass
+    model_access, _ = await get_model_access()
+    return filter_models_by_access(
+        models.get("models", []),
+        model_access,
+        user.id,
+        get_user_group_ids(user.id, request),
+        id_key="model",
+    )
 
 
 @router.get("/api/tags")
@@ -459,6 +531,29 @@ async def get_ollama_tags(
 
     if url_idx is None:
         models = await get_all_models(request, user=user)
+        name = get_catalog_name(user)
+
+        # Answered from the catalog: one view (and ETag) per set of groups
+        if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
+            model_access, access_user_ids = await get_model_access()
+            group_ids = get_user_group_ids(user.id, request)
+            view = model_catalog.get_view(
+                name,
+                get_user_view_key(user, group_ids, access_user_ids),
+                lambda: {
+                    **models,
+                    "models": filter_models_by_access(
+                        models["models"],
+                        model_access,
+                        user.id,
+                        group_ids,
+                        id_key="model",
+                    ),
+                },
+            )
+        else:
+            view = model_catalog.get_view(name, None, lambda: models)
+        return model_catalog.get_response(request, view)
     else:
         url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
         key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -503,7 +598,7 @@ async def get_ollama_tags(
             )
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models["models"] = await get_filtered_models(models, user)
+        models["models"] = await get_filtered_models(models, user, request)
 
     return models
 
@@ -963,7 +1058,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = select_ollama_url_idx(request, model, models[model]["urls"])
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1037,7 +1132,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_ollama_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1124,7 +1219,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_ollama_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1217,7 +1312,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_ollama_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1239,6 +1334,8 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        node_url=url,
+        tokens=estimate_tokens(form_data.model_dump(exclude_none=True)),
     )
 
 
@@ -1284,7 +1381,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_ollama_url_idx(request, model, models[model].get("urls", []))
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1372,6 +1469,8 @@ async def generate_chat_completion(
         content_type="application/x-ndjson",
         user=user,
         metadata=metadata,
+        node_url=url,
+        tokens=estimate_tokens(payload),
     )
 
 
@@ -1478,6 +1577,8 @@ async def generate_openai_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        node_url=url,
+        tokens=estimate_tokens(payload),
     )
 
 
@@ -1560,6 +1661,8 @@ async def generate_openai_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        node_url=url,
+        tokens=estimate_tokens(payload),
     )
 
 
@@ -1619,15 +1722,10 @@ async def get_openai_models(
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
         # Filter models based on user access control
-        filtered_models = []
-        for model in models:
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                ):
-                    filtered_models.append(model)
-        models = filtered_models
+        model_access, _ = await get_model_access()
+        models = filter_models_by_access(
+            models, model_access, user.id, get_user_group_ids(user.id, request)
+        )
 
     return {
         "data": models,
@@ -5,7 +5,6 @@ import logging
 from typing import Optional
 
 import aiohttp
-from aiocache import cached
 import requests
 from urllib.parse import quote
 
@@ -46,7 +45,22 @@ from open_webui.utils.misc import (
 )
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
+from open_webui.utils.sse import aiter_sse_chunks
+from open_webui.utils.http_client import http_client_pool, get_origin
+from open_webui.utils.endpoint_router import endpoint_router
+from open_webui.utils.model_catalog import (
+    model_catalog,
+    get_model_access,
+    get_user_view_key,
+    filter_models_by_access,
+)
+from open_webui.utils.admission import (
+    admission_controller,
+    AdmissionCancelledError,
+    estimate_tokens,
+    get_lane,
+)
 
 
 log = logging.getLogger(__name__)
@@ -63,25 +77,26 @@ log.setLevel(SRC_LOG_LEVELS["OPENAI"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = http_client_pool.get_session(url)
+        async with session.get(
+            url,
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -90,14 +105,21 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    session: Optional[aiohttp.ClientSession] = None,
 ):
     if response:
-        response.close()
+        # Released connections go back to the pool when fully read
+        response.release()
     if session:
         await session.close()
 
 
+def get_endpoint_id(request: Request, idx: int) -> str:
+    """Identify a connection to the endpoint router; one base URL may be
+    configured several times with different keys."""
+    return f"{idx}:{request.app.state.config.OPENAI_API_BASE_URLS[idx]}"
+
+
 def openai_reasoning_model_handler(payload):
     """
     Handle reasoning model specific parameters
@@ -189,6 +211,16 @@ async def update_config(
     }
 
 
+@router.get("/endpoints/health")
+async def get_endpoints_health(request: Request, user=Depends(get_admin_user)):
+    return endpoint_router.get_stats(
+        [
+            get_endpoint_id(request, idx)
+            for idx in range(len(request.app.state.config.OPENAI_API_BASE_URLS))
+        ]
+    )
+
+
 @router.post("/audio/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     idx = None
@@ -388,21 +420,33 @@ async def get_all_models_responses(request: Request, user: UserModel) -> list:
     return responses
 
 
-async def get_filtered_models(models, user):
-    # Filter models based on user access control
-    filtered_models = []
-    for model in models.get("data", []):
-        model_info = Models.get_model_by_id(model["id"])
-        if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            ):
-                filtered_models.append(model)
-    return filtered_models
+async def get_filtered_models(models, user, request: Optional[Request] = None):
+    # Filter models based on user access control, in one pass
+    model_access, _ = await get_model_access()
+    return filter_models_by_access(
+        models.get("data", []),
+        model_access,
+        user.id,
+        get_user_group_ids(user.id, request),
+    )
+
+
+def get_catalog_name(user: UserModel = None) -> str:
+    # Upstreams that get the user's info may answer per user
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        return f"openai:{user.id}"
+    return "openai"
 
 
-@cached(ttl=MODELS_CACHE_TTL)
 async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
+    return await model_catalog.get(
+        get_catalog_name(user),
+        lambda: build_all_models(request, user=user),
+        ttl=MODELS_CACHE_TTL,
+    )
+
+
+async def build_all_models(request: Request, user: UserModel) -> dict[str, list]:
     log.info("get_all_models()")
 
     if not request.app.state.config.ENABLE_OPENAI_API:
@@ -459,7 +503,15 @@ async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
     models = {"data": merge_models_lists(map(extract_data, responses))}
     log.debug(f"models: {models}")
 
-    request.app.state.OPENAI_MODELS = {model["id"]: model for model in models["data"]}
+    # Connections serving the same model id are interchangeable for routing
+    url_idxs = {}
+    for model in models["data"]:
+        url_idxs.setdefault(model["id"], []).append(model["urlIdx"])
+
+    request.app.state.OPENAI_MODELS = {
+        model["id"]: {**model, "urlIdxs": url_idxs[model["id"]]}
+        for model in models["data"]
+    }
     return models
 
 
@@ -474,6 +526,25 @@ async def get_models(
 
     if url_idx is None:
         models = await get_all_models(request, user=user)
+        name = get_catalog_name(user)
+
+        # Answered from the catalog: one view (and ETag) per set of groups
+        if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
+            model_access, access_user_ids = await get_model_access()
+            group_ids = get_user_group_ids(user.id, request)
+            view = model_catalog.get_view(
+                name,
+                get_user_view_key(user, group_ids, access_user_ids),
+                lambda: {
+                    **models,
+                    "data": filter_models_by_access(
+                        models["data"], model_access, user.id, group_ids
+                    ),
+                },
+            )
+        else:
+            view = model_catalog.get_view(name, None, lambda: models)
+        return model_catalog.get_response(request, view)
     else:
         url = request.app.state.config.OPENAI_API_BASE_URLS[url_idx]
         key = request.app.state.config.OPENAI_API_KEYS[url_idx]
@@ -484,81 +555,81 @@ async def get_models(
         )
 
         r = None
-        async with aiohttp.ClientSession(
-            trust_env=True,
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
-        ) as session:
-            try:
-                headers = {
-                    "Content-Type": "application/json",
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS
-                        else {}
-                    ),
-                }
-
-                if api_config.get("azure", False):
-                    models = {
-                        "data": api_config.get("model_ids", []) or [],
-                        "object": "list",
+        session = http_client_pool.get_session(url)
+        try:
+            headers = {
+                "Content-Type": "application/json",
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
                     }
-                else:
-                    headers["Authorization"] = f"Bearer {key}"
-
-                    async with session.get(
-                        f"{url}/models",
-                        headers=headers,
-                        ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                    ) as r:
-                        if r.status != 200:
-                            # Extract response error details if available
-                            error_detail = f"HTTP Error: {r.status}"
-                            res = await r.json()
-                            if "error" in res:
-                                error_detail = f"External Error: {res['error']}"
-                            raise Exception(error_detail)
+                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    else {}
+                ),
+            }
 
-                        response_data = await r.json()
+            if api_config.get("azure", False):
+                models = {
+                    "data": api_config.get("model_ids", []) or [],
+                    "object": "list",
+                }
+            else:
+                headers["Authorization"] = f"Bearer {key}"
 
-                        # Check if we're calling OpenAI API based on the URL
-                        if "api.openai.com" in url:
-                            # Filter models according to the specified conditions
-                            response_data["data"] = [
-                                model
-                                for model in response_data.get("data", [])
-                                if not any(
-                                    name in model["id"]
-                                    for name in [
-                                        "babbage",
-                                        "dall-e",
-                                        "davinci",
-                                        "embedding",
-                                        "tts",
-                                        "whisper",
-                                    ]
-                                )
-                            ]
-
-                        models = response_data
-            except aiohttp.ClientError as e:
-                # ClientError covers all aiohttp requests issues
-                log.exception(f"Client error: {str(e)}")
-                raise HTTPException(
-                    status_code=500, detail="Open WebUI: Server Connection Error"
-                )
-            except Exception as e:
-                log.exception(f"Unexpected error: {e}")
-                error_detail = f"Unexpected error: {str(e)}"
-                raise HTTPException(status_code=500, detail=error_detail)
+                async with session.get(
+                    f"{url}/models",
+                    headers=headers,
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                    timeout=aiohttp.ClientTimeout(
+                        total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST
+                    ),
+                ) as r:
+                    if r.status != 200:
+                        # Extract response error details if available
+                        error_detail = f"HTTP Error: {r.status}"
+                        res = await r.json()
+                        if "error" in res:
+                            error_detail = f"External Error: {res['error']}"
+                        raise Exception(error_detail)
+
+                    response_data = await r.json()
+
+                    # Check if we're calling OpenAI API based on the URL
+                    if "api.openai.com" in url:
+                        # Filter models according to the specified conditions
+                        response_data["data"] = [
+                            model
+                            for model in response_data.get("data", [])
+                            if not any(
+                                name in model["id"]
+                                for name in [
+                                    "babbage",
+                                    "dall-e",
+                                    "davinci",
+                                    "embedding",
+                                    "tts",
+                                    "whisper",
+                                ]
+                            )
+                        ]
+
+                    models = response_data
+        except aiohttp.ClientError as e:
+            # ClientError covers all aiohttp requests issues
+            log.exception(f"Client error: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail="Open WebUI: Server Connection Error"
+            )
+        except Exception as e:
+            log.exception(f"Unexpected error: {e}")
+            error_detail = f"Unexpected error: {str(e)}"
+            raise HTTPException(status_code=500, detail=error_detail)
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models["data"] = await get_filtered_models(models, user)
+        models["data"] = await get_filtered_models(models, user, request)
 
     return models
 
@@ -794,122 +865,195 @@ async def generate_chat_completion(
             detail="Model not found",
         )
 
-    # Get the API config for the model
-    api_config = request.app.state.config.OPENAI_API_CONFIGS.get(
-        str(idx),
-        request.app.state.config.OPENAI_API_CONFIGS.get(
-            request.app.state.config.OPENAI_API_BASE_URLS[idx], {}
-        ),  # Legacy support
-    )
+    def get_api_config(idx: int) -> dict:
+        return request.app.state.config.OPENAI_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OPENAI_API_CONFIGS.get(
+                request.app.state.config.OPENAI_API_BASE_URLS[idx], {}
+            ),  # Legacy support
+        )
 
-    prefix_id = api_config.get("prefix_id", None)
-    if prefix_id:
-        payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
-
-    # Add user info to the payload if the model is a pipeline
-    if "pipeline" in model and model.get("pipeline"):
-        payload["user"] = {
-            "name": user.name,
-            "id": user.id,
-            "email": user.email,
-            "role": user.role,
-        }
+    def prepare_request(idx: int, payload: dict):
+        payload = {**payload}
 
-    url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
-    key = request.app.state.config.OPENAI_API_KEYS[idx]
+        # Get the API config for the connection
+        api_config = get_api_config(idx)
 
-    # Check if model is a reasoning model that needs special handling
-    if is_openai_reasoning_model(payload["model"]):
-        payload = openai_reasoning_model_handler(payload)
-    elif "api.openai.com" not in url:
-        # Remove "max_completion_tokens" from the payload for backward compatibility
-        if "max_completion_tokens" in payload:
-            payload["max_tokens"] = payload["max_completion_tokens"]
-            del payload["max_completion_tokens"]
+        prefix_id = api_config.get("prefix_id", None)
+        if prefix_id:
+            payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
 
-    if "max_tokens" in payload and "max_completion_tokens" in payload:
-        del payload["max_tokens"]
+        # Add user info to the payload if the model is a pipeline
+        if "pipeline" in model and model.get("pipeline"):
+            payload["user"] = {
+                "name": user.name,
+                "id": user.id,
+                "email": user.email,
+                "role": user.role,
+            }
 
-    # Convert the modified body back to JSON
-    if "logit_bias" in payload:
-        payload["logit_bias"] = json.loads(
-            convert_logit_bias_input_to_json(payload["logit_bias"])
-        )
+        url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
+        key = request.app.state.config.OPENAI_API_KEYS[idx]
+
+        # Check if model is a reasoning model that needs special handling
+        if is_openai_reasoning_model(payload["model"]):
+            payload = openai_reasoning_model_handler(payload)
+        elif "api.openai.com" not in url:
+            # Remove "max_completion_tokens" from the payload for backward compatibility
+            if "max_completion_tokens" in payload:
+                payload["max_tokens"] = payload["max_completion_tokens"]
+                del payload["max_completion_tokens"]
+
+        if "max_tokens" in payload and "max_completion_tokens" in payload:
+            del payload["max_tokens"]
 
-    headers = {
-        "Content-Type": "application/json",
-        **(
-            {
-                "HTTP-Referer": "https://openwebui.com/",
-                "X-Title": "Open WebUI",
-            }
-            if "openrouter.ai" in url
-            else {}
-        ),
-        **(
-            {
-                "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                "X-OpenWebUI-User-Id": user.id,
-                "X-OpenWebUI-User-Email": user.email,
-                "X-OpenWebUI-User-Role": user.role,
-                **(
-                    {"X-OpenWebUI-Chat-Id": metadata.get("chat_id")}
-                    if metadata and metadata.get("chat_id")
-                    else {}
-                ),
-            }
-            if ENABLE_FORWARD_USER_INFO_HEADERS
-            else {}
-        ),
+        # Convert the modified body back to JSON
+        if "logit_bias" in payload:
+            payload["logit_bias"] = json.loads(
+                convert_logit_bias_input_to_json(payload["logit_bias"])
+            )
+
+        headers = {
+            "Content-Type": "application/json",
+            **(
+                {
+                    "HTTP-Referer": "https://openwebui.com/",
+                    "X-Title": "Open WebUI",
+                }
+                if "openrouter.ai" in url
+                else {}
+            ),
+            **(
+                {
+                    "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                    "X-OpenWebUI-User-Id": user.id,
+                    "X-OpenWebUI-User-Email": user.email,
+                    "X-OpenWebUI-User-Role": user.role,
+                    **(
+                        {"X-OpenWebUI-Chat-Id": metadata.get("chat_id")}
+                        if metadata and metadata.get("chat_id")
+                        else {}
+                    ),
+                }
+                if ENABLE_FORWARD_USER_INFO_HEADERS
+                else {}
+            ),
+        }
+
+        if api_config.get("azure", False):
+            api_version = api_config.get("api_version", "2023-03-15-preview")
+            request_url, payload = convert_to_azure_payload(url, payload, api_version)
+            headers["api-key"] = key
+            headers["api-version"] = api_version
+            request_url = f"{request_url}/chat/completions?api-version={api_version}"
+        else:
+            request_url = f"{url}/chat/completions"
+            headers["Authorization"] = f"Bearer {key}"
+
+        return request_url, headers, json.dumps(payload)
+
+    # With load balancing enabled on the model's connection, every other load
+    # balanced connection serving the model is a candidate too; the endpoint
+    # router picks the fastest healthy one (and optionally hedges to a second)
+    url_idxs = [idx]
+    if get_api_config(idx).get("load_balance", False):
+        url_idxs = [
+            url_idx
+            for url_idx in model.get("urlIdxs", [idx])
+            if url_idx < len(request.app.state.config.OPENAI_API_BASE_URLS)
+            and get_api_config(url_idx).get("load_balance", False)
+        ] or [idx]
+
+    # Keyed by connection, as connections sharing a base URL may differ in key
+    # and config. Until latencies are known, prefer the connection used so far
+    # (the last)
+    prepared_requests = {
+        get_endpoint_id(request, url_idx): prepare_request(url_idx, payload)
+        for url_idx in reversed(url_idxs)
     }
 
-    if api_config.get("azure", False):
-        api_version = api_config.get("api_version", "2023-03-15-preview")
-        request_url, payload = convert_to_azure_payload(url, payload, api_version)
-        headers["api-key"] = key
-        headers["api-version"] = api_version
-        request_url = f"{request_url}/chat/completions?api-version={api_version}"
-    else:
-        request_url = f"{url}/chat/completions"
-        headers["Authorization"] = f"Bearer {key}"
+    # Task completions (titles, tags, queries, ...) queue behind chat replies
+    # and are dropped if their chat goes away while they wait
+    lane = get_lane(metadata)
+    tokens = estimate_tokens(payload)
+
+    async def admit_request(endpoint_id: str):
+        request_url, _, _ = prepared_requests[endpoint_id]
+        return await admission_controller.acquire(
+            get_origin(request_url),
+            lane=lane,
+            tokens=tokens,
+            chat_id=metadata.get("chat_id") if metadata else None,
+            user_id=user.id,
+        )
 
-    payload = json.dumps(payload)
+    async def send_request(endpoint_id: str, ticket):
+        request_url, headers, data = prepared_requests[endpoint_id]
+        try:
+            session = http_client_pool.get_session(request_url)
+            r = await session.request(
+                method="POST",
+                url=request_url,
+                data=data,
+                headers=headers,
+                ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            )
+        except BaseException:
+            ticket.release()
+            raise
+        try:
+            # Wait for the first byte of the body (the first token when streaming)
+            first_chunk = await r.content.readany()
+        except BaseException:
+            r.close()
+            ticket.release()
+            raise
+        return r, first_chunk, ticket
+
+    async def close_response(result):
+        result[0].close()
+        result[2].release()
 
     r = None
-    session = None
+    ticket = None
     streaming = False
     response = None
 
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
-        r = await session.request(
-            method="POST",
-            url=request_url,
-            data=payload,
-            headers=headers,
-            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        _, (r, first_chunk, ticket) = await endpoint_router.request(
+            list(prepared_requests),
+            send_request,
+            close_response,
+            admit=admit_request,
         )
 
         # Check if response is SSE
         if "text/event-stream" in r.headers.get("Content-Type", ""):
             streaming = True
+
+            async def finish_response():
+                ticket.release()
+                await cleanup_response(r)
+
+            async def body_iterator():
+                yield first_chunk
+                async for chunk in r.content.iter_any():
+                    yield chunk
+
             return StreamingResponse(
-                r.content,
+                aiter_sse_chunks(body_iterator()),
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(finish_response),
             )
         else:
+            body = first_chunk + await r.read()
             try:
-                response = await r.json()
+                response = json.loads(body)
             except Exception as e:
                 log.error(e)
-                response = await r.text()
+                response = body.decode("utf-8", "replace")
 
             if r.status >= 400:
                 if isinstance(response, (dict, list)):
@@ -918,6 +1062,8 @@ async def generate_chat_completion(
                     return PlainTextResponse(status_code=r.status, content=response)
 
             return response
+    except AdmissionCancelledError as e:
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         log.exception(e)
 
@@ -927,7 +1073,9 @@ async def generate_chat_completion(
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            if ticket:
+                ticket.release()
+            await cleanup_response(r)
 
 
 async def embeddings(request: Request, form_data: dict, user):
@@ -954,10 +1102,9 @@ async def embeddings(request: Request, form_data: dict, user):
     url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
     key = request.app.state.config.OPENAI_API_KEYS[idx]
     r = None
-    session = None
     streaming = False
     try:
-        session = aiohttp.ClientSession(trust_env=True)
+        session = http_client_pool.get_session(url)
         r = await session.request(
             method="POST",
             url=f"{url}/embeddings",
@@ -984,9 +1131,7 @@ async def embeddings(request: Request, form_data: dict, user):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1011,7 +1156,7 @@ async def embeddings(request: Request, form_data: dict, user):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
 
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
@@ -1033,7 +1178,6 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
     )
 
     r = None
-    session = None
     streaming = False
 
     try:
@@ -1065,7 +1209,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
             headers["Authorization"] = f"Bearer {key}"
             request_url = f"{url}/{path}"
 
-        session = aiohttp.ClientSession(trust_env=True)
+        session = http_client_pool.get_session(request_url)
         r = await session.request(
             method=request.method,
             url=request_url,
@@ -1081,9 +1225,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1109,4 +1251,4 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
@@ -9,7 +9,11 @@ from open_webui.models.prompts import (
 )
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_control import (
+    has_access,
+    has_permission,
+    get_user_group_ids,
+)
 from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
 
 router = APIRouter()
@@ -20,21 +24,25 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[PromptModel])
-async def get_prompts(user=Depends(get_verified_user)):
+async def get_prompts(request: Request, user=Depends(get_verified_user)):
     if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
         prompts = Prompts.get_prompts()
     else:
-        prompts = Prompts.get_prompts_by_user_id(user.id, "read")
+        prompts = Prompts.get_prompts_by_user_id(
+            user.id, "read", get_user_group_ids(user.id, request)
+        )
 
     return prompts
 
 
 @router.get("/list", response_model=list[PromptUserResponse])
-async def get_prompt_list(user=Depends(get_verified_user)):
+async def get_prompt_list(request: Request, user=Depends(get_verified_user)):
     if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
         prompts = Prompts.get_prompts()
     else:
-        prompts = Prompts.get_prompts_by_user_id(user.id, "write")
+        prompts = Prompts.get_prompts_by_user_id(
+            user.id, "write", get_user_group_ids(user.id, request)
+        )
 
     return prompts
 
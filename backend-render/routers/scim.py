@@ -17,6 +17,7 @@ from pydantic import BaseModel, Field, ConfigDict
 
 from open_webui.models.users import Users, UserModel
 from open_webui.models.groups import Groups, GroupModel
+from open_webui.utils.user_cache import user_cache
 from open_webui.utils.auth import (
     get_admin_user,
     get_current_user,
@@ -624,6 +625,7 @@ async def update_user(
 
     # Update user
     updated_user = Users.update_user_by_id(user_id, update_data)
+    user_cache.invalidate(user_id)
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -670,6 +672,7 @@ async def patch_user(
     # Update user
     if update_data:
         updated_user = Users.update_user_by_id(user_id, update_data)
+        user_cache.invalidate(user_id)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -696,6 +699,7 @@ async def delete_user(
         )
 
     success = Users.delete_user_by_id(user_id)
+    user_cache.invalidate(user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -18,7 +18,12 @@ from open_webui.models.tools import (
 from open_webui.utils.plugin import load_tool_module_by_id, replace_imports
 from open_webui.utils.tools import get_tool_specs
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_control import (
+    has_access,
+    has_permission,
+    filter_by_access,
+    get_user_group_ids,
+)
 from open_webui.utils.tools import get_tool_servers
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -71,13 +76,9 @@ async def get_tools(request: Request, user=Depends(get_verified_user)):
         # Admin can see all tools
         return tools
     else:
-        tools = [
-            tool
-            for tool in tools
-            if tool.user_id == user.id
-            or has_access(user.id, "read", tool.access_control)
-        ]
-        return tools
+        return filter_by_access(
+            user.id, "read", tools, get_user_group_ids(user.id, request)
+        )
 
 
 ############################
@@ -86,11 +87,13 @@ async def get_tools(request: Request, user=Depends(get_verified_user)):
 
 
 @router.get("/list", response_model=list[ToolUserResponse])
-async def get_tool_list(user=Depends(get_verified_user)):
+async def get_tool_list(request: Request, user=Depends(get_verified_user)):
     if user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL:
         tools = Tools.get_tools()
     else:
-        tools = Tools.get_tools_by_user_id(user.id, "write")
+        tools = Tools.get_tools_by_user_id(
+            user.id, "write", get_user_group_ids(user.id, request)
+        )
     return tools
 
 
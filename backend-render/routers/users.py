@@ -34,6 +34,7 @@ from open_webui.env import SRC_LOG_LEVELS, STATIC_DIR
 
 from open_webui.utils.auth import get_admin_user, get_password_hash, get_verified_user
 from open_webui.utils.access_control import get_permissions, has_permission
+from open_webui.utils.user_cache import user_cache
 
 
 log = logging.getLogger(__name__)
@@ -239,6 +240,7 @@ async def update_user_settings_by_session_user(
 
     user = Users.update_user_settings_by_id(user.id, updated_user_settings)
     if user:
+        user_cache.invalidate(user.id)
         return user.settings
     else:
         raise HTTPException(
@@ -280,6 +282,7 @@ async def update_user_info_by_session_user(
 
         user = Users.update_user_by_id(user.id, {"info": {**user.info, **form_data}})
         if user:
+            user_cache.invalidate(user.id)
             return user.info
         else:
             raise HTTPException(
@@ -448,6 +451,8 @@ async def update_user_by_id(
                 "profile_image_url": form_data.profile_image_url,
             },
         )
+        # Role changes must apply to the user's next request
+        user_cache.invalidate(user_id)
 
         if updated_user:
             return updated_user
@@ -487,6 +492,7 @@ async def delete_user_by_id(user_id: str, user=Depends(get_admin_user)):
 
     if user.id != user_id:
         result = Auths.delete_auth_by_id(user_id)
+        user_cache.invalidate(user_id)
 
         if result:
             return True
@@ -14,6 +14,15 @@ from open_webui.utils.misc import get_gravatar_url
 from open_webui.utils.pdf_generator import PDFGenerator
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.chat_save import chat_save_buffer
+from open_webui.utils.stream_flush import get_stream_flush_stats
+from open_webui.utils.http_client import http_client_pool
+from open_webui.utils.response_cache import response_cache
+from open_webui.utils.ollama_balancer import ollama_balancer
+from open_webui.utils.admission import admission_controller
+from open_webui.utils.model_catalog import model_catalog
+from open_webui.utils.user_cache import user_cache
+from open_webui.utils.activity import activity_tracker
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -28,6 +37,21 @@ async def get_gravatar(email: str, user=Depends(get_verified_user)):
     return get_gravatar_url(email)
 
 
+@router.get("/metrics")
+async def get_metrics(user=Depends(get_admin_user)):
+    return {
+        "chat_save": chat_save_buffer.get_stats(),
+        "stream_flush": get_stream_flush_stats(),
+        "http_client_pools": http_client_pool.get_stats(),
+        "response_cache": await response_cache.get_stats(),
+        "ollama_nodes": ollama_balancer.get_stats(),
+        "admission": admission_controller.get_stats(),
+        "model_catalog": model_catalog.get_stats(),
+        "user_cache": user_cache.get_stats(),
+        "user_activity": activity_tracker.get_stats(),
+    }
+
+
 class CodeForm(BaseModel):
     code: str
 
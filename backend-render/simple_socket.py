@@ -3,71 +3,245 @@ import asyncio
 from fastapi import FastAPI
 from starlette.applications import Starlette
 
+from open_webui.env import WEBSOCKET_MANAGER, WEBSOCKET_REDIS_URL
+from open_webui.utils.auth import decode_token
+from models.users import Users
+from models.chats import Chats
+from open_webui.utils.admission import admission_controller
+from open_webui.socket.main import STREAM_LOG, STREAM_POOL, get_delta_event_data
+
+# With several workers, rooms live in Redis so an emit from any worker reaches
+# sockets connected to the others
+if WEBSOCKET_MANAGER == "redis":
+    client_manager = socketio.AsyncRedisManager(WEBSOCKET_REDIS_URL)
+else:
+    client_manager = None
+
 # Create a simple Socket.IO server
 sio = socketio.AsyncServer(
     cors_allowed_origins=["http://localhost:6969", "http://127.0.0.1:6969"],
     async_mode="asgi",
     transports=["websocket", "polling"],
     allow_upgrades=True,
-    always_connect=True
+    always_connect=True,
+    client_manager=client_manager,
 )
 
 # Create the Socket.IO app
 socket_app = socketio.ASGIApp(sio)
 
+# Authenticated sessions: sid -> user id
+SESSION_USERS = {}
+
+
+def get_user_room(user_id):
+    return f"user:{user_id}"
+
+
+def get_chat_room(chat_id):
+    return f"chat:{chat_id}"
+
+
+def get_user_stream_room(user_id, stream_delta=False):
+    # Streaming updates go out as append-only delta frames to sessions that
+    # announced the "stream_delta" capability, and whole to the others
+    return f"user:{user_id}:{'delta' if stream_delta else 'content'}"
+
+
+async def authenticate(sid, auth):
+    """Resolve the auth token of a session and join the user's room"""
+    if not auth or "token" not in auth:
+        return None
+
+    data = decode_token(auth["token"])
+    if data is None or "id" not in data:
+        return None
+
+    user = Users.get_user_by_id(data["id"])
+    if not user:
+        return None
+
+    SESSION_USERS[sid] = user.id
+    await sio.enter_room(sid, get_user_room(user.id))
+    await sio.enter_room(
+        sid, get_user_stream_room(user.id, bool(auth.get("stream_delta")))
+    )
+    return user
+
 # Socket event handlers
 @sio.event
 async def connect(sid, environ, auth):
-    # Join client to default room for chat events
+    # Unauthenticated clients (e.g. the signin page) may connect, but only
+    # authenticated ones join a user room and receive chat events
     await sio.enter_room(sid, "default")
-    await sio.enter_room(sid, "chat")
+    await authenticate(sid, auth)
     await sio.emit("connected", {"data": "Connected to server"}, room=sid)
 
 @sio.event
 async def disconnect(sid):
-    # Client disconnected
-    pass
+    # Client disconnected, socketio drops its rooms
+    user_id = SESSION_USERS.pop(sid, None)
+
+    # The user's last tab is gone, their queued task work is abandoned. With
+    # several workers their other sessions may live elsewhere, so keep it.
+    if user_id and client_manager is None and user_id not in SESSION_USERS.values():
+        admission_controller.cancel(user_id=user_id)
 
 @sio.event
 async def join(sid, data):
-    # Client joined room
-    pass
+    # Join a chat room, only for chats owned by the session's user
+    user_id = SESSION_USERS.get(sid)
+    chat_id = data.get("chat_id") if isinstance(data, dict) else None
+    if not user_id or not chat_id:
+        return
+
+    if Chats.get_chat_by_id_and_user_id(chat_id, user_id):
+        await sio.enter_room(sid, get_chat_room(chat_id))
 
 @sio.event
 async def leave(sid, data):
-    # Client left room
-    pass
+    # Leave a chat room
+    chat_id = data.get("chat_id") if isinstance(data, dict) else None
+    if chat_id:
+        await sio.leave_room(sid, get_chat_room(chat_id))
 
 @sio.event
 async def chat_message(sid, data):
     # Chat message received
     pass
 
-@sio.event
+@sio.on("user-join")
 async def user_join(sid, data):
-    # User join event
-    pass
+    # Late authentication, e.g. after signing in on an open socket
+    auth = data.get("auth") if isinstance(data, dict) else None
+    user = await authenticate(sid, auth)
+    if user:
+        return {"id": user.id, "name": user.name}
 
 @sio.event
 async def chat_events(sid, data):
     # Chat events received
     pass
 
+@sio.on("chat:message:resync")
+async def chat_message_resync(sid, data):
+    """
+    Clients that receive delta frames report the sequence number and content
+    length they applied when a frame doesn't line up. If either is out of
+    step with the stream, the full content is re-sent to that session.
+    """
+    user_id = SESSION_USERS.get(sid)
+    if not user_id or not isinstance(data, dict):
+        return {"status": False}
+
+    chat_id = data.get("chat_id")
+    message_id = data.get("message_id")
+
+    stream = await STREAM_POOL.get(f"{chat_id}:{message_id}")
+    if not stream or stream["user_id"] != user_id:
+        return {"status": False}
+
+    if data.get("seq") == stream["seq"] and data.get("length") == stream["length"]:
+        return {"status": True, "seq": stream["seq"]}
+
+    await sio.emit("chat-events", {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "data": {
+            "type": "chat:completion",
+            "data": {
+                "content": stream["content"],
+                "seq": stream["seq"],
+            }
+        }
+    }, to=sid)
+    return {"status": True, "seq": stream["seq"], "resync": True}
+
+@sio.on("chat:message:replay")
+async def chat_message_replay(sid, data):
+    """
+    Return the content frames emitted for a message after the sequence
+    number the client last applied, so a reconnecting client can catch up
+    without starting a new completion.
+    """
+    user_id = SESSION_USERS.get(sid)
+    if not user_id or not isinstance(data, dict):
+        return {"status": False}
+
+    stream_id = f"{data.get('chat_id')}:{data.get('message_id')}"
+    if await STREAM_LOG.get_user_id(stream_id) != user_id:
+        return {"status": False}
+
+    try:
+        after_seq = int(data.get("seq") or 0)
+    except (TypeError, ValueError):
+        after_seq = 0
+
+    events = await STREAM_LOG.get_events(stream_id, after_seq)
+    if events and events[0][0] != after_seq + 1:
+        # The log was trimmed past the client's position
+        return {"status": False, "seq": events[-1][0]}
+
+    return {
+        "status": True,
+        "seq": events[-1][0] if events else after_seq,
+        "events": [event for _, event in events],
+    }
+
 # Function to emit chat events (called from main.py)
-async def emit_chat_event(event_type, data, room="chat"):
-    """Emit chat events to connected clients"""
+async def emit_chat_event(event_type, data, user_id=None, room=None):
+    """Emit chat events to the sessions of the owning user (or an explicit room)"""
+    room = room or (get_user_room(user_id) if user_id else None)
+    if not room:
+        # Never broadcast chat content to every connected client
+        return
+
     try:
         await sio.emit(event_type, data, room=room)
     except Exception as e:
         pass
 
+def get_stream_emitter(chat_id, message_id, user_id):
+    """
+    Emitter for the streaming "chat:completion" updates of one message.
+    Delta-capable sessions get append-only frames computed against
+    STREAM_POOL, so they can resync; the others get the whole content.
+    Sequenced frames are logged to STREAM_LOG for replay on reconnect.
+    """
+    request_info = {"chat_id": chat_id, "message_id": message_id, "user_id": user_id}
+
+    async def emit(event_data):
+        if not user_id:
+            # Never broadcast chat content to every connected client
+            return
+
+        delta_event_data = await get_delta_event_data(request_info, event_data)
+
+        emits = [emit_chat_event("chat-events", {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "data": event_data,
+        }, room=get_user_stream_room(user_id))]
+        if delta_event_data is not None:
+            emits.append(emit_chat_event("chat-events", {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "data": delta_event_data,
+            }, room=get_user_stream_room(user_id, stream_delta=True)))
+
+            seq = (delta_event_data.get("data") or {}).get("seq")
+            if seq is not None:
+                emits.append(STREAM_LOG.append(
+                    f"{chat_id}:{message_id}", user_id, seq, delta_event_data
+                ))
+        await asyncio.gather(*emits)
+
+    return emit
+
 # Function to emit chat-events (for compatibility with existing code)
-async def emit_chat_events(data, room="chat"):
-    """Emit chat-events to connected clients"""
-    try:
-        await sio.emit("chat-events", data, room=room)
-    except Exception as e:
-        pass
+async def emit_chat_events(data, user_id=None, room=None):
+    """Emit chat-events to the sessions of the owning user (or an explicit room)"""
+    await emit_chat_event("chat-events", data, user_id=user_id, room=room)
 
 # Function to get connected clients
 async def get_connected_clients():
@@ -75,4 +249,4 @@ async def get_connected_clients():
     return list(sio.rooms.keys())
 
 # Export the socket app for mounting in main.py
-__all__ = ["socket_app", "emit_chat_event", "emit_chat_events", "get_connected_clients"]
+__all__ = ["socket_app", "emit_chat_event", "emit_chat_events", "get_stream_emitter", "get_connected_clients"]
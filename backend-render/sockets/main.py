@@ -27,9 +27,17 @@ from open_webui.env import (
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
     REDIS_KEY_PREFIX,
+    CHAT_STREAM_REPLAY_MAX_EVENTS,
+    CHAT_STREAM_REPLAY_TTL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.socket.utils import (
+    RedisDict,
+    RedisLock,
+    YdocManager,
+    StreamLog,
+    StreamPool,
+)
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_access, get_users_with_access
@@ -112,6 +120,12 @@ if WEBSOCKET_MANAGER == "redis":
         redis_sentinels=redis_sentinels,
         redis_cluster=WEBSOCKET_REDIS_CLUSTER,
     )
+    DELTA_SESSION_POOL = RedisDict(
+        f"{REDIS_KEY_PREFIX}:delta_session_pool",
+        redis_url=WEBSOCKET_REDIS_URL,
+        redis_sentinels=redis_sentinels,
+        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+    )
 
     clean_up_lock = RedisLock(
         redis_url=WEBSOCKET_REDIS_URL,
@@ -127,15 +141,35 @@ else:
     SESSION_POOL = {}
     USER_POOL = {}
     USAGE_POOL = {}
+    DELTA_SESSION_POOL = {}
 
     aquire_func = release_func = renew_func = lambda: True
 
 
+# Last streamed content per "{chat_id}:{message_id}", kept by the worker that
+# runs the stream so delta frames can be computed, and shared through Redis so
+# resyncs can be answered by any worker.
+STREAM_POOL = StreamPool(
+    redis=REDIS,
+    redis_key_prefix=f"{REDIS_KEY_PREFIX}:chat:stream_pool",
+    ttl=CHAT_STREAM_REPLAY_TTL,
+)
+
+
 YDOC_MANAGER = YdocManager(
     redis=REDIS,
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
 )
 
+# Sequenced content frames per "{chat_id}:{message_id}", replayed to clients
+# that reconnect while the message is still streaming.
+STREAM_LOG = StreamLog(
+    redis=REDIS,
+    redis_key_prefix=f"{REDIS_KEY_PREFIX}:chat:streams",
+    max_events=CHAT_STREAM_REPLAY_MAX_EVENTS,
+    ttl=CHAT_STREAM_REPLAY_TTL,
+)
+
 
 async def periodic_usage_pool_cleanup():
     max_retries = 2
@@ -273,6 +307,9 @@ async def connect(sid, environ, auth):
                 USER_POOL[user.id] = USER_POOL[user.id] + [sid]
             else:
                 USER_POOL[user.id] = [sid]
+
+            if auth.get("stream_delta"):
+                DELTA_SESSION_POOL[sid] = True
     
     # Allow unauthenticated connections (e.g., for signin page)
     # This prevents 403 Forbidden errors on initial page load
@@ -300,6 +337,9 @@ async def user_join(sid, data):
     else:
         USER_POOL[user.id] = [sid]
 
+    if auth.get("stream_delta"):
+        DELTA_SESSION_POOL[sid] = True
+
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
     log.debug(f"{channels=}")
@@ -636,12 +676,155 @@ async def disconnect(sid):
         if len(USER_POOL[user_id]) == 0:
             del USER_POOL[user_id]
 
+        if sid in DELTA_SESSION_POOL:
+            del DELTA_SESSION_POOL[sid]
+
         await YDOC_MANAGER.remove_user_from_all_documents(sid)
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
 
 
+@sio.on("chat:message:resync")
+async def chat_message_resync(sid, data):
+    """
+    Clients that receive delta frames periodically report the last sequence
+    number and content length they applied. If either is out of step with
+    the stream, the full content is re-sent to that session.
+    """
+    user = SESSION_POOL.get(sid)
+    if not user:
+        return
+
+    chat_id = data.get("chat_id")
+    message_id = data.get("message_id")
+
+    stream = await STREAM_POOL.get(f"{chat_id}:{message_id}")
+    if not stream or stream["user_id"] != user["id"]:
+        return {"status": False}
+
+    if data.get("seq") == stream["seq"] and data.get("length") == stream["length"]:
+        return {"status": True, "seq": stream["seq"]}
+
+    await sio.emit(
+        "chat-events",
+        {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "data": {
+                "type": "chat:completion",
+                "data": {
+                    "content": stream["content"],
+                    "seq": stream["seq"],
+                },
+            },
+        },
+        to=sid,
+    )
+    return {"status": True, "seq": stream["seq"], "resync": True}
+
+
+@sio.on("chat:message:replay")
+async def chat_message_replay(sid, data):
+    """
+    Return the content frames emitted for a message after the sequence
+    number the client last applied, so a reconnecting client can catch up
+    without starting a new completion.
+    """
+    user = SESSION_POOL.get(sid)
+    if not user:
+        return {"status": False}
+
+    stream_id = f"{data.get('chat_id')}:{data.get('message_id')}"
+    if await STREAM_LOG.get_user_id(stream_id) != user["id"]:
+        return {"status": False}
+
+    try:
+        after_seq = int(data.get("seq") or 0)
+    except (TypeError, ValueError):
+        after_seq = 0
+
+    events = await STREAM_LOG.get_events(stream_id, after_seq)
+    if events and events[0][0] != after_seq + 1:
+        # The log was trimmed past the client's position
+        return {"status": False, "seq": events[-1][0]}
+
+    return {
+        "status": True,
+        "seq": events[-1][0] if events else after_seq,
+        "events": [event for _, event in events],
+    }
+
+
+def get_utf16_length(text):
+    # Offsets are reported in UTF-16 code units to match JS string length
+    return len(text.encode("utf-16-le")) // 2
+
+
+async def get_delta_event_data(request_info, event_data):
+    """
+    Convert a streaming "chat:completion" content update into an append-only
+    "chat:message:delta" frame. Returns the event to send to delta-capable
+    sessions, or None when there is nothing new to send them.
+    """
+    stream_key = f"{request_info.get('chat_id')}:{request_info.get('message_id')}"
+
+    if event_data.get("type") == "task-cancelled":
+        await STREAM_POOL.pop(stream_key)
+        return event_data
+
+    if event_data.get("type") != "chat:completion":
+        return event_data
+
+    data = event_data.get("data")
+    if not isinstance(data, dict) or not isinstance(data.get("content"), str):
+        return event_data
+
+    stream = STREAM_POOL.get_local(stream_key)
+
+    content = data["content"]
+    previous_content = stream["content"] if stream else ""
+    seq = (stream["seq"] if stream else 0) + 1
+
+    if data.get("done"):
+        await STREAM_POOL.pop(stream_key)
+        return {**event_data, "data": {**data, "seq": seq}}
+
+    if data.keys() == {"content"} and content.startswith(previous_content):
+        appended_content = content[len(previous_content) :]
+        if not appended_content:
+            return None
+
+        offset = stream["length"] if stream else 0
+        delta_event_data = {
+            "type": "chat:message:delta",
+            "data": {
+                "index": event_data.get("index", 0),
+                "offset": offset,
+                "content": appended_content,
+                "seq": seq,
+            },
+        }
+        length = offset + get_utf16_length(appended_content)
+    else:
+        appended_content = None
+        # Already rendered content changed (e.g. a block was closed), send it whole
+        delta_event_data = {**event_data, "data": {**data, "seq": seq}}
+        length = get_utf16_length(content)
+
+    await STREAM_POOL.set(
+        stream_key,
+        {
+            "user_id": request_info["user_id"],
+            "content": content,
+            "length": length,
+            "seq": seq,
+        },
+        appended=appended_content,
+    )
+    return delta_event_data
+
+
 def get_event_emitter(request_info, update_db=True):
     async def __event_emitter__(event_data):
         user_id = request_info["user_id"]
@@ -657,19 +840,46 @@ def get_event_emitter(request_info, update_db=True):
             )
         )
 
+        delta_session_ids = [
+            session_id
+            for session_id in session_ids
+            if session_id in DELTA_SESSION_POOL
+        ]
+        delta_event_data = await get_delta_event_data(request_info, event_data)
+
         emit_tasks = [
             sio.emit(
                 "chat-events",
                 {
                     "chat_id": request_info.get("chat_id", None),
                     "message_id": request_info.get("message_id", None),
-                    "data": event_data,
+                    "data": (
+                        delta_event_data
+                        if session_id in delta_session_ids
+                        else event_data
+                    ),
                 },
                 to=session_id,
             )
             for session_id in session_ids
+            if session_id not in delta_session_ids or delta_event_data is not None
         ]
 
+        seq = (
+            delta_event_data.get("data", {}).get("seq")
+            if delta_event_data and isinstance(delta_event_data.get("data"), dict)
+            else None
+        )
+        if seq is not None:
+            emit_tasks.append(
+                STREAM_LOG.append(
+                    f"{request_info.get('chat_id')}:{request_info.get('message_id')}",
+                    user_id,
+                    seq,
+                    delta_event_data,
+                )
+            )
+
         await asyncio.gather(*emit_tasks)
 
         if update_db:
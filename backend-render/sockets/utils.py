@@ -1,10 +1,15 @@
 import json
+import logging
+import time
 import uuid
+from collections import OrderedDict, deque
 from open_webui.utils.redis import get_redis_connection
 from open_webui.env import REDIS_KEY_PREFIX
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
+log = logging.getLogger(__name__)
+
 
 class RedisLock:
     def __init__(
@@ -212,3 +217,189 @@ class YdocManager:
                 del self._updates[document_id]
             if document_id in self._users:
                 del self._users[document_id]
+
+
+class StreamLog:
+    """
+    Bounded log of the events emitted for each streaming message, so that a
+    client reconnecting mid-answer can replay everything after the last
+    sequence number it applied.
+
+    With Redis every stream is a Redis stream whose entry ids are the event
+    sequence numbers, trimmed to `max_events` and expiring after `ttl`
+    seconds of inactivity. Otherwise a ring buffer per stream is kept in
+    process, bounded to `max_streams` streams.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:chat:streams",
+        max_events: int = 2000,
+        ttl: int = 300,
+        max_streams: int = 1000,
+    ):
+        self._redis = redis
+        self._redis_key_prefix = redis_key_prefix
+        self.max_events = max_events
+        self.ttl = ttl
+        self.max_streams = max_streams
+
+        self._streams = OrderedDict()
+
+    def _get_stream(self, stream_id: str):
+        stream = self._streams.get(stream_id)
+        if stream and stream["expires_at"] < time.monotonic():
+            del self._streams[stream_id]
+            return None
+        return stream
+
+    async def append(self, stream_id: str, user_id: str, seq: int, event: dict):
+        if self._redis:
+            redis_key = f"{self._redis_key_prefix}:{stream_id}"
+            pipe = self._redis.pipeline()
+            if seq == 1:
+                # A new stream for the same message (e.g. regenerate)
+                pipe.delete(redis_key)
+            pipe.xadd(
+                redis_key,
+                {"event": json.dumps(event)},
+                id=f"{seq}-0",
+                maxlen=self.max_events,
+                approximate=True,
+            )
+            pipe.expire(redis_key, self.ttl)
+            pipe.set(f"{redis_key}:user", user_id, ex=self.ttl)
+            try:
+                await pipe.execute()
+            except Exception as e:
+                # Replay is best effort, never break the live stream over it
+                log.warning(f"Failed to append to stream log {stream_id}: {e}")
+        else:
+            stream = self._get_stream(stream_id)
+            if stream is None or seq == 1:
+                stream = {
+                    "user_id": user_id,
+                    "events": deque(maxlen=self.max_events),
+                }
+                self._streams[stream_id] = stream
+
+            stream["events"].append((seq, event))
+            stream["expires_at"] = time.monotonic() + self.ttl
+            self._streams.move_to_end(stream_id)
+
+            while len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+
+    async def get_user_id(self, stream_id: str) -> Optional[str]:
+        if self._redis:
+            redis_key = f"{self._redis_key_prefix}:{stream_id}"
+            return await self._redis.get(f"{redis_key}:user")
+        else:
+            stream = self._get_stream(stream_id)
+            return stream["user_id"] if stream else None
+
+    async def get_events(self, stream_id: str, after_seq: int) -> List[Tuple[int, dict]]:
+        """Return the (seq, event) pairs logged after `after_seq`, oldest first."""
+        if self._redis:
+            redis_key = f"{self._redis_key_prefix}:{stream_id}"
+            entries = await self._redis.xrange(redis_key, min=f"{after_seq + 1}-0")
+            return [
+                (int(entry_id.split("-")[0]), json.loads(fields["event"]))
+                for entry_id, fields in entries
+            ]
+        else:
+            stream = self._get_stream(stream_id)
+            if stream is None:
+                return []
+            return [(seq, event) for seq, event in stream["events"] if seq > after_seq]
+
+
+class StreamPool:
+    """
+    Last streamed content of each message, used to compute delta frames and
+    to answer resyncs.
+
+    The worker running a stream keeps its state in process. With Redis the
+    state is mirrored, appending only the new content on each delta, so a
+    client whose resync lands on another worker still gets an answer.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:chat:stream_pool",
+        ttl: int = 300,
+    ):
+        self._redis = redis
+        self._redis_key_prefix = redis_key_prefix
+        self.ttl = ttl
+
+        self._streams = {}
+        # Streams whose mirror missed a write and must be rewritten whole
+        self._unsynced = set()
+
+    def get_local(self, stream_id: str) -> Optional[dict]:
+        return self._streams.get(stream_id)
+
+    async def set(self, stream_id: str, state: dict, appended: Optional[str] = None):
+        self._streams[stream_id] = state
+        if not self._redis:
+            return
+
+        redis_key = f"{self._redis_key_prefix}:{stream_id}"
+        pipe = self._redis.pipeline()
+        if appended is not None and stream_id not in self._unsynced:
+            pipe.append(f"{redis_key}:content", appended)
+        else:
+            pipe.set(f"{redis_key}:content", state["content"])
+        pipe.hset(
+            redis_key,
+            mapping={
+                "user_id": state["user_id"],
+                "length": state["length"],
+                "seq": state["seq"],
+            },
+        )
+        pipe.expire(f"{redis_key}:content", self.ttl)
+        pipe.expire(redis_key, self.ttl)
+        try:
+            await pipe.execute()
+            self._unsynced.discard(stream_id)
+        except Exception as e:
+            # Resync from other workers is best effort, never break the stream
+            self._unsynced.add(stream_id)
+            log.warning(f"Failed to mirror stream state {stream_id}: {e}")
+
+    async def pop(self, stream_id: str):
+        self._streams.pop(stream_id, None)
+        self._unsynced.discard(stream_id)
+        if not self._redis:
+            return
+
+        redis_key = f"{self._redis_key_prefix}:{stream_id}"
+        try:
+            await self._redis.delete(redis_key, f"{redis_key}:content")
+        except Exception as e:
+            log.warning(f"Failed to remove stream state {stream_id}: {e}")
+
+    async def get(self, stream_id: str) -> Optional[dict]:
+        """The stream's state, from this worker or from the one running it."""
+        state = self._streams.get(stream_id)
+        if state is not None or not self._redis:
+            return state
+
+        redis_key = f"{self._redis_key_prefix}:{stream_id}"
+        pipe = self._redis.pipeline()
+        pipe.hgetall(redis_key)
+        pipe.get(f"{redis_key}:content")
+        meta, content = await pipe.execute()
+        if not meta:
+            return None
+
+        return {
+            "user_id": meta["user_id"],
+            "content": content or "",
+            "length": int(meta["length"]),
+            "seq": int(meta["seq"]),
+        }
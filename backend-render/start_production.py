@@ -24,25 +24,62 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def get_loop_and_http():
+    """Use uvloop and httptools when installed (uvicorn[standard])."""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+    
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "auto"
+    
+    return loop, http
+
 def main():
     """Main production startup function."""
     try:
-        # Import and start the FastAPI app
-        from main import app
+        from open_webui.env import (
+            UVICORN_WORKERS,
+            GRACEFUL_SHUTDOWN_TIMEOUT,
+            WEBSOCKET_MANAGER,
+        )
         
         # Get port from environment
         port = int(os.getenv("PORT", 8000))
         host = os.getenv("HOST", "0.0.0.0")
+        workers = max(UVICORN_WORKERS, 1)
+        loop, http = get_loop_and_http()
         
         logger.info(f"Starting OpenWebUI backend on {host}:{port}")
         logger.info(f"Environment: {os.getenv('ENV', 'production')}")
+        logger.info(f"Workers: {workers} (loop={loop}, http={http})")
+        
+        if workers > 1 and WEBSOCKET_MANAGER != "redis":
+            # Socket.IO rooms, config changes and cache invalidations would
+            # stay local to the worker that made them
+            logger.warning(
+                "Running multiple workers without WEBSOCKET_MANAGER=redis; "
+                "socket events and settings will not be shared between workers"
+            )
         
-        # Import uvicorn and run
+        # Import uvicorn and run. Workers are separate processes, so the app
+        # is passed as an import string and loaded by each of them
         import uvicorn
         uvicorn.run(
             "main:app",
             host=host,
             port=port,
+            workers=workers,
+            loop=loop,
+            http=http,
+            # On SIGTERM stop accepting connections and let in-flight
+            # requests and streams finish before shutting down
+            timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
             log_level="info",
             access_log=True
         )
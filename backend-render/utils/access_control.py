@@ -1,4 +1,6 @@
 from typing import Optional, Union, List, Dict, Any
+from fastapi import Request
+
 from open_webui.models.users import Users, UserModel
 from open_webui.models.groups import Groups
 
@@ -105,16 +107,34 @@ def has_permission(
     return get_permission(default_permissions, permission_hierarchy)
 
 
+def get_user_group_ids(user_id: str, request: Optional[Request] = None) -> set[str]:
+    """
+    Ids of the groups the user is a member of. With a request, they are looked
+    up once and kept in the request state for the checks that follow.
+    """
+    if request is None:
+        return set(Groups.get_group_ids_by_member_id(user_id))
+
+    user_group_ids = getattr(request.state, "user_group_ids", None)
+    if user_group_ids is None:
+        user_group_ids = request.state.user_group_ids = {}
+
+    if user_id not in user_group_ids:
+        user_group_ids[user_id] = set(Groups.get_group_ids_by_member_id(user_id))
+    return user_group_ids[user_id]
+
+
 def has_access(
     user_id: str,
     type: str = "write",
     access_control: Optional[dict] = None,
+    user_group_ids: Optional[set[str]] = None,
 ) -> bool:
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    if user_group_ids is None:
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
@@ -124,6 +144,57 @@ def has_access(
     )
 
 
+def has_access_list(
+    user_id: str,
+    type: str = "write",
+    access_controls: List[Optional[dict]] = [],
+    user_group_ids: Optional[set[str]] = None,
+) -> List[bool]:
+    """
+    `has_access` for many resources at once. The user's groups are looked up
+    once (and only if some resource is shared with groups), then every
+    access control is checked against them in a single pass.
+    """
+    results = []
+    for access_control in access_controls:
+        if access_control is None:
+            results.append(type == "read")
+            continue
+
+        permission_access = access_control.get(type, {})
+        if user_id in permission_access.get("user_ids", []):
+            results.append(True)
+            continue
+
+        permitted_group_ids = permission_access.get("group_ids", [])
+        if not permitted_group_ids:
+            results.append(False)
+            continue
+
+        if user_group_ids is None:
+            user_group_ids = set(Groups.get_group_ids_by_member_id(user_id))
+        results.append(not user_group_ids.isdisjoint(permitted_group_ids))
+
+    return results
+
+
+def filter_by_access(
+    user_id: str,
+    type: str = "write",
+    items: list = [],
+    user_group_ids: Optional[set[str]] = None,
+) -> list:
+    """Resources (with `user_id` and `access_control`) the user owns or has access to."""
+    access = has_access_list(
+        user_id, type, [item.access_control for item in items], user_group_ids
+    )
+    return [
+        item
+        for item, allowed in zip(items, access)
+        if allowed or item.user_id == user_id
+    ]
+
+
 # Get all users with access to a resource
 def get_users_with_access(
     type: str = "write", access_control: Optional[dict] = None
@@ -136,10 +207,6 @@ def get_users_with_access(
     permitted_user_ids = permission_access.get("user_ids", [])
 
     user_ids_with_access = set(permitted_user_ids)
-
-    for group_id in permitted_group_ids:
-        group_user_ids = Groups.get_group_user_ids_by_id(group_id)
-        if group_user_ids:
-            user_ids_with_access.update(group_user_ids)
+    user_ids_with_access.update(Groups.get_user_ids_by_group_ids(permitted_group_ids))
 
     return Users.get_users_by_user_ids(list(user_ids_with_access))
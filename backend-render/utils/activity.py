@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from open_webui.models.users import Users
+from open_webui.env import SRC_LOG_LEVELS, USER_ACTIVITY_FLUSH_INTERVAL
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ActivityTracker:
+    """
+    Write-behind tracker of users' last_active_at.
+
+    Authenticated requests only record the time in memory; every `interval`
+    seconds the pending timestamps are written with one bulk UPDATE. A user
+    seen many times within a window is written once, with the latest time,
+    so database writes depend on the number of active users rather than on
+    the request rate.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+        self._pending: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "touches": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "users_written": 0,
+            "flush_time_max_ms": 0.0,
+        }
+
+    def touch(self, user_id: str):
+        # Called from request threads while flush() runs in a worker thread
+        with self._lock:
+            self._pending[user_id] = int(time.time())
+            self.stats["touches"] += 1
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        start_time = time.perf_counter()
+        try:
+            Users.update_users_last_active_by_ids(pending)
+        except Exception as e:
+            self.stats["flush_errors"] += 1
+            log.warning(f"Error writing last active times: {e}")
+            # Retry with the next flush, unless the user was seen again since
+            with self._lock:
+                for user_id, timestamp in pending.items():
+                    self._pending.setdefault(user_id, timestamp)
+            return
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stats["flushes"] += 1
+        self.stats["users_written"] += len(pending)
+        self.stats["flush_time_max_ms"] = max(
+            self.stats["flush_time_max_ms"], elapsed_ms
+        )
+
+    async def _periodic_flush(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.flush)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._periodic_flush())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": len(self._pending)}
+
+
+activity_tracker = ActivityTracker(USER_ACTIVITY_FLUSH_INTERVAL)
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    ADMISSION_MAX_CONCURRENCY,
+    ADMISSION_TOKENS_PER_MINUTE,
+    ADMISSION_TASK_LANE_SHARE,
+    ADMISSION_PROVIDER_LIMITS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+INTERACTIVE = "interactive"
+TASK = "task"
+
+
+class AdmissionCancelledError(Exception):
+    """Raised to a queued request that was cancelled before it was admitted."""
+
+
+def estimate_tokens(payload: dict) -> int:
+    """Rough token cost of a completion: ~4 characters per prompt token plus the output limit."""
+    prompt = payload.get("messages", payload.get("prompt", ""))
+    prompt_tokens = len(json.dumps(prompt)) // 4
+    max_tokens = (
+        payload.get("max_completion_tokens")
+        or payload.get("max_tokens")
+        or (payload.get("options") or {}).get("num_predict")
+        or 0
+    )
+    return prompt_tokens + max(int(max_tokens), 0)
+
+
+class AdmissionTicket:
+    def __init__(self, governor: "ProviderGovernor", lane: str):
+        self.governor = governor
+        self.lane = lane
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.governor.release(self)
+
+
+class Waiter:
+    __slots__ = ("future", "lane", "tokens", "chat_id", "user_id", "enqueued_at")
+
+    def __init__(self, lane, tokens, chat_id, user_id):
+        self.future = asyncio.get_running_loop().create_future()
+        self.lane = lane
+        self.tokens = tokens
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.enqueued_at = time.monotonic()
+
+
+class ProviderGovernor:
+    """
+    Admission for one provider: at most `max_concurrency` requests in flight
+    and `tokens_per_minute` estimated tokens (a token bucket refilled
+    continuously). Zero disables a limit.
+
+    Queued interactive requests are always admitted before queued task
+    requests, and task requests may only take `task_share` of the slots, so
+    a burst of background work never holds every slot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        task_share: float,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_task_concurrency = (
+            max(int(max_concurrency * task_share), 1) if max_concurrency else 0
+        )
+
+        self.tokens = float(tokens_per_minute)
+        self.refilled_at = time.monotonic()
+
+        self.active = {INTERACTIVE: 0, TASK: 0}
+        self.queues = {INTERACTIVE: deque(), TASK: deque()}
+        self._retry_handle = None
+
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "cancelled": 0,
+            "wait_time_total_ms": 0.0,
+            "wait_time_max_ms": 0.0,
+        }
+
+    def _refill(self):
+        if not self.tokens_per_minute:
+            return
+        now = time.monotonic()
+        self.tokens = min(
+            self.tokens + (now - self.refilled_at) * self.tokens_per_minute / 60,
+            self.tokens_per_minute,
+        )
+        self.refilled_at = now
+
+    def _has_slot(self, lane: str) -> bool:
+        if not self.max_concurrency:
+            return True
+        if sum(self.active.values()) >= self.max_concurrency:
+            return False
+        return lane == INTERACTIVE or self.active[TASK] < self.max_task_concurrency
+
+    def _has_tokens(self, tokens: int) -> bool:
+        if not self.tokens_per_minute:
+            return True
+        # Requests larger than the whole budget go through once it is full
+        return self.tokens >= min(tokens, self.tokens_per_minute)
+
+    def _admit(self, lane: str, tokens: int) -> AdmissionTicket:
+        self.active[lane] += 1
+        if self.tokens_per_minute:
+            self.tokens -= tokens
+        self.stats["admitted"] += 1
+        return AdmissionTicket(self, lane)
+
+    def _dispatch(self):
+        self._retry_handle = None
+        self._refill()
+
+        for lane in (INTERACTIVE, TASK):
+            queue = self.queues[lane]
+            while queue:
+                waiter = queue[0]
+                if waiter.future.done():
+                    queue.popleft()
+                    continue
+                if not self._has_slot(lane):
+                    break
+                if not self._has_tokens(waiter.tokens):
+                    self._schedule_retry(waiter.tokens)
+                    # Task work must not overtake an interactive request
+                    # that waits for budget
+                    return
+
+                queue.popleft()
+                wait_time_ms = (time.monotonic() - waiter.enqueued_at) * 1000
+                self.stats["wait_time_total_ms"] += wait_time_ms
+                self.stats["wait_time_max_ms"] = max(
+                    self.stats["wait_time_max_ms"], wait_time_ms
+                )
+                waiter.future.set_result(self._admit(lane, waiter.tokens))
+
+            if queue and lane == INTERACTIVE:
+                # Interactive requests are still waiting for a slot
+                return
+
+    def _schedule_retry(self, tokens: int):
+        if self._retry_handle is not None:
+            return
+        missing = min(tokens, self.tokens_per_minute) - self.tokens
+        delay = max(missing * 60 / self.tokens_per_minute, 0.01)
+        self._retry_handle = asyncio.get_running_loop().call_later(
+            delay, self._dispatch
+        )
+
+    async def acquire(
+        self,
+        lane: str,
+        tokens: int,
+        chat_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> AdmissionTicket:
+        self._refill()
+        if (
+            not self.queues[INTERACTIVE]
+            and (lane == INTERACTIVE or not self.queues[TASK])
+            and self._has_slot(lane)
+            and self._has_tokens(tokens)
+        ):
+            return self._admit(lane, tokens)
+
+        waiter = Waiter(lane, tokens, chat_id, user_id)
+        self.queues[lane].append(waiter)
+        self.stats["queued"] += 1
+        self._dispatch()
+
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted right as the caller went away
+                waiter.future.result().release()
+            raise
+
+    def release(self, ticket: AdmissionTicket):
+        self.active[ticket.lane] -= 1
+        self._dispatch()
+
+    def cancel(self, chat_id: Optional[str] = None, user_id: Optional[str] = None):
+        """Cancel queued task work of an abandoned chat (or of a user who left)."""
+        cancelled = 0
+        queue = self.queues[TASK]
+        for waiter in list(queue):
+            if waiter.future.done():
+                continue
+            if (chat_id and waiter.chat_id == chat_id) or (
+                user_id and waiter.user_id == user_id
+            ):
+                queue.remove(waiter)
+                waiter.future.set_exception(
+                    AdmissionCancelledError("Cancelled, the chat was abandoned")
+                )
+                cancelled += 1
+
+        self.stats["cancelled"] += cancelled
+        if cancelled:
+            self._dispatch()
+        return cancelled
+
+    def get_stats(self) -> dict:
+        self._refill()
+        return {
+            **self.stats,
+            "max_concurrency": self.max_concurrency,
+            "max_task_concurrency": self.max_task_concurrency,
+            "tokens_per_minute": self.tokens_per_minute,
+            "tokens_available": (int(self.tokens) if self.tokens_per_minute else None),
+            "active": dict(self.active),
+            "queue_depth": {lane: len(queue) for lane, queue in self.queues.items()},
+        }
+
+
+class AdmissionController:
+    """
+    Per-provider admission for outbound completion calls, with a
+    high-priority interactive lane and a low-priority task lane.
+
+    Providers are keyed by upstream origin. Limits default to
+    ADMISSION_MAX_CONCURRENCY / ADMISSION_TOKENS_PER_MINUTE and can be set
+    per provider in ADMISSION_PROVIDER_LIMITS, e.g.
+    {"https://api.openai.com": {"max_concurrency": 32, "tokens_per_minute": 200000}}
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        task_share: float,
+        provider_limits: dict,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.task_share = task_share
+        self.provider_limits = provider_limits
+
+        self.governors: dict[str, ProviderGovernor] = {}
+
+    def get_governor(self, provider: str) -> ProviderGovernor:
+        if provider not in self.governors:
+            limits = self.provider_limits.get(provider, {})
+            self.governors[provider] = ProviderGovernor(
+                provider,
+                limits.get("max_concurrency", self.max_concurrency),
+                limits.get("tokens_per_minute", self.tokens_per_minute),
+                limits.get("task_share", self.task_share),
+            )
+        return self.governors[provider]
+
+    async def acquire(
+        self,
+        provider: str,
+        lane: str = INTERACTIVE,
+        tokens: int = 0,
+        chat_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> AdmissionTicket:
+        return await self.get_governor(provider).acquire(
+            lane, tokens, chat_id=chat_id, user_id=user_id
+        )
+
+    @asynccontextmanager
+    async def admit(self, provider: str, **kwargs):
+        ticket = await self.acquire(provider, **kwargs)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def cancel(self, chat_id: Optional[str] = None, user_id: Optional[str] = None):
+        return sum(
+            governor.cancel(chat_id=chat_id, user_id=user_id)
+            for governor in self.governors.values()
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            provider: governor.get_stats()
+            for provider, governor in self.governors.items()
+        }
+
+
+def get_lane(metadata: Optional[dict]) -> str:
+    return TASK if metadata and metadata.get("task") else INTERACTIVE
+
+
+admission_controller = AdmissionController(
+    ADMISSION_MAX_CONCURRENCY,
+    ADMISSION_TOKENS_PER_MINUTE,
+    ADMISSION_TASK_LANE_SHARE,
+    ADMISSION_PROVIDER_LIMITS,
+)
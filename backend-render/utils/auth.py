@@ -22,6 +22,8 @@ from typing import Optional, Union, List, Dict
 from opentelemetry import trace
 
 from open_webui.models.users import Users
+from open_webui.utils.user_cache import user_cache
+from open_webui.utils.activity import activity_tracker
 
 from open_webui.constants import ERROR_MESSAGES
 
@@ -196,6 +198,54 @@ def create_api_key():
     return f"sk-{key}"
 
 
+class EndpointAllowlist:
+    """
+    API_KEY_ALLOWED_ENDPOINTS compiled into a trie of path segments. A path
+    is allowed if it is an allowed endpoint or below one. The trie is built
+    once and rebuilt only when the configured value changes.
+    """
+
+    def __init__(self):
+        self.source = None
+        self.root = {}
+
+    def compile(self, allowed_endpoints: Union[str, List[str]]):
+        endpoints = allowed_endpoints
+        if isinstance(endpoints, str):
+            endpoints = endpoints.split(",")
+
+        root = {}
+        for endpoint in endpoints:
+            endpoint = endpoint.strip()
+            if not endpoint:
+                continue
+
+            node = root
+            for segment in endpoint.split("/"):
+                node = node.setdefault(segment, {})
+            # Segments are strings; None marks the end of an endpoint
+            node[None] = True
+
+        self.source = allowed_endpoints
+        self.root = root
+
+    def is_allowed(self, path: str, allowed_endpoints: Union[str, List[str]]) -> bool:
+        if allowed_endpoints != self.source:
+            self.compile(allowed_endpoints)
+
+        node = self.root
+        for segment in path.split("/"):
+            node = node.get(segment)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+
+api_key_allowed_endpoints = EndpointAllowlist()
+
+
 def get_http_authorization_cred(auth_header: Optional[str]):
     if not auth_header:
         return None
@@ -231,18 +281,9 @@ def get_current_user(
             )
 
         if request.app.state.config.ENABLE_API_KEY_ENDPOINT_RESTRICTIONS:
-            allowed_paths = [
-                path.strip()
-                for path in str(
-                    request.app.state.config.API_KEY_ALLOWED_ENDPOINTS
-                ).split(",")
-            ]
-
             # Check if the request path matches any allowed endpoint.
-            if not any(
-                request.url.path == allowed
-                or request.url.path.startswith(allowed + "/")
-                for allowed in allowed_paths
+            if not api_key_allowed_endpoints.is_allowed(
+                request.url.path, request.app.state.config.API_KEY_ALLOWED_ENDPOINTS
             ):
                 raise HTTPException(
                     status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.API_KEY_NOT_ALLOWED
@@ -270,7 +311,8 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        # The token was verified above; only the user record comes from cache
+        user = user_cache.get_user_by_id(data["id"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -300,10 +342,8 @@ def get_current_user(
                 current_span.set_attribute("client.user.role", user.role)
                 current_span.set_attribute("client.auth.type", "jwt")
 
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+            # Refresh the user's last active timestamp with the next bulk write
+            activity_tracker.touch(user.id)
         return user
     else:
         raise HTTPException(
@@ -313,7 +353,8 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    # Keys are looked up by hash, and kept briefly with the user they belong to
+    user = user_cache.get_user_by_api_key(api_key)
 
     if user is None:
         raise HTTPException(
@@ -329,7 +370,7 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        activity_tracker.touch(user.id)
 
     return user
 
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REALTIME_CHAT_SAVE_INTERVAL_MS,
+    REALTIME_CHAT_SAVE_MAX_PENDING_CHARS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ChatSaveBuffer:
+    """
+    Write-behind buffer for realtime chat saves.
+
+    Streaming updates for a (chat_id, message_id) are merged in memory and
+    written with a single Chats.upsert_message_to_chat_by_id_and_message_id
+    call once the oldest pending update is older than `interval_ms`, once
+    more than `max_pending_chars` of content are pending, or when the stream
+    ends. At most `interval_ms` of tokens can be lost on a crash.
+    """
+
+    def __init__(self, interval_ms: int, max_pending_chars: int):
+        self.interval = interval_ms / 1000
+        self.max_pending_chars = max_pending_chars
+
+        self._pending = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "updates": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "flush_time_total_ms": 0.0,
+            "flush_time_max_ms": 0.0,
+        }
+
+    def upsert(self, chat_id: str, message_id: str, message: dict):
+        key = (chat_id, message_id)
+        now = time.monotonic()
+
+        entry = self._pending.setdefault(
+            key, {"message": {}, "created_at": now, "flushed_chars": 0}
+        )
+        if not entry["message"]:
+            entry["created_at"] = now
+
+        entry["message"].update(message)
+        self.stats["updates"] += 1
+
+        content = entry["message"].get("content")
+        pending_chars = (
+            len(content) - entry["flushed_chars"] if isinstance(content, str) else 0
+        )
+
+        if (
+            now - entry["created_at"] >= self.interval
+            or pending_chars >= self.max_pending_chars
+        ):
+            self.flush(chat_id, message_id)
+        else:
+            self._ensure_flush_task()
+
+    def flush(self, chat_id: str, message_id: str):
+        entry = self._pending.get((chat_id, message_id))
+        if entry is None or not entry["message"]:
+            return
+
+        start_time = time.perf_counter()
+        try:
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                chat_id, message_id, entry["message"]
+            )
+        except Exception as e:
+            self.stats["flush_errors"] += 1
+            log.exception(f"Error saving message {message_id} of chat {chat_id}: {e}")
+            # Retry after another interval
+            entry["created_at"] = time.monotonic()
+            return
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stats["flushes"] += 1
+        self.stats["flush_time_total_ms"] += elapsed_ms
+        self.stats["flush_time_max_ms"] = max(
+            self.stats["flush_time_max_ms"], elapsed_ms
+        )
+
+        # Keep the flushed length so the size threshold stays relative
+        content = entry["message"].get("content")
+        if isinstance(content, str):
+            entry["flushed_chars"] = len(content)
+        entry["message"] = {}
+
+    def discard(self, chat_id: str, message_id: str):
+        """Flush whatever is pending for a finished stream and forget it."""
+        self.flush(chat_id, message_id)
+        self._pending.pop((chat_id, message_id), None)
+
+    def flush_expired(self):
+        now = time.monotonic()
+        for chat_id, message_id in list(self._pending.keys()):
+            entry = self._pending.get((chat_id, message_id))
+            if (
+                entry
+                and entry["message"]
+                and now - entry["created_at"] >= self.interval
+            ):
+                self.flush(chat_id, message_id)
+
+    def flush_all(self):
+        for chat_id, message_id in list(self._pending.keys()):
+            self.discard(chat_id, message_id)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "pending": sum(1 for entry in self._pending.values() if entry["message"]),
+        }
+
+    def _ensure_flush_task(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(
+                    self._periodic_flush()
+                )
+            except RuntimeError:
+                # No running loop (e.g. called from a worker thread)
+                pass
+
+    async def _periodic_flush(self):
+        while True:
+            # Wake up when the oldest pending update is due; updates added
+            # meanwhile are newer, so they are never due earlier
+            deadlines = [
+                entry["created_at"] + self.interval
+                for entry in self._pending.values()
+                if entry["message"]
+            ]
+            if not deadlines:
+                break
+            await asyncio.sleep(max(min(deadlines) - time.monotonic(), 0))
+            self.flush_expired()
+
+
+chat_save_buffer = ChatSaveBuffer(
+    REALTIME_CHAT_SAVE_INTERVAL_MS, REALTIME_CHAT_SAVE_MAX_PENDING_CHARS
+)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+
+def split_content(content: str, chunk_size: int) -> list[str]:
+    """
+    Split a complete response into chunks of roughly `chunk_size` characters.
+
+    Chunks end on whitespace where possible so words are never cut in half,
+    and joining the chunks gives back the original content unchanged.
+    """
+    if chunk_size <= 0 or len(content) <= chunk_size:
+        return [content] if content else []
+
+    chunks = []
+    start = 0
+    while start < len(content):
+        end = start + chunk_size
+        if end < len(content):
+            # Break after the last whitespace in the window, if there is one
+            boundary = max(
+                content.rfind(" ", start, end), content.rfind("\n", start, end)
+            )
+            if boundary > start:
+                end = boundary + 1
+        chunks.append(content[start:end])
+        start = end
+    return chunks
+
+
+async def aiter_content_chunks(
+    content: str, chunk_size: int, pacing_budget_ms: int = 0
+):
+    """
+    Deliver an already complete response as a few large chunks.
+
+    Without a pacing budget every chunk is yielded immediately. With one, the
+    chunks are spread evenly over at most `pacing_budget_ms` in total, no
+    matter how long the response is; time spent by the consumer counts
+    against the budget.
+    """
+    chunks = split_content(content, chunk_size)
+    if not chunks:
+        return
+
+    interval = pacing_budget_ms / 1000 / len(chunks) if pacing_budget_ms > 0 else 0
+    start_time = time.monotonic()
+
+    for i, chunk in enumerate(chunks):
+        if interval and i:
+            delay = start_time + i * interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield chunk
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    ENDPOINT_ROUTING_EWMA_ALPHA,
+    ENDPOINT_ROUTING_CIRCUIT_FAILURES,
+    ENDPOINT_ROUTING_CIRCUIT_COOLDOWN,
+    ENABLE_ENDPOINT_HEDGING,
+    ENDPOINT_HEDGING_MIN_DELAY_MS,
+)
+from open_webui.utils.admission import AdmissionCancelledError
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class EndpointUnavailableError(Exception):
+    """An attempt that failed with a retryable upstream status (429/5xx)."""
+
+    def __init__(self, url: str, result):
+        super().__init__(f"{url} responded with a retryable error")
+        self.url = url
+        self.result = result
+
+
+class EndpointHealth:
+    def __init__(self, url: str):
+        self.url = url
+
+        # EWMA of the time to the first response byte, in seconds
+        self.ttft = None
+        # EWMA of the failure indicator (0 = success, 1 = failure)
+        self.error_rate = 0.0
+        self.ttft_samples = deque(maxlen=200)
+
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.circuit_open_until = 0.0
+
+    def is_open(self, now: float) -> bool:
+        return self.circuit_open_until > now
+
+    def get_p95(self) -> Optional[float]:
+        if len(self.ttft_samples) < 20:
+            return None
+        samples = sorted(self.ttft_samples)
+        return samples[int(len(samples) * 0.95) - 1]
+
+
+class EndpointRouter:
+    """
+    Picks the best upstream among the connections that serve a model.
+
+    Endpoints are identified by caller-chosen strings, one per connection (the
+    "url" of the methods below). Every attempt updates an EWMA of the time to
+    first byte and of the error rate per endpoint; candidates are ordered by
+    latency weighted by error rate. After `circuit_failures` consecutive
+    failures an endpoint is skipped for `circuit_cooldown` seconds, then gets
+    a trial request again.
+
+    With hedging, a second request goes to the next candidate when the first
+    has not produced a byte within the primary's p95 time to first byte; the
+    first to respond wins and the other one is cancelled. A failed attempt
+    fails over to the next candidate the same way.
+    """
+
+    def __init__(
+        self,
+        alpha: float,
+        circuit_failures: int,
+        circuit_cooldown: float,
+        hedging: bool,
+        hedging_min_delay_ms: int,
+    ):
+        self.alpha = alpha
+        self.circuit_failures = circuit_failures
+        self.circuit_cooldown = circuit_cooldown
+        self.hedging = hedging
+        self.hedging_min_delay = hedging_min_delay_ms / 1000
+
+        self.endpoints: dict[str, EndpointHealth] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def get_health(self, url: str) -> EndpointHealth:
+        if url not in self.endpoints:
+            self.endpoints[url] = EndpointHealth(url)
+        return self.endpoints[url]
+
+    def _get_score(self, health: EndpointHealth) -> float:
+        if health.ttft is None:
+            # Unmeasured endpoints are tried first so they get measured, unless
+            # all they did so far is fail
+            return float("inf") if health.failures else 0.0
+        return (health.ttft + 0.001 * health.in_flight) * (1 + 4 * health.error_rate)
+
+    def rank(self, urls: list[str]) -> list[str]:
+        """Order `urls` best first; URLs with an open circuit come last."""
+        now = time.monotonic()
+        return sorted(
+            dict.fromkeys(urls),
+            key=lambda url: (
+                self.get_health(url).is_open(now),
+                self._get_score(self.get_health(url)),
+            ),
+        )
+
+    def record_success(self, url: str, ttft: float):
+        health = self.get_health(url)
+        health.ttft = (
+            ttft
+            if health.ttft is None
+            else self.alpha * ttft + (1 - self.alpha) * health.ttft
+        )
+        health.ttft_samples.append(ttft)
+        health.error_rate = (1 - self.alpha) * health.error_rate
+        health.consecutive_failures = 0
+        health.circuit_open_until = 0.0
+
+    def record_failure(self, url: str):
+        health = self.get_health(url)
+        health.failures += 1
+        health.error_rate = self.alpha + (1 - self.alpha) * health.error_rate
+        health.consecutive_failures += 1
+
+        if health.consecutive_failures >= self.circuit_failures:
+            if not health.is_open(time.monotonic()):
+                log.warning(
+                    f"Opening circuit for {url} after "
+                    f"{health.consecutive_failures} consecutive failures"
+                )
+            health.circuit_open_until = time.monotonic() + self.circuit_cooldown
+
+    def get_hedge_delay(self, url: str) -> Optional[float]:
+        if not self.hedging:
+            return None
+        p95 = self.get_health(url).get_p95()
+        return max(p95, self.hedging_min_delay) if p95 is not None else None
+
+    async def _attempt(
+        self,
+        url: str,
+        send: Callable[..., Awaitable],
+        admit: Optional[Callable[[str], Awaitable]],
+        sent: asyncio.Future,
+    ):
+        # Time spent queued for local admission is not the endpoint's latency
+        args = (url, await admit(url)) if admit else (url,)
+
+        health = self.get_health(url)
+        health.requests += 1
+        health.in_flight += 1
+        start_time = time.monotonic()
+        sent.set_result(start_time)
+        try:
+            result = await send(*args)
+        except (asyncio.CancelledError, AdmissionCancelledError):
+            # Never reached the endpoint, not held against it
+            raise
+        except Exception:
+            self.record_failure(url)
+            raise
+        finally:
+            health.in_flight -= 1
+
+        response = result[0]
+        if response.status == 429 or response.status >= 500:
+            self.record_failure(url)
+            raise EndpointUnavailableError(url, result)
+
+        self.record_success(url, time.monotonic() - start_time)
+        return url, result
+
+    async def request(
+        self,
+        urls: list[str],
+        send: Callable[..., Awaitable],
+        release: Optional[Callable] = None,
+        admit: Optional[Callable[[str], Awaitable]] = None,
+    ):
+        """
+        Send a request through the best of `urls`, returning (url, result).
+
+        `send(url)` performs the request and returns a tuple whose first item
+        is the response, once the first body byte has arrived.
+        `release(result)` disposes of results that are not returned (hedge
+        losers, failed attempts).
+        `admit(url)` waits for local admission to the endpoint; its result is
+        passed on as `send(url, admission)`. Latency and the hedge delay are
+        measured from admission on.
+        If every attempt fails, the last upstream error response is returned,
+        or the last exception re-raised.
+        """
+        # At most two attempts: the best endpoint plus one hedge or failover
+        candidates = self.rank(urls)[:2]
+        pending = set()
+        errors = []
+        hedged = False
+
+        def start(url):
+            sent = asyncio.get_running_loop().create_future()
+            task = asyncio.create_task(self._attempt(url, send, admit, sent))
+            pending.add(task)
+            return task, sent
+
+        primary_url = candidates.pop(0)
+        primary, primary_sent = start(primary_url)
+        winner = None
+        finished = False
+        try:
+            while pending:
+                timeout = None
+                if candidates and primary in pending:
+                    if not primary_sent.done() and not primary.done():
+                        # Still queued for admission, not slow yet
+                        await asyncio.wait(
+                            {primary, primary_sent},
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                        continue
+
+                    delay = self.get_hedge_delay(primary_url)
+                    if delay is not None and primary_sent.done():
+                        timeout = max(
+                            primary_sent.result() + delay - time.monotonic(), 0
+                        )
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # The primary is slower than its p95, hedge
+                    self.hedges += 1
+                    hedged = True
+                    start(candidates.pop(0))
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        winner = task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+
+                    if hedged and task is not primary:
+                        self.hedge_wins += 1
+                    return winner
+
+                # Fail over to the next candidate
+                if not pending and candidates:
+                    start(candidates.pop(0))
+            finished = True
+        finally:
+            for task in pending:
+                task.cancel()
+            losers = []
+            for task in pending:
+                try:
+                    losers.append((await task)[1])
+                except EndpointUnavailableError as e:
+                    # Failed before it was cancelled, its response is still open
+                    errors.append(e)
+                except BaseException:
+                    continue
+
+            # Keep the last upstream error response if nothing succeeded
+            if (
+                winner is None
+                and finished
+                and errors
+                and isinstance(errors[-1], EndpointUnavailableError)
+            ):
+                winner = (errors[-1].url, errors.pop().result)
+            losers.extend(
+                e.result for e in errors if isinstance(e, EndpointUnavailableError)
+            )
+
+            if release:
+                for result in losers:
+                    await release(result)
+
+        if winner is not None:
+            return winner
+        raise errors[-1]
+
+    def get_stats(self, urls: Optional[list[str]] = None) -> dict:
+        now = time.monotonic()
+        return {
+            "hedging": self.hedging,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "endpoints": [
+                {
+                    "url": health.url,
+                    "healthy": not health.is_open(now),
+                    "circuit_open_for": max(health.circuit_open_until - now, 0),
+                    "ttft_ewma_ms": (
+                        health.ttft * 1000 if health.ttft is not None else None
+                    ),
+                    "ttft_p95_ms": (
+                        health.get_p95() * 1000
+                        if health.get_p95() is not None
+                        else None
+                    ),
+                    "error_rate": health.error_rate,
+                    "requests": health.requests,
+                    "failures": health.failures,
+                    "in_flight": health.in_flight,
+                    "consecutive_failures": health.consecutive_failures,
+                }
+                for health in (
+                    [self.get_health(url) for url in urls]
+                    if urls is not None
+                    else self.endpoints.values()
+                )
+            ],
+        }
+
+
+endpoint_router = EndpointRouter(
+    ENDPOINT_ROUTING_EWMA_ALPHA,
+    ENDPOINT_ROUTING_CIRCUIT_FAILURES,
+    ENDPOINT_ROUTING_CIRCUIT_COOLDOWN,
+    ENABLE_ENDPOINT_HEDGING,
+    ENDPOINT_HEDGING_MIN_DELAY_MS,
+)
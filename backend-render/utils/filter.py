@@ -5,6 +5,7 @@ from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
+from open_webui.utils.shared_state import shared_state
 from open_webui.models.functions import Functions
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -12,6 +13,40 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+class FunctionValvesCache:
+    """
+    Process-local cache of function valves.
+
+    Valves updates and function deletions call `invalidate`, which drops
+    the entry in every worker through shared_state.
+    """
+
+    def __init__(self):
+        self._valves = {}
+
+    def get_valves(self, function_id: str) -> dict:
+        if function_id not in self._valves:
+            valves = Functions.get_function_valves_by_id(function_id)
+            if valves is None:
+                # Lookup failed, retry on the next call
+                return {}
+            self._valves[function_id] = valves
+        return self._valves[function_id]
+
+    def drop(self, function_id: str = None):
+        if function_id is None:
+            self._valves = {}
+        else:
+            self._valves.pop(function_id, None)
+
+    def invalidate(self, function_id: str = None):
+        shared_state.invalidate("valves", function_id)
+
+
+function_valves_cache = FunctionValvesCache()
+shared_state.register_invalidator("valves", function_valves_cache.drop)
+
+
 def get_function_module(request, function_id, load_from_db=True):
     """
     Get the function module by its ID.
@@ -61,7 +96,6 @@ async def process_filter_functions(
     request, filter_functions, filter_type, form_data, extra_params
 ):
     skip_files = None
-
     for function in filter_functions:
         filter = function
         filter_id = function.id
@@ -82,9 +116,8 @@ async def process_filter_functions(
 
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
             function_module.valves = function_module.Valves(
-                **(valves if valves else {})
+                **function_valves_cache.get_valves(filter_id)
             )
 
         try:
@@ -132,3 +165,83 @@ async def process_filter_functions(
         del form_data["metadata"]["files"]
 
     return form_data, {}
+
+
+class FilterChain:
+    """
+    Filter functions of one type compiled for the lifetime of a request.
+
+    Modules, valves, user valves and handler parameters are resolved once
+    when the chain is built, so running it (e.g. for every "stream" chunk)
+    is a plain call per filter.
+    """
+
+    def __init__(self, filter_type: str, handlers: list):
+        self.filter_type = filter_type
+        self.handlers = handlers
+
+    async def __call__(self, form_data):
+        param_name = "event" if self.filter_type == "stream" else "body"
+
+        for filter_id, handler, params, is_coroutine in self.handlers:
+            try:
+                if is_coroutine:
+                    form_data = await handler(**{param_name: form_data}, **params)
+                else:
+                    form_data = handler(**{param_name: form_data}, **params)
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {filter_id}: {e}")
+                raise e
+
+        return form_data
+
+
+def compile_filter_functions(
+    request, filter_functions, filter_type, extra_params
+) -> FilterChain:
+    handlers = []
+    for function in filter_functions:
+        if not function:
+            continue
+        filter_id = function.id
+
+        function_module = get_function_module(
+            request, filter_id, load_from_db=(filter_type != "stream")
+        )
+        handler = getattr(function_module, filter_type, None)
+        if not handler:
+            continue
+
+        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
+            function_module.valves = function_module.Valves(
+                **function_valves_cache.get_valves(filter_id)
+            )
+
+        sig = inspect.signature(handler)
+        params = {
+            k: v
+            for k, v in {
+                **extra_params,
+                "__id__": filter_id,
+            }.items()
+            if k in sig.parameters
+        }
+
+        if "__user__" in params and hasattr(function_module, "UserValves"):
+            try:
+                params["__user__"] = {
+                    **params["__user__"],
+                    "valves": function_module.UserValves(
+                        **Functions.get_user_valves_by_id_and_user_id(
+                            filter_id, params["__user__"]["id"]
+                        )
+                    ),
+                }
+            except Exception as e:
+                log.exception(f"Failed to get user values: {e}")
+
+        handlers.append(
+            (filter_id, handler, params, inspect.iscoroutinefunction(handler))
+        )
+
+    return FilterChain(filter_type, handlers)
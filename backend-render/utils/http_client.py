@@ -0,0 +1,136 @@
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    HTTP_CLIENT_POOL_LIMIT,
+    HTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    HTTP_CLIENT_DNS_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+def get_origin(url: str) -> str:
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}".lower()
+
+
+class HTTPClientPool:
+    """
+    Long-lived aiohttp sessions for outbound provider calls, one per origin
+    (scheme + host + port) so every provider gets its own tuned connector:
+    a bounded connection pool, a TTL DNS cache and keep-alive reuse.
+
+    Sessions are created lazily on first use and closed with `close()` on
+    application shutdown. Callers must not close them; responses should be
+    released rather than closed so their connection returns to the pool.
+
+    aiohttp speaks HTTP/1.1 only, so HTTP/2 is not negotiated.
+    """
+
+    def __init__(self, limit: int, keepalive_timeout: float, dns_cache_ttl: int):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._stats: dict[str, dict] = {}
+
+    def _get_trace_config(self, stats: dict) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            stats["requests"] += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            stats["queued"] += 1
+            stats["queued_total"] += 1
+
+        async def on_connection_queued_end(session, ctx, params):
+            stats["queued"] -= 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats["connections_reused"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        origin = get_origin(url)
+
+        session = self._sessions.get(origin)
+        if session is not None and not session.closed:
+            return session
+
+        stats = self._stats.setdefault(
+            origin,
+            {
+                "requests": 0,
+                "queued": 0,
+                "queued_total": 0,
+                "connections_created": 0,
+                "connections_reused": 0,
+            },
+        )
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            trust_env=True,
+            trace_configs=[self._get_trace_config(stats)],
+        )
+
+        log.debug(f"Created pooled HTTP session for {origin}")
+        self._sessions[origin] = session
+        return session
+
+    async def close(self):
+        for origin, session in list(self._sessions.items()):
+            try:
+                await session.close()
+            except Exception as e:
+                log.warning(f"Error closing HTTP session for {origin}: {e}")
+        self._sessions = {}
+
+    def get_stats(self) -> dict:
+        pools = {}
+        for origin, stats in self._stats.items():
+            session = self._sessions.get(origin)
+            connector = session.connector if session is not None else None
+
+            # aiohttp has no public API for the pool occupancy
+            in_use = len(getattr(connector, "_acquired", ())) if connector else 0
+            idle = (
+                sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+                if connector
+                else 0
+            )
+
+            pools[origin] = {
+                **stats,
+                "limit": self.limit,
+                "in_use": in_use,
+                "idle": idle,
+            }
+        return pools
+
+
+http_client_pool = HTTPClientPool(
+    HTTP_CLIENT_POOL_LIMIT, HTTP_CLIENT_KEEPALIVE_TIMEOUT, HTTP_CLIENT_DNS_CACHE_TTL
+)
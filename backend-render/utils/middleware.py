@@ -27,6 +27,7 @@ from open_webui.models.chats import Chats
 from open_webui.models.folders import Folders
 from open_webui.models.users import Users
 from open_webui.socket.main import (
+    STREAM_POOL,
     get_event_call,
     get_event_emitter,
     get_active_status_by_user_id,
@@ -83,9 +84,14 @@ from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
+    compile_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
 from open_webui.utils.payload import apply_system_prompt_to_body
+from open_webui.utils.chat_save import chat_save_buffer
+from open_webui.utils.stream_tags import StreamingTagDetector, get_start_tag_pattern
+from open_webui.utils.sse import aiter_sse_events
+from open_webui.utils.stream_flush import StreamDeltaFlusher
 
 
 from open_webui.config import (
@@ -98,6 +104,8 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     GLOBAL_LOG_LEVEL,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
+    CHAT_RESPONSE_STREAM_FLUSH_INTERVAL_MS,
+    CHAT_RESPONSE_STREAM_FLUSH_MAX_BYTES,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
 )
@@ -1091,10 +1099,16 @@ async def process_chat_response(
                 )
 
             if tasks and messages:
-                if (
-                    TASKS.FOLLOW_UP_GENERATION in tasks
-                    and tasks[TASKS.FOLLOW_UP_GENERATION]
-                ):
+                # The task calls are independent, run them concurrently over
+                # the same message snapshot and write the chat once at the end
+
+                async def follow_ups_task():
+                    if not (
+                        TASKS.FOLLOW_UP_GENERATION in tasks
+                        and tasks[TASKS.FOLLOW_UP_GENERATION]
+                    ):
+                        return None
+
                     res = await generate_follow_ups(
                         request,
                         {
@@ -1122,30 +1136,16 @@ async def process_chat_response(
                         ]
 
                         try:
-                            follow_ups = json.loads(follow_ups_string).get(
-                                "follow_ups", []
-                            )
-
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                metadata["chat_id"],
-                                metadata["message_id"],
-                                {
-                                    "followUps": follow_ups,
-                                },
-                            )
-
-                            await event_emitter(
-                                {
-                                    "type": "chat:message:follow_ups",
-                                    "data": {
-                                        "follow_ups": follow_ups,
-                                    },
-                                }
-                            )
+                            return json.loads(follow_ups_string).get("follow_ups", [])
                         except Exception as e:
                             pass
 
-                if TASKS.TITLE_GENERATION in tasks:
+                    return None
+
+                async def title_task():
+                    if TASKS.TITLE_GENERATION not in tasks:
+                        return None
+
                     user_message = get_last_user_message(messages)
                     if user_message and len(user_message) > 100:
                         user_message = user_message[:100] + "..."
@@ -1188,27 +1188,18 @@ async def process_chat_response(
                             if not title:
                                 title = messages[0].get("content", user_message)
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
-
-                            await event_emitter(
-                                {
-                                    "type": "chat:title",
-                                    "data": title,
-                                }
-                            )
+                            return title
                     elif len(messages) == 2:
-                        title = messages[0].get("content", user_message)
+                        return messages[0].get("content", user_message)
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+                    return None
 
-                        await event_emitter(
-                            {
-                                "type": "chat:title",
-                                "data": message.get("content", user_message),
-                            }
-                        )
+                async def tags_task():
+                    if not (
+                        TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]
+                    ):
+                        return None
 
-                if TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]:
                     res = await generate_chat_tags(
                         request,
                         {
@@ -1234,20 +1225,68 @@ async def process_chat_response(
                         ]
 
                         try:
-                            tags = json.loads(tags_string).get("tags", [])
-                            Chats.update_chat_tags_by_id(
-                                metadata["chat_id"], tags, user
-                            )
-
-                            await event_emitter(
-                                {
-                                    "type": "chat:tags",
-                                    "data": tags,
-                                }
-                            )
+                            return json.loads(tags_string).get("tags", [])
                         except Exception as e:
                             pass
 
+                    return None
+
+                results = await asyncio.gather(
+                    follow_ups_task(),
+                    title_task(),
+                    tags_task(),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        log.exception(f"Error in background task: {result}")
+
+                follow_ups, title, tags = [
+                    None if isinstance(result, Exception) else result
+                    for result in results
+                ]
+
+                if follow_ups is not None or title is not None:
+                    Chats.update_chat_title_and_message_by_id(
+                        metadata["chat_id"],
+                        title=title,
+                        message_id=metadata["message_id"],
+                        message=(
+                            {"followUps": follow_ups}
+                            if follow_ups is not None
+                            else None
+                        ),
+                    )
+
+                if tags is not None:
+                    Chats.update_chat_tags_by_id(metadata["chat_id"], tags, user)
+
+                if follow_ups is not None:
+                    await event_emitter(
+                        {
+                            "type": "chat:message:follow_ups",
+                            "data": {
+                                "follow_ups": follow_ups,
+                            },
+                        }
+                    )
+
+                if title is not None:
+                    await event_emitter(
+                        {
+                            "type": "chat:title",
+                            "data": title,
+                        }
+                    )
+
+                if tags is not None:
+                    await event_emitter(
+                        {
+                            "type": "chat:tags",
+                            "data": tags,
+                        }
+                    )
+
     event_emitter = None
     event_caller = None
     if (
@@ -1430,135 +1469,174 @@ async def process_chat_response(
 
         # Handle as a background task
         async def response_handler(response, events):
-            def serialize_content_blocks(content_blocks, raw=False):
-                content = ""
+            def serialize_content_block(content, block, raw=False):
+                if block["type"] == "text":
+                    block_content = block["content"].strip()
+                    if block_content:
+                        content = f"{content}{block_content}\n"
+                elif block["type"] == "tool_calls":
+                    attributes = block.get("attributes", {})
 
-                for block in content_blocks:
-                    if block["type"] == "text":
-                        block_content = block["content"].strip()
-                        if block_content:
-                            content = f"{content}{block_content}\n"
-                    elif block["type"] == "tool_calls":
-                        attributes = block.get("attributes", {})
-
-                        tool_calls = block.get("content", [])
-                        results = block.get("results", [])
+                    tool_calls = block.get("content", [])
+                    results = block.get("results", [])
 
-                        if content and not content.endswith("\n"):
-                            content += "\n"
+                    if content and not content.endswith("\n"):
+                        content += "\n"
 
-                        if results:
+                    if results:
 
-                            tool_calls_display_content = ""
-                            for tool_call in tool_calls:
+                        tool_calls_display_content = ""
+                        for tool_call in tool_calls:
 
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
+                            tool_call_id = tool_call.get("id", "")
+                            tool_name = tool_call.get("function", {}).get(
+                                "name", ""
+                            )
+                            tool_arguments = tool_call.get("function", {}).get(
+                                "arguments", ""
+                            )
 
-                                tool_result = None
-                                tool_result_files = None
-                                for result in results:
-                                    if tool_call_id == result.get("tool_call_id", ""):
-                                        tool_result = result.get("content", None)
-                                        tool_result_files = result.get("files", None)
-                                        break
+                            tool_result = None
+                            tool_result_files = None
+                            for result in results:
+                                if tool_call_id == result.get("tool_call_id", ""):
+                                    tool_result = result.get("content", None)
+                                    tool_result_files = result.get("files", None)
+                                    break
 
-                                if tool_result:
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}">\n<summary>Tool Executed</summary>\n</details>\n'
-                                else:
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+                            if tool_result:
+                                tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}">\n<summary>Tool Executed</summary>\n</details>\n'
+                            else:
+                                tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
 
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-                        else:
-                            tool_calls_display_content = ""
+                        if not raw:
+                            content = f"{content}{tool_calls_display_content}"
+                    else:
+                        tool_calls_display_content = ""
 
-                            for tool_call in tool_calls:
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
+                        for tool_call in tool_calls:
+                            tool_call_id = tool_call.get("id", "")
+                            tool_name = tool_call.get("function", {}).get(
+                                "name", ""
+                            )
+                            tool_arguments = tool_call.get("function", {}).get(
+                                "arguments", ""
+                            )
 
-                                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+                            tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
 
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
+                        if not raw:
+                            content = f"{content}{tool_calls_display_content}"
 
-                    elif block["type"] == "reasoning":
-                        reasoning_display_content = "\n".join(
-                            (f"> {line}" if not line.startswith(">") else line)
-                            for line in block["content"].splitlines()
-                        )
+                elif block["type"] == "reasoning":
+                    reasoning_display_content = "\n".join(
+                        (f"> {line}" if not line.startswith(">") else line)
+                        for line in block["content"].splitlines()
+                    )
 
-                        reasoning_duration = block.get("duration", None)
+                    reasoning_duration = block.get("duration", None)
 
-                        start_tag = block.get("start_tag", "")
-                        end_tag = block.get("end_tag", "")
+                    start_tag = block.get("start_tag", "")
+                    end_tag = block.get("end_tag", "")
 
-                        if content and not content.endswith("\n"):
-                            content += "\n"
+                    if content and not content.endswith("\n"):
+                        content += "\n"
 
-                        if reasoning_duration is not None:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+                    if reasoning_duration is not None:
+                        if raw:
+                            content = (
+                                f'{content}{start_tag}{block["content"]}{end_tag}\n'
+                            )
                         else:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
-
-                    elif block["type"] == "code_interpreter":
-                        attributes = block.get("attributes", {})
-                        output = block.get("output", None)
-                        lang = attributes.get("lang", "")
-
-                        content_stripped, original_whitespace = (
-                            split_content_and_whitespace(content)
-                        )
-                        if is_opening_code_block(content_stripped):
-                            # Remove trailing backticks that would open a new block
+                            content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+                    else:
+                        if raw:
                             content = (
-                                content_stripped.rstrip("`").rstrip()
-                                + original_whitespace
+                                f'{content}{start_tag}{block["content"]}{end_tag}\n'
                             )
                         else:
-                            # Keep content as is - either closing backticks or no backticks
-                            content = content_stripped + original_whitespace
+                            content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
 
-                        if content and not content.endswith("\n"):
-                            content += "\n"
+                elif block["type"] == "code_interpreter":
+                    attributes = block.get("attributes", {})
+                    output = block.get("output", None)
+                    lang = attributes.get("lang", "")
 
-                        if output:
-                            output = html.escape(json.dumps(output))
+                    content_stripped, original_whitespace = (
+                        split_content_and_whitespace(content)
+                    )
+                    if is_opening_code_block(content_stripped):
+                        # Remove trailing backticks that would open a new block
+                        content = (
+                            content_stripped.rstrip("`").rstrip()
+                            + original_whitespace
+                        )
+                    else:
+                        # Keep content as is - either closing backticks or no backticks
+                        content = content_stripped + original_whitespace
 
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-                        else:
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+                    if content and not content.endswith("\n"):
+                        content += "\n"
+
+                    if output:
+                        output = html.escape(json.dumps(output))
 
+                        if raw:
+                            content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+                        else:
+                            content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
                     else:
-                        block_content = str(block["content"]).strip()
-                        if block_content:
-                            content = f"{content}{block['type']}: {block_content}\n"
+                        if raw:
+                            content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+                        else:
+                            content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+                else:
+                    block_content = str(block["content"]).strip()
+                    if block_content:
+                        content = f"{content}{block['type']}: {block_content}\n"
+
+                return content
+
+            def serialize_content_blocks(content_blocks, raw=False):
+                content = ""
+
+                for block in content_blocks:
+                    content = serialize_content_block(content, block, raw)
+
+                return content.strip()
+
+            # Serialized output of the finished (non-trailing) blocks, keyed by
+            # block identity so pops/replacements invalidate it.
+            serialized_prefix = {"blocks": [], "content": ""}
+
+            def serialize_streaming_content_blocks(content_blocks):
+                """
+                Same output as serialize_content_blocks, but only the trailing
+                (still open) block is rendered on every call. Finished blocks are
+                only ever mutated while they are the last block, so their
+                serialized prefix can be reused between deltas.
+                """
+                finished_blocks = content_blocks[:-1]
+                cached_blocks = serialized_prefix["blocks"]
+
+                if len(cached_blocks) > len(finished_blocks) or any(
+                    cached is not block
+                    for cached, block in zip(cached_blocks, finished_blocks)
+                ):
+                    cached_blocks = []
+                    content = ""
+                else:
+                    content = serialized_prefix["content"]
+
+                for block in finished_blocks[len(cached_blocks) :]:
+                    content = serialize_content_block(content, block)
+
+                serialized_prefix["blocks"] = finished_blocks
+                serialized_prefix["content"] = content
+
+                if content_blocks:
+                    content = serialize_content_block(content, content_blocks[-1])
 
                 return content.strip()
 
@@ -1602,179 +1680,26 @@ async def process_chat_response(
 
                 return messages
 
-            def tag_content_handler(content_type, tags, content, content_blocks):
-                end_flag = False
-
-                def extract_attributes(tag_content):
-                    """Extract attributes from a tag if they exist."""
-                    attributes = {}
-                    if not tag_content:  # Ensure tag_content is not None
-                        return attributes
-                    # Match attributes in the format: key="value" (ignores single quotes for simplicity)
-                    matches = re.findall(r'(\w+)\s*=\s*"([^"]+)"', tag_content)
-                    for key, value in matches:
-                        attributes[key] = value
-                    return attributes
-
-                if content_blocks[-1]["type"] == "text":
-                    for start_tag, end_tag in tags:
-
-                        start_tag_pattern = rf"{re.escape(start_tag)}"
-                        if start_tag.startswith("<") and start_tag.endswith(">"):
-                            # Match start tag e.g., <tag> or <tag attr="value">
-                            # remove both '<' and '>' from start_tag
-                            # Match start tag with attributes
-                            start_tag_pattern = (
-                                rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>"
-                            )
+            tag_detectors = {}
 
-                        match = re.search(start_tag_pattern, content)
-                        if match:
-                            try:
-                                attr_content = (
-                                    match.group(1) if match.group(1) else ""
-                                )  # Ensure it's not None
-                            except:
-                                attr_content = ""
-
-                            attributes = extract_attributes(
-                                attr_content
-                            )  # Extract attributes safely
-
-                            # Capture everything before and after the matched tag
-                            before_tag = content[
-                                : match.start()
-                            ]  # Content before opening tag
-                            after_tag = content[
-                                match.end() :
-                            ]  # Content after opening tag
-
-                            # Remove the start tag and after from the currently handling text block
-                            content_blocks[-1]["content"] = content_blocks[-1][
-                                "content"
-                            ].replace(match.group(0) + after_tag, "")
-
-                            if before_tag:
-                                content_blocks[-1]["content"] = before_tag
-
-                            if not content_blocks[-1]["content"]:
-                                content_blocks.pop()
-
-                            # Append the new block
-                            content_blocks.append(
-                                {
-                                    "type": content_type,
-                                    "start_tag": start_tag,
-                                    "end_tag": end_tag,
-                                    "attributes": attributes,
-                                    "content": "",
-                                    "started_at": time.time(),
-                                }
-                            )
-
-                            if after_tag:
-                                content_blocks[-1]["content"] = after_tag
-                                tag_content_handler(
-                                    content_type, tags, after_tag, content_blocks
-                                )
-
-                            break
-                elif content_blocks[-1]["type"] == content_type:
-                    start_tag = content_blocks[-1]["start_tag"]
-                    end_tag = content_blocks[-1]["end_tag"]
-
-                    if end_tag.startswith("<") and end_tag.endswith(">"):
-                        # Match end tag e.g., </tag>
-                        end_tag_pattern = rf"{re.escape(end_tag)}"
-                    else:
-                        # Handle cases where end_tag is just a tag name
-                        end_tag_pattern = rf"{re.escape(end_tag)}"
-
-                    # Check if the content has the end tag
-                    if re.search(end_tag_pattern, content):
-                        end_flag = True
-
-                        block_content = content_blocks[-1]["content"]
-                        # Strip start and end tags from the content
-                        start_tag_pattern = rf"<{re.escape(start_tag)}(.*?)>"
-                        block_content = re.sub(
-                            start_tag_pattern, "", block_content
-                        ).strip()
-
-                        end_tag_regex = re.compile(end_tag_pattern, re.DOTALL)
-                        split_content = end_tag_regex.split(block_content, maxsplit=1)
-
-                        # Content inside the tag
-                        block_content = (
-                            split_content[0].strip() if split_content else ""
-                        )
-
-                        # Leftover content (everything after `</tag>`)
-                        leftover_content = (
-                            split_content[1].strip() if len(split_content) > 1 else ""
-                        )
-
-                        if block_content:
-                            content_blocks[-1]["content"] = block_content
-                            content_blocks[-1]["ended_at"] = time.time()
-                            content_blocks[-1]["duration"] = int(
-                                content_blocks[-1]["ended_at"]
-                                - content_blocks[-1]["started_at"]
-                            )
-
-                            # Reset the content_blocks by appending a new text block
-                            if content_type != "code_interpreter":
-                                if leftover_content:
-
-                                    content_blocks.append(
-                                        {
-                                            "type": "text",
-                                            "content": leftover_content,
-                                        }
-                                    )
-                                else:
-                                    content_blocks.append(
-                                        {
-                                            "type": "text",
-                                            "content": "",
-                                        }
-                                    )
-
-                        else:
-                            # Remove the block if content is empty
-                            content_blocks.pop()
-
-                            if leftover_content:
-                                content_blocks.append(
-                                    {
-                                        "type": "text",
-                                        "content": leftover_content,
-                                    }
-                                )
-                            else:
-                                content_blocks.append(
-                                    {
-                                        "type": "text",
-                                        "content": "",
-                                    }
-                                )
+            def tag_content_handler(content_type, tags, content, content_blocks):
+                if content_type not in tag_detectors:
+                    tag_detectors[content_type] = StreamingTagDetector(
+                        content_type, tags
+                    )
 
-                        # Clean processed content
-                        start_tag_pattern = rf"{re.escape(start_tag)}"
-                        if start_tag.startswith("<") and start_tag.endswith(">"):
-                            # Match start tag e.g., <tag> or <tag attr="value">
-                            # remove both '<' and '>' from start_tag
-                            # Match start tag with attributes
-                            start_tag_pattern = (
-                                rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>"
-                            )
+                tag_detector = tag_detectors[content_type]
+                end_flag = tag_detector.process(content_blocks)
 
-                        content = re.sub(
-                            rf"{start_tag_pattern}(.|\n)*?{re.escape(end_tag)}",
-                            "",
-                            content,
-                            flags=re.DOTALL,
-                        )
+                if end_flag:
+                    # Clean processed content
+                    start_tag, end_tag = tag_detector.closed_tag
+                    content = re.sub(
+                        rf"{get_start_tag_pattern(start_tag)}(.|\n)*?{re.escape(end_tag)}",
+                        "",
+                        content,
+                        flags=re.DOTALL,
+                    )
 
                 return content, content_blocks, end_flag
 
@@ -1852,7 +1777,13 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
-                    delta_count = 0
+                    stream_filter_chain = compile_filter_functions(
+                        request=request,
+                        filter_functions=filter_functions,
+                        filter_type="stream",
+                        extra_params={"__body__": form_data, **extra_params},
+                    )
+
                     delta_chunk_size = max(
                         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
                         int(
@@ -1860,295 +1791,283 @@ async def process_chat_response(
                             or 1
                         ),
                     )
-                    last_delta_data = None
-
-                    async def flush_pending_delta_data(threshold: int = 0):
-                        nonlocal delta_count
-                        nonlocal last_delta_data
-
-                        if delta_count >= threshold and last_delta_data:
-                            await event_emitter(
-                                {
-                                    "type": "chat:completion",
-                                    "data": last_delta_data,
-                                }
-                            )
-                            delta_count = 0
-                            last_delta_data = None
-
-                    async for line in response.body_iterator:
-                        line = line.decode("utf-8") if isinstance(line, bytes) else line
-                        data = line
-
-                        # Skip empty lines
-                        if not data.strip():
-                            continue
+                    delta_flusher = StreamDeltaFlusher(
+                        event_emitter,
+                        max_chunks=delta_chunk_size,
+                        max_latency_ms=CHAT_RESPONSE_STREAM_FLUSH_INTERVAL_MS,
+                        max_bytes=CHAT_RESPONSE_STREAM_FLUSH_MAX_BYTES,
+                        stream_id=f"{metadata['chat_id']}:{metadata['message_id']}",
+                    )
 
-                        # "data:" is the prefix for each event
-                        if not data.startswith("data:"):
-                            continue
+                    stream_completed = False
+                    try:
+                        async for event in aiter_sse_events(response.body_iterator):
+                            # Skip events without a "data:" payload (e.g. comments)
+                            if not event.data:
+                                continue
 
-                        # Remove the prefix
-                        data = data[len("data:") :].strip()
+                            try:
+                                data = event.json()
 
-                        try:
-                            data = json.loads(data)
-
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params={"__body__": form_data, **extra_params},
-                            )
+                                data = await stream_filter_chain(data)
 
-                            if data:
-                                if "event" in data:
-                                    await event_emitter(data.get("event", {}))
+                                if data:
+                                    if "event" in data:
+                                        await event_emitter(data.get("event", {}))
 
-                                if "selected_model_id" in data:
-                                    model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                                        metadata["chat_id"],
-                                        metadata["message_id"],
-                                        {
-                                            "selectedModelId": model_id,
-                                        },
-                                    )
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
-                                else:
-                                    choices = data.get("choices", [])
-                                    if not choices:
-                                        error = data.get("error", {})
-                                        if error:
-                                            await event_emitter(
-                                                {
-                                                    "type": "chat:completion",
-                                                    "data": {
-                                                        "error": error,
-                                                    },
-                                                }
-                                            )
-                                        usage = data.get("usage", {})
-                                        if usage:
-                                            await event_emitter(
-                                                {
-                                                    "type": "chat:completion",
-                                                    "data": {
-                                                        "usage": usage,
-                                                    },
-                                                }
-                                            )
-                                        continue
+                                    if "selected_model_id" in data:
+                                        model_id = data["selected_model_id"]
+                                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            metadata["chat_id"],
+                                            metadata["message_id"],
+                                            {
+                                                "selectedModelId": model_id,
+                                            },
+                                        )
+                                        await event_emitter(
+                                            {
+                                                "type": "chat:completion",
+                                                "data": data,
+                                            }
+                                        )
+                                    else:
+                                        choices = data.get("choices", [])
+                                        if not choices:
+                                            error = data.get("error", {})
+                                            if error:
+                                                await event_emitter(
+                                                    {
+                                                        "type": "chat:completion",
+                                                        "data": {
+                                                            "error": error,
+                                                        },
+                                                    }
+                                                )
+                                            usage = data.get("usage", {})
+                                            if usage:
+                                                await event_emitter(
+                                                    {
+                                                        "type": "chat:completion",
+                                                        "data": {
+                                                            "usage": usage,
+                                                        },
+                                                    }
+                                                )
+                                            continue
 
-                                    delta = choices[0].get("delta", {})
-                                    delta_tool_calls = delta.get("tool_calls", None)
+                                        delta = choices[0].get("delta", {})
+                                        delta_tool_calls = delta.get("tool_calls", None)
 
-                                    if delta_tool_calls:
-                                        for delta_tool_call in delta_tool_calls:
-                                            tool_call_index = delta_tool_call.get(
-                                                "index"
-                                            )
+                                        if delta_tool_calls:
+                                            for delta_tool_call in delta_tool_calls:
+                                                tool_call_index = delta_tool_call.get(
+                                                    "index"
+                                                )
 
-                                            if tool_call_index is not None:
-                                                # Check if the tool call already exists
-                                                current_response_tool_call = None
-                                                for (
-                                                    response_tool_call
-                                                ) in response_tool_calls:
-                                                    if (
-                                                        response_tool_call.get("index")
-                                                        == tool_call_index
-                                                    ):
-                                                        current_response_tool_call = (
-                                                            response_tool_call
+                                                if tool_call_index is not None:
+                                                    # Check if the tool call already exists
+                                                    current_response_tool_call = None
+                                                    for (
+                                                        response_tool_call
+                                                    ) in response_tool_calls:
+                                                        if (
+                                                            response_tool_call.get("index")
+                                                            == tool_call_index
+                                                        ):
+                                                            current_response_tool_call = (
+                                                                response_tool_call
+                                                            )
+                                                            break
+
+                                                    if current_response_tool_call is None:
+                                                        # Add the new tool call
+                                                        delta_tool_call.setdefault(
+                                                            "function", {}
                                                         )
-                                                        break
-
-                                                if current_response_tool_call is None:
-                                                    # Add the new tool call
-                                                    delta_tool_call.setdefault(
-                                                        "function", {}
-                                                    )
-                                                    delta_tool_call[
-                                                        "function"
-                                                    ].setdefault("name", "")
-                                                    delta_tool_call[
-                                                        "function"
-                                                    ].setdefault("arguments", "")
-                                                    response_tool_calls.append(
-                                                        delta_tool_call
-                                                    )
-                                                else:
-                                                    # Update the existing tool call
-                                                    delta_name = delta_tool_call.get(
-                                                        "function", {}
-                                                    ).get("name")
-                                                    delta_arguments = (
-                                                        delta_tool_call.get(
+                                                        delta_tool_call[
+                                                            "function"
+                                                        ].setdefault("name", "")
+                                                        delta_tool_call[
+                                                            "function"
+                                                        ].setdefault("arguments", "")
+                                                        response_tool_calls.append(
+                                                            delta_tool_call
+                                                        )
+                                                    else:
+                                                        # Update the existing tool call
+                                                        delta_name = delta_tool_call.get(
                                                             "function", {}
-                                                        ).get("arguments")
-                                                    )
+                                                        ).get("name")
+                                                        delta_arguments = (
+                                                            delta_tool_call.get(
+                                                                "function", {}
+                                                            ).get("arguments")
+                                                        )
 
-                                                    if delta_name:
-                                                        current_response_tool_call[
-                                                            "function"
-                                                        ]["name"] += delta_name
+                                                        if delta_name:
+                                                            current_response_tool_call[
+                                                                "function"
+                                                            ]["name"] += delta_name
 
-                                                    if delta_arguments:
-                                                        current_response_tool_call[
-                                                            "function"
-                                                        ][
-                                                            "arguments"
-                                                        ] += delta_arguments
+                                                        if delta_arguments:
+                                                            current_response_tool_call[
+                                                                "function"
+                                                            ][
+                                                                "arguments"
+                                                            ] += delta_arguments
 
-                                    value = delta.get("content")
+                                        value = delta.get("content")
 
-                                    reasoning_content = (
-                                        delta.get("reasoning_content")
-                                        or delta.get("reasoning")
-                                        or delta.get("thinking")
-                                    )
-                                    if reasoning_content:
-                                        if (
-                                            not content_blocks
-                                            or content_blocks[-1]["type"] != "reasoning"
-                                        ):
-                                            reasoning_block = {
-                                                "type": "reasoning",
-                                                "start_tag": "<think>",
-                                                "end_tag": "</think>",
-                                                "attributes": {
-                                                    "type": "reasoning_content"
-                                                },
-                                                "content": "",
-                                                "started_at": time.time(),
-                                            }
-                                            content_blocks.append(reasoning_block)
-                                        else:
-                                            reasoning_block = content_blocks[-1]
+                                        reasoning_content = (
+                                            delta.get("reasoning_content")
+                                            or delta.get("reasoning")
+                                            or delta.get("thinking")
+                                        )
+                                        if reasoning_content:
+                                            if (
+                                                not content_blocks
+                                                or content_blocks[-1]["type"] != "reasoning"
+                                            ):
+                                                reasoning_block = {
+                                                    "type": "reasoning",
+                                                    "start_tag": "<think>",
+                                                    "end_tag": "</think>",
+                                                    "attributes": {
+                                                        "type": "reasoning_content"
+                                                    },
+                                                    "content": "",
+                                                    "started_at": time.time(),
+                                                }
+                                                content_blocks.append(reasoning_block)
+                                            else:
+                                                reasoning_block = content_blocks[-1]
 
-                                        reasoning_block["content"] += reasoning_content
+                                            reasoning_block["content"] += reasoning_content
 
-                                        data = {
-                                            "content": serialize_content_blocks(
+                                            data = {
+                                                "content": serialize_streaming_content_blocks(
+                                                    content_blocks
+                                                )
+                                            }
+
+                                        if value:
+                                            if (
                                                 content_blocks
-                                            )
-                                        }
+                                                and content_blocks[-1]["type"]
+                                                == "reasoning"
+                                                and content_blocks[-1]
+                                                .get("attributes", {})
+                                                .get("type")
+                                                == "reasoning_content"
+                                            ):
+                                                reasoning_block = content_blocks[-1]
+                                                reasoning_block["ended_at"] = time.time()
+                                                reasoning_block["duration"] = int(
+                                                    reasoning_block["ended_at"]
+                                                    - reasoning_block["started_at"]
+                                                )
 
-                                    if value:
-                                        if (
-                                            content_blocks
-                                            and content_blocks[-1]["type"]
-                                            == "reasoning"
-                                            and content_blocks[-1]
-                                            .get("attributes", {})
-                                            .get("type")
-                                            == "reasoning_content"
-                                        ):
-                                            reasoning_block = content_blocks[-1]
-                                            reasoning_block["ended_at"] = time.time()
-                                            reasoning_block["duration"] = int(
-                                                reasoning_block["ended_at"]
-                                                - reasoning_block["started_at"]
-                                            )
+                                                content_blocks.append(
+                                                    {
+                                                        "type": "text",
+                                                        "content": "",
+                                                    }
+                                                )
 
-                                            content_blocks.append(
-                                                {
-                                                    "type": "text",
-                                                    "content": "",
-                                                }
-                                            )
+                                            content = f"{content}{value}"
+                                            if not content_blocks:
+                                                content_blocks.append(
+                                                    {
+                                                        "type": "text",
+                                                        "content": "",
+                                                    }
+                                                )
 
-                                        content = f"{content}{value}"
-                                        if not content_blocks:
-                                            content_blocks.append(
-                                                {
-                                                    "type": "text",
-                                                    "content": "",
-                                                }
+                                            content_blocks[-1]["content"] = (
+                                                content_blocks[-1]["content"] + value
                                             )
 
-                                        content_blocks[-1]["content"] = (
-                                            content_blocks[-1]["content"] + value
-                                        )
-
-                                        if DETECT_REASONING:
-                                            content, content_blocks, _ = (
-                                                tag_content_handler(
-                                                    "reasoning",
-                                                    reasoning_tags,
-                                                    content,
-                                                    content_blocks,
+                                            if DETECT_REASONING:
+                                                content, content_blocks, _ = (
+                                                    tag_content_handler(
+                                                        "reasoning",
+                                                        reasoning_tags,
+                                                        content,
+                                                        content_blocks,
+                                                    )
                                                 )
-                                            )
 
-                                        if DETECT_CODE_INTERPRETER:
-                                            content, content_blocks, end = (
-                                                tag_content_handler(
-                                                    "code_interpreter",
-                                                    code_interpreter_tags,
-                                                    content,
-                                                    content_blocks,
+                                            if DETECT_CODE_INTERPRETER:
+                                                content, content_blocks, end = (
+                                                    tag_content_handler(
+                                                        "code_interpreter",
+                                                        code_interpreter_tags,
+                                                        content,
+                                                        content_blocks,
+                                                    )
                                                 )
-                                            )
 
-                                            if end:
-                                                break
+                                                if end:
+                                                    break
 
-                                        if DETECT_SOLUTION:
-                                            content, content_blocks, _ = (
-                                                tag_content_handler(
-                                                    "solution",
-                                                    solution_tags,
-                                                    content,
-                                                    content_blocks,
+                                            if DETECT_SOLUTION:
+                                                content, content_blocks, _ = (
+                                                    tag_content_handler(
+                                                        "solution",
+                                                        solution_tags,
+                                                        content,
+                                                        content_blocks,
+                                                    )
                                                 )
-                                            )
 
-                                        if ENABLE_REALTIME_CHAT_SAVE:
-                                            # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
-                                                {
-                                                    "content": serialize_content_blocks(
+                                            if ENABLE_REALTIME_CHAT_SAVE:
+                                                # Save message in the database (write-behind)
+                                                chat_save_buffer.upsert(
+                                                    metadata["chat_id"],
+                                                    metadata["message_id"],
+                                                    {
+                                                        "content": serialize_streaming_content_blocks(
+                                                            content_blocks
+                                                        ),
+                                                    },
+                                                )
+                                            else:
+                                                data = {
+                                                    "content": serialize_streaming_content_blocks(
                                                         content_blocks
                                                     ),
-                                                },
-                                            )
-                                        else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                                }
 
-                                if delta:
-                                    delta_count += 1
-                                    last_delta_data = data
-                                    if delta_count >= delta_chunk_size:
-                                        await flush_pending_delta_data(delta_chunk_size)
+                                    if delta:
+                                        await delta_flusher.push(
+                                            {
+                                                "type": "chat:completion",
+                                                "data": data,
+                                                # Open block index, used by delta frames
+                                                "index": len(content_blocks) - 1,
+                                            },
+                                            len(event.raw),
+                                        )
+                                    else:
+                                        await event_emitter(
+                                            {
+                                                "type": "chat:completion",
+                                                "data": data,
+                                            }
+                                        )
+                            except Exception as e:
+                                done = event.is_done
+                                if done:
+                                    pass
                                 else:
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
-                        except Exception as e:
-                            done = "data: [DONE]" in line
-                            if done:
-                                pass
-                            else:
-                                log.debug(f"Error: {e}")
-                                continue
-                    await flush_pending_delta_data()
+                                    log.debug(f"Error: {e}")
+                                    continue
+                        stream_completed = True
+                    finally:
+                        # Also when cancelled or failed, so the flusher stops; a
+                        # cancelled stream drops what is pending, nothing may be
+                        # emitted after "task-cancelled"
+                        await delta_flusher.close(flush=stream_completed)
 
                     if content_blocks:
                         # Clean up the last text block
@@ -2212,9 +2131,7 @@ async def process_chat_response(
 
                     tools = metadata.get("tools", {})
 
-                    results = []
-
-                    for tool_call in response_tool_calls:
+                    async def execute_tool_call(tool_call):
                         tool_call_id = tool_call.get("id", "")
                         tool_name = tool_call.get("function", {}).get("name", "")
                         tool_args = tool_call.get("function", {}).get("arguments", "{}")
@@ -2250,6 +2167,19 @@ async def process_chat_response(
                         if tool_name in tools:
                             tool = tools[tool_name]
                             spec = tool.get("spec", {})
+                            timeout = tool.get("metadata", {}).get("timeout")
+
+                            await event_emitter(
+                                {
+                                    "type": "status",
+                                    "data": {
+                                        "action": "tool_call",
+                                        "description": f"Executing {tool_name}…",
+                                        "tool_call_id": tool_call_id,
+                                        "done": False,
+                                    },
+                                }
+                            )
 
                             try:
                                 allowed_params = (
@@ -2265,7 +2195,7 @@ async def process_chat_response(
                                 }
 
                                 if tool.get("direct", False):
-                                    tool_result = await event_caller(
+                                    tool_coroutine = event_caller(
                                         {
                                             "type": "execute:tool",
                                             "data": {
@@ -2282,13 +2212,34 @@ async def process_chat_response(
 
                                 else:
                                     tool_function = tool["callable"]
-                                    tool_result = await tool_function(
+                                    tool_coroutine = tool_function(
                                         **tool_function_params
                                     )
 
+                                async with tool_semaphores[tool_name]:
+                                    tool_result = await asyncio.wait_for(
+                                        tool_coroutine, timeout=timeout
+                                    )
+
+                            except asyncio.TimeoutError:
+                                tool_result = (
+                                    f"Tool {tool_name} timed out after {timeout}s"
+                                )
                             except Exception as e:
                                 tool_result = str(e)
 
+                            await event_emitter(
+                                {
+                                    "type": "status",
+                                    "data": {
+                                        "action": "tool_call",
+                                        "description": f"Executed {tool_name}",
+                                        "tool_call_id": tool_call_id,
+                                        "done": True,
+                                    },
+                                }
+                            )
+
                         tool_result_files = []
                         if isinstance(tool_result, list):
                             for item in tool_result:
@@ -2304,18 +2255,58 @@ async def process_chat_response(
                                 tool_result, indent=2, ensure_ascii=False
                             )
 
-                        results.append(
-                            {
-                                "tool_call_id": tool_call_id,
-                                "content": tool_result,
-                                **(
-                                    {"files": tool_result_files}
-                                    if tool_result_files
-                                    else {}
-                                ),
-                            }
+                        return {
+                            "tool_call_id": tool_call_id,
+                            "content": tool_result,
+                            **({"files": tool_result_files} if tool_result_files else {}),
+                        }
+
+                    # Per-tool concurrency limit, unbounded unless the tool sets one
+                    tool_semaphores = {}
+                    for tool_call in response_tool_calls:
+                        tool_name = tool_call.get("function", {}).get("name", "")
+                        if tool_name in tool_semaphores:
+                            continue
+                        concurrency = (
+                            tools.get(tool_name, {})
+                            .get("metadata", {})
+                            .get("concurrency")
+                        )
+                        tool_semaphores[tool_name] = asyncio.Semaphore(
+                            concurrency or len(response_tool_calls)
                         )
 
+                    # Tools marked as order-dependent keep the whole turn sequential
+                    if any(
+                        tools.get(tool_call.get("function", {}).get("name", ""), {})
+                        .get("metadata", {})
+                        .get("sequential", False)
+                        for tool_call in response_tool_calls
+                    ):
+                        results = []
+                        for tool_call in response_tool_calls:
+                            results.append(await execute_tool_call(tool_call))
+                    else:
+                        # gather keeps results in the original tool call order
+                        results = await asyncio.gather(
+                            *[
+                                execute_tool_call(tool_call)
+                                for tool_call in response_tool_calls
+                            ],
+                            return_exceptions=True,
+                        )
+                        results = [
+                            (
+                                {
+                                    "tool_call_id": tool_call.get("id", ""),
+                                    "content": str(result),
+                                }
+                                if isinstance(result, Exception)
+                                else result
+                            )
+                            for tool_call, result in zip(response_tool_calls, results)
+                        ]
+
                     content_blocks[-1]["results"] = results
 
                     content_blocks.append(
@@ -2567,6 +2558,11 @@ async def process_chat_response(
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+                else:
+                    # Write the last buffered content before announcing done
+                    chat_save_buffer.discard(
+                        metadata["chat_id"], metadata["message_id"]
+                    )
 
                 # Send a webhook notification if the user is not active
                 if not get_active_status_by_user_id(user.id):
@@ -2605,6 +2601,17 @@ async def process_chat_response(
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+            finally:
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    # Don't leave the message pending if the stream ended
+                    # early, cancelled or failed
+                    chat_save_buffer.discard(
+                        metadata["chat_id"], metadata["message_id"]
+                    )
+
+                # Done and cancelled streams are dropped by the emitter, failed
+                # ones would otherwise stay in the pool
+                await STREAM_POOL.pop(f"{metadata['chat_id']}:{metadata['message_id']}")
 
             if response.background is not None:
                 await response.background()
@@ -2617,26 +2624,21 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filter_chain = compile_filter_functions(
+                request=request,
+                filter_functions=filter_functions,
+                filter_type="stream",
+                extra_params=extra_params,
+            )
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event = await stream_filter_chain(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data = await stream_filter_chain(data)
 
                 if data:
                     yield data
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from open_webui.models.models import Models
+from open_webui.utils.shared_state import shared_state
+from open_webui.env import SRC_LOG_LEVELS, MODEL_CATALOG_MAX_VIEWS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class CatalogView:
+    """A serialized model list with its strong ETag (hash of the body)."""
+
+    def __init__(self, value):
+        self.value = value
+        self.body = json.dumps(value, separators=(",", ":"), default=str).encode(
+            "utf-8"
+        )
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+class ModelCatalog:
+    """
+    Versioned cache of the model lists.
+
+    Entries (merged upstream lists, custom models, ...) are built once and
+    kept until the catalog version changes, i.e. until config, models or
+    functions change in any worker, or for at most `ttl` seconds for lists
+    fetched from upstream connections. Concurrent misses share one build.
+
+    Views are the serialized responses derived from an entry, e.g. the list
+    filtered for a set of groups; they are cached per entry build with their
+    ETag, so unchanged catalogs are answered without rebuilding, filtering
+    or serializing anything.
+    """
+
+    def __init__(self, max_views: int):
+        self.max_views = max_views
+
+        self.version = 0
+        self._entries: dict[str, tuple] = {}
+        self._builds: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._views: OrderedDict[tuple, CatalogView] = OrderedDict()
+
+        self.stats = {
+            "builds": 0,
+            "hits": 0,
+            "view_builds": 0,
+            "view_hits": 0,
+            "not_modified": 0,
+        }
+
+    def invalidate(self):
+        self.version += 1
+        self._entries.clear()
+        self._views.clear()
+
+    def _get_fresh(self, name: str):
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+
+        version, expires_at, value = entry
+        if version != self.version or (expires_at and expires_at < time.monotonic()):
+            return None
+        return entry
+
+    async def get(self, name: str, build: Callable, ttl: Optional[int] = None):
+        entry = self._get_fresh(name)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry[2]
+
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            # Built by a concurrent request while we waited
+            entry = self._get_fresh(name)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry[2]
+
+            version = self.version
+            value = build()
+            if inspect.isawaitable(value):
+                value = await value
+            self.stats["builds"] += 1
+
+            # Don't keep what was built from state invalidated meanwhile
+            if version == self.version:
+                self._entries[name] = (
+                    version,
+                    time.monotonic() + ttl if ttl else None,
+                    value,
+                )
+                self._builds[name] = self._builds.get(name, 0) + 1
+            return value
+
+    def get_view(self, name: str, key, build: Callable) -> CatalogView:
+        """The view `key` of entry `name`, built with `build()` on a miss."""
+        view_key = (name, self.version, self._builds.get(name, 0), key)
+        view = self._views.get(view_key)
+        if view is not None:
+            self._views.move_to_end(view_key)
+            self.stats["view_hits"] += 1
+            return view
+
+        view = CatalogView(build())
+        self.stats["view_builds"] += 1
+        self._views[view_key] = view
+        while len(self._views) > self.max_views:
+            self._views.popitem(last=False)
+        return view
+
+    def get_response(self, request: Request, view: CatalogView) -> Response:
+        """The view as a JSON response, or 304 if the client has it already."""
+        headers = {"ETag": view.etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if view.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=view.body, media_type="application/json", headers=headers
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "version": self.version,
+            "entries": len(self._entries),
+            "views": len(self._views),
+        }
+
+
+model_catalog = ModelCatalog(MODEL_CATALOG_MAX_VIEWS)
+
+# Config changes (connections, model lists) come from any worker, model and
+# function changes are announced as "models"
+shared_state.register_invalidator("config", model_catalog.invalidate)
+shared_state.register_invalidator("models", model_catalog.invalidate)
+
+
+def invalidate_models():
+    """Drop the model catalog after a model write, in every worker."""
+    shared_state.invalidate("models")
+
+
+def build_model_access() -> tuple[dict, set]:
+    """
+    Owner and access control of every custom model (one query), and the
+    users that are granted access to some model directly.
+    """
+    model_access = {}
+    user_ids = set()
+    for model in Models.get_all_models():
+        model_access[model.id] = (model.user_id, model.access_control)
+
+        user_ids.add(model.user_id)
+        if model.access_control is not None:
+            user_ids.update(model.access_control.get("read", {}).get("user_ids", []))
+    return model_access, user_ids
+
+
+async def get_model_access() -> tuple[dict, set]:
+    return await model_catalog.get("model_access", build_model_access)
+
+
+def get_user_view_key(user, group_ids: list[str], access_user_ids: set) -> tuple:
+    """
+    Users in the same groups see the same models, unless a model is owned
+    by or shared with the user directly; only those get a personal view.
+    """
+    return (
+        frozenset(group_ids),
+        user.id if user.id in access_user_ids else None,
+    )
+
+
+def filter_models_by_access(
+    models: list,
+    model_access: dict,
+    user_id: str,
+    group_ids: list[str],
+    id_key: str = "id",
+) -> list:
+    """Models readable by the user; same rules as has_access, no queries."""
+    group_ids = set(group_ids)
+
+    filtered_models = []
+    for model in models:
+        access = model_access.get(model[id_key])
+        if access is None:
+            continue
+
+        owner_id, access_control = access
+        if access_control is None:
+            readable = True
+        else:
+            read = access_control.get("read", {})
+            readable = user_id in read.get("user_ids", []) or not group_ids.isdisjoint(
+                read.get("group_ids", [])
+            )
+
+        if readable or user_id == owner_id:
+            filtered_models.append(model)
+    return filtered_models
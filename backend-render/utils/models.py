@@ -19,13 +19,14 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_catalog import model_catalog
 
 
 from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL, MODELS_CACHE_TTL
 from open_webui.models.users import UserModel
 
 
@@ -77,15 +78,21 @@ async def get_all_base_models(request: Request, user: UserModel = None):
 
 
 async def get_all_models(request, refresh: bool = False, user: UserModel = None):
-    if (
-        request.app.state.MODELS
-        and request.app.state.BASE_MODELS
-        and (request.app.state.config.ENABLE_BASE_MODELS_CACHE and not refresh)
-    ):
-        base_models = request.app.state.BASE_MODELS
-    else:
-        base_models = await get_all_base_models(request, user=user)
-        request.app.state.BASE_MODELS = base_models
+    if refresh or not request.app.state.config.ENABLE_BASE_MODELS_CACHE:
+        model_catalog.invalidate()
+
+    # Rebuilt when config, models or functions change; the upstream lists it
+    # is merged from expire on their own
+    return await model_catalog.get(
+        "models",
+        lambda: build_all_models(request, user=user),
+        ttl=MODELS_CACHE_TTL,
+    )
+
+
+async def build_all_models(request, user: UserModel = None):
+    base_models = await get_all_base_models(request, user=user)
+    request.app.state.BASE_MODELS = base_models
 
     # deep copy the base models to avoid modifying the original list
     models = [model.copy() for model in base_models]
@@ -132,70 +139,86 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
     global_action_ids = [
         function.id for function in Functions.get_global_action_functions()
     ]
-    enabled_action_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("action", active_only=True)
-    ]
-
     global_filter_ids = [
         function.id for function in Functions.get_global_filter_functions()
     ]
-    enabled_filter_ids = [
-        function.id
+
+    # Enabled functions by id, so models look them up without a query each
+    enabled_actions = {
+        function.id: function
+        for function in Functions.get_functions_by_type("action", active_only=True)
+    }
+    enabled_filters = {
+        function.id: function
         for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
+    }
+
+    # Index the models by id (Ollama models also by their id without the
+    # tag, e.g. 'llama3' for 'llama3:7b'), in list order
+    models_by_id = {}
+    ollama_models_by_name = {}
+    models_by_base_id = {}
+
+    def index_model(model):
+        models_by_id.setdefault(model["id"], []).append(model)
+        name = model["id"].split(":")[0]
+        if model.get("owned_by") == "ollama":
+            ollama_models_by_name.setdefault(name, []).append(model)
+        for base_id in {model["id"], name}:
+            models_by_base_id.setdefault(base_id, []).append(model)
+
+    for model in models:
+        index_model(model)
+
+    removed_models = set()
+
+    def get_models(index, model_id):
+        return [
+            model
+            for model in index.get(model_id, [])
+            if id(model) not in removed_models
+        ]
 
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
             # Applied directly to a base model
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        # Set action_ids and filter_ids
-                        action_ids = []
-                        filter_ids = []
-
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-                            filter_ids.extend(
-                                model["info"]["meta"].get("filterIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                        model["filter_ids"] = filter_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
-        ):
+            matches = get_models(models_by_id, custom_model.id) + [
+                model
+                for model in get_models(ollama_models_by_name, custom_model.id)
+                if model["id"] != custom_model.id
+            ]
+            for model in matches:
+                if custom_model.is_active:
+                    model["name"] = custom_model.name
+                    model["info"] = custom_model.model_dump()
+
+                    # Set action_ids and filter_ids
+                    action_ids = []
+                    filter_ids = []
+
+                    if "info" in model and "meta" in model["info"]:
+                        action_ids.extend(model["info"]["meta"].get("actionIds", []))
+                        filter_ids.extend(model["info"]["meta"].get("filterIds", []))
+
+                    model["action_ids"] = action_ids
+                    model["filter_ids"] = filter_ids
+                else:
+                    removed_models.add(id(model))
+
+        elif custom_model.is_active and not get_models(models_by_id, custom_model.id):
             owned_by = "openai"
             pipe = None
 
             action_ids = []
             filter_ids = []
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
-                    owned_by = model.get("owned_by", "unknown owner")
-                    if "pipe" in model:
-                        pipe = model["pipe"]
-                    break
+            base_models = get_models(models_by_base_id, custom_model.base_model_id)
+            if base_models:
+                base_model = base_models[0]
+                owned_by = base_model.get("owned_by", "unknown owner")
+                if "pipe" in base_model:
+                    pipe = base_model["pipe"]
 
             if custom_model.meta:
                 meta = custom_model.meta.model_dump()
@@ -206,20 +229,22 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
                 if "filterIds" in meta:
                     filter_ids.extend(meta["filterIds"])
 
-            models.append(
-                {
-                    "id": f"{custom_model.id}",
-                    "name": custom_model.name,
-                    "object": "model",
-                    "created": custom_model.created_at,
-                    "owned_by": owned_by,
-                    "info": custom_model.model_dump(),
-                    "preset": True,
-                    **({"pipe": pipe} if pipe is not None else {}),
-                    "action_ids": action_ids,
-                    "filter_ids": filter_ids,
-                }
-            )
+            model = {
+                "id": f"{custom_model.id}",
+                "name": custom_model.name,
+                "object": "model",
+                "created": custom_model.created_at,
+                "owned_by": owned_by,
+                "info": custom_model.model_dump(),
+                "preset": True,
+                **({"pipe": pipe} if pipe is not None else {}),
+                "action_ids": action_ids,
+                "filter_ids": filter_ids,
+            }
+            models.append(model)
+            index_model(model)
+
+    models = [model for model in models if id(model) not in removed_models]
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -269,41 +294,48 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         function_module, _, _ = get_function_module_from_cache(request, function_id)
         return function_module
 
+    # The items of a function are the same for every model, build them once
+    action_items = {}
+    filter_items = {}
+
+    def get_action_items(action_id):
+        if action_id not in action_items:
+            action_items[action_id] = get_action_items_from_module(
+                enabled_actions[action_id], get_function_module_by_id(action_id)
+            )
+        return action_items[action_id]
+
+    def get_filter_items(filter_id):
+        if filter_id not in filter_items:
+            function_module = get_function_module_by_id(filter_id)
+            filter_items[filter_id] = (
+                get_filter_items_from_module(
+                    enabled_filters[filter_id], function_module
+                )
+                if getattr(function_module, "toggle", None)
+                else []
+            )
+        return filter_items[filter_id]
+
     for model in models:
         action_ids = [
             action_id
             for action_id in list(set(model.pop("action_ids", []) + global_action_ids))
-            if action_id in enabled_action_ids
+            if action_id in enabled_actions
         ]
         filter_ids = [
             filter_id
             for filter_id in list(set(model.pop("filter_ids", []) + global_filter_ids))
-            if filter_id in enabled_filter_ids
+            if filter_id in enabled_filters
         ]
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
-            model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
-            )
+            model["actions"].extend(get_action_items(action_id))
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
-            if filter_function is None:
-                raise Exception(f"Filter not found: {filter_id}")
-
-            function_module = get_function_module_by_id(filter_id)
-
-            if getattr(function_module, "toggle", None):
-                model["filters"].extend(
-                    get_filter_items_from_module(filter_function, function_module)
-                )
+            model["filters"].extend(get_filter_items(filter_id))
 
     log.debug(f"get_all_models() returned {len(models)} models")
 
@@ -50,6 +50,7 @@ from open_webui.env import (
 from open_webui.utils.misc import parse_duration
 from open_webui.utils.auth import get_password_hash, create_token
 from open_webui.utils.webhook import post_webhook
+from open_webui.utils.user_cache import user_cache
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
@@ -451,6 +452,7 @@ class OAuthManager:
             determined_role = self.get_user_role(user, user_data)
             if user.role != determined_role:
                 Users.update_user_role_by_id(user.id, determined_role)
+                user_cache.invalidate(user.id)
 
             # Update profile picture if enabled and different from current
             if auth_manager_config.OAUTH_UPDATE_PICTURE_ON_LOGIN:
@@ -466,6 +468,7 @@ class OAuthManager:
                         Users.update_user_profile_image_url_by_id(
                             user.id, processed_picture_url
                         )
+                        user_cache.invalidate(user.id)
                         log.debug(f"Updated profile picture for user {user.email}")
 
         if not user:
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    OLLAMA_BALANCER_POLL_INTERVAL,
+    OLLAMA_BALANCER_MAX_IN_FLIGHT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
+
+
+class OllamaNode:
+    def __init__(self, url: str):
+        self.url = url
+        # Models resident in memory, from the last /api/ps poll plus the
+        # models we have routed to this node since
+        self.loaded: set[str] = set()
+        self.in_flight = 0
+        self.requests = 0
+
+
+class OllamaBalancer:
+    """
+    Chooses the Ollama node for a model.
+
+    Loaded models per node come from polling /api/ps (at most every
+    `poll_interval` seconds, in the background of the requests that need
+    it), and in-flight generations are counted per node. In order of
+    preference a request goes to:
+
+    1. a node with the model loaded and fewer than `max_in_flight`
+       generations running,
+    2. an idle node without it, holding as few other models as possible,
+       so loading it evicts nothing that is in use,
+    3. a saturated node with the model loaded,
+    4. only then a busy node that would have to load it.
+
+    Ties are broken by the fewest generations, then at random.
+    """
+
+    def __init__(self, poll_interval: float, max_in_flight: int):
+        self.poll_interval = poll_interval
+        self.max_in_flight = max_in_flight
+
+        self.nodes: dict[str, OllamaNode] = {}
+        self.last_poll = 0.0
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def get_node(self, url: str) -> OllamaNode:
+        if url not in self.nodes:
+            self.nodes[url] = OllamaNode(url)
+        return self.nodes[url]
+
+    def update_loaded_models(self, loaded_models: dict[str, set[str]]):
+        for url, node in self.nodes.items():
+            node.loaded = set(loaded_models.get(url, set()))
+        for url, models in loaded_models.items():
+            self.get_node(url).loaded = set(models)
+
+    async def _poll(self, fetch_loaded_models: Callable[[], Awaitable[dict]]):
+        try:
+            self.update_loaded_models(await fetch_loaded_models())
+        except Exception as e:
+            log.debug(f"Failed to poll loaded Ollama models: {e}")
+
+    def refresh(self, fetch_loaded_models: Callable[[], Awaitable[dict]]):
+        """Start a background poll if the loaded models are stale."""
+        if time.monotonic() - self.last_poll < self.poll_interval:
+            return
+        if self._poll_task is not None and not self._poll_task.done():
+            return
+
+        self.last_poll = time.monotonic()
+        self._poll_task = asyncio.create_task(self._poll(fetch_loaded_models))
+
+    def _get_rank(self, node: OllamaNode, model: str) -> tuple:
+        loaded = model in node.loaded
+        if loaded and node.in_flight < self.max_in_flight:
+            return (0, node.in_flight)
+        if not loaded and node.in_flight == 0:
+            return (1, len(node.loaded))
+        if loaded:
+            return (2, node.in_flight)
+        return (3, node.in_flight, len(node.loaded))
+
+    def select(self, model: str, urls: list[str]) -> str:
+        """Return the best of `urls` for `model`."""
+        if len(urls) == 1:
+            return urls[0]
+
+        ranks = {url: self._get_rank(self.get_node(url), model) for url in urls}
+        best = min(ranks.values())
+        url = random.choice([url for url, rank in ranks.items() if rank == best])
+
+        # The node loads the model for this request; route followers there too
+        # until the next poll tells otherwise
+        self.get_node(url).loaded.add(model)
+        return url
+
+    def acquire(self, url: str):
+        node = self.get_node(url)
+        node.in_flight += 1
+        node.requests += 1
+
+    def release(self, url: str):
+        node = self.get_node(url)
+        node.in_flight = max(node.in_flight - 1, 0)
+
+    def get_stats(self) -> dict:
+        return {
+            url: {
+                "loaded": sorted(node.loaded),
+                "in_flight": node.in_flight,
+                "requests": node.requests,
+            }
+            for url, node in self.nodes.items()
+        }
+
+
+ollama_balancer = OllamaBalancer(
+    OLLAMA_BALANCER_POLL_INTERVAL, OLLAMA_BALANCER_MAX_IN_FLIGHT
+)
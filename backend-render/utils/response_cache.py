@@ -0,0 +1,269 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_KEY_PREFIX,
+    RESPONSE_CACHE_MODELS,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    WEBSOCKET_MANAGER,
+    WEBSOCKET_REDIS_URL,
+    WEBSOCKET_REDIS_CLUSTER,
+    WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_SENTINEL_PORT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Request fields that do not change the generated answer
+NON_GENERATION_FIELDS = {
+    "stream",
+    "stream_options",
+    "metadata",
+    "chat_id",
+    "id",
+    "session_id",
+    "task_id",
+    "background_tasks",
+    "features",
+    "variables",
+    "model_item",
+    "user",
+}
+
+
+def get_payload_hash(payload: dict) -> str:
+    """Hash of the canonical form of a completion payload (model, messages, params)."""
+    canonical = {
+        key: value
+        for key, value in payload.items()
+        if key not in NON_GENERATION_FIELDS and value is not None
+    }
+    data = json.dumps(
+        canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class InProcessCacheBackend:
+    """
+    Size-bounded LRU of (expiry, value) pairs, local to the worker. Values are
+    stored serialized so callers can't mutate cached responses.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return json.loads(value)
+
+    async def set(self, key: str, value: dict, ttl: int) -> int:
+        self._entries[key] = (time.monotonic() + ttl, json.dumps(value))
+        self._entries.move_to_end(key)
+
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Entries shared by all workers. Values expire through Redis TTLs; a sorted
+    set of last access times bounds the number of entries (LRU eviction).
+    """
+
+    def __init__(self, redis, key_prefix: str, max_entries: int):
+        self.redis = redis
+        self.key_prefix = f"{key_prefix}:response_cache"
+        self.lru_key = f"{self.key_prefix}:lru"
+        self.max_entries = max_entries
+
+    def _get_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    async def get(self, key: str):
+        value = await self.redis.get(self._get_key(key))
+        if value is None:
+            await self.redis.zrem(self.lru_key, key)
+            return None
+
+        await self.redis.zadd(self.lru_key, {key: time.time()})
+        return json.loads(value)
+
+    async def set(self, key: str, value: dict, ttl: int) -> int:
+        await self.redis.set(self._get_key(key), json.dumps(value), ex=ttl)
+        await self.redis.zadd(self.lru_key, {key: time.time()})
+
+        excess = await self.redis.zcard(self.lru_key) - self.max_entries
+        if excess <= 0:
+            return 0
+
+        evicted = [item for item, _ in await self.redis.zpopmin(self.lru_key, excess)]
+        if evicted:
+            await self.redis.delete(*[self._get_key(item) for item in evicted])
+        return len(evicted)
+
+    async def size(self) -> int:
+        return await self.redis.zcard(self.lru_key)
+
+
+class ResponseCache:
+    """
+    Exact-match cache of non-streamed chat completions.
+
+    Opt-in per model (RESPONSE_CACHE_MODELS, `*` for all). Task completions
+    (titles, tags, queries, ...) are cached for enabled models; regular chat
+    completions only when they are deterministic (temperature 0).
+    """
+
+    def __init__(self, backend, ttl: int, models: list[str]):
+        self.backend = backend
+        self.ttl = ttl
+        self.models = set(models)
+
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    def is_enabled_for(self, model_id: Optional[str]) -> bool:
+        return bool(model_id) and ("*" in self.models or model_id in self.models)
+
+    def get_key(self, payload: dict, task: bool = False) -> Optional[str]:
+        """Cache key of the payload, or None when it must not be cached."""
+        if not self.is_enabled_for(payload.get("model")):
+            return None
+        if not task and payload.get("temperature") != 0:
+            return None
+        return get_payload_hash(payload)
+
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            log.warning(f"Response cache lookup failed: {e}")
+            self.stats["errors"] += 1
+            value = None
+
+        self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(self, key: str, value: dict):
+        # Only successful completions are worth replaying
+        if not isinstance(value, dict) or "error" in value or not value.get("choices"):
+            return
+
+        try:
+            self.stats["evictions"] += await self.backend.set(key, value, self.ttl)
+            self.stats["stores"] += 1
+        except Exception as e:
+            log.warning(f"Response cache store failed: {e}")
+            self.stats["errors"] += 1
+
+    async def get_or_generate(
+        self, payload: dict, generate: Callable[[], Awaitable], task: bool = False
+    ):
+        key = self.get_key(payload, task=task)
+        if key is None:
+            return await generate()
+
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        response = await generate()
+        await self.set(key, response)
+        return response
+
+    async def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        try:
+            size = await self.backend.size()
+        except Exception:
+            size = None
+
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "size": size,
+            "ttl": self.ttl,
+            "models": sorted(self.models),
+        }
+
+
+def get_completion_content(response: dict) -> str:
+    choices = response.get("choices") or [{}]
+    return (choices[0].get("message") or {}).get("content") or ""
+
+
+def iter_sse_replay(response: dict, chunk_size: int):
+    """Replay a cached completion as OpenAI `chat.completion.chunk` SSE frames."""
+    content = get_completion_content(response)
+    base = {
+        "id": response.get("id"),
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": response.get("model"),
+    }
+
+    chunk_size = max(chunk_size, 1)
+    for start in range(0, len(content), chunk_size):
+        chunk = {
+            **base,
+            "choices": [
+                {"index": 0, "delta": {"content": content[start : start + chunk_size]}}
+            ],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+
+    finish_reason = (response.get("choices") or [{}])[0].get("finish_reason", "stop")
+    chunk = {
+        **base,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+    }
+    if response.get("usage"):
+        chunk["usage"] = response["usage"]
+    yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+if WEBSOCKET_MANAGER == "redis":
+    response_cache_backend = RedisCacheBackend(
+        get_redis_connection(
+            redis_url=WEBSOCKET_REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+            ),
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+            async_mode=True,
+        ),
+        REDIS_KEY_PREFIX,
+        RESPONSE_CACHE_MAX_ENTRIES,
+    )
+else:
+    response_cache_backend = InProcessCacheBackend(RESPONSE_CACHE_MAX_ENTRIES)
+
+response_cache = ResponseCache(
+    response_cache_backend, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MODELS
+)
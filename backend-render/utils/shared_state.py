@@ -0,0 +1,191 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+from typing import Callable, Optional
+
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_KEY_PREFIX,
+    WEBSOCKET_MANAGER,
+    WEBSOCKET_REDIS_URL,
+    WEBSOCKET_REDIS_CLUSTER,
+    WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_SENTINEL_PORT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class SharedState:
+    """
+    Keeps per-process state consistent across uvicorn workers.
+
+    Runtime config changes are written to a Redis hash (so workers started
+    later pick them up) and announced on a pub/sub channel together with
+    cache invalidations. Every worker listens on the channel and applies the
+    messages of the other workers locally, so reads stay plain attribute and
+    dict lookups with no Redis round trip.
+
+    Without Redis there is a single worker and only the local invalidation
+    callbacks run.
+    """
+
+    def __init__(self, redis=None, async_redis=None, key_prefix: str = ""):
+        self.redis = redis
+        self.async_redis = async_redis
+        self.config_key = f"{key_prefix}:config"
+        self.channel = f"{key_prefix}:shared_state"
+
+        # Identifies this worker so it ignores its own messages
+        self.worker_id = f"{os.getpid()}:{id(self)}"
+
+        self._config = None
+        self._invalidators: dict[str, list[Callable]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    def register_invalidator(self, name: str, callback: Callable):
+        """
+        Run `callback` when `name` is invalidated; for keyed invalidations
+        it is called with the key.
+        """
+        self._invalidators.setdefault(name, []).append(callback)
+
+    def _run_invalidators(self, name: str, *args):
+        for callback in self._invalidators.get(name, []):
+            try:
+                result = callback(*args)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                log.warning(f"Error invalidating {name}: {e}")
+
+    def _publish(self, message: dict):
+        try:
+            self.redis.publish(
+                self.channel, json.dumps({**message, "worker_id": self.worker_id})
+            )
+        except Exception as e:
+            log.warning(f"Failed to publish shared state update: {e}")
+
+    def attach_config(self, config):
+        """Load the shared values into `config` and share its future changes."""
+        self._config = config
+        if not self.enabled:
+            return
+
+        try:
+            values = self.redis.hgetall(self.config_key)
+        except Exception as e:
+            log.warning(f"Failed to load shared config: {e}")
+            return
+
+        for key, value in values.items():
+            try:
+                object.__setattr__(config, key, json.loads(value))
+            except ValueError:
+                continue
+
+    def publish_config(self, key: str, value):
+        if not self.enabled:
+            return
+
+        try:
+            value = json.dumps(value)
+        except TypeError:
+            log.debug(f"Config {key} is not JSON serializable, not shared")
+            return
+
+        try:
+            self.redis.hset(self.config_key, key, value)
+        except Exception as e:
+            log.warning(f"Failed to store shared config {key}: {e}")
+            return
+        self._publish({"type": "config", "key": key, "value": value})
+
+    def invalidate(self, name: str, key: Optional[str] = None):
+        """
+        Drop the named cache in this worker and in every other one, or only
+        its entry `key`.
+        """
+        args = () if key is None else (key,)
+        self._run_invalidators(name, *args)
+        if self.enabled:
+            self._publish({"type": "invalidate", "name": name, "key": key})
+
+    def _handle_message(self, message: dict):
+        if message.get("worker_id") == self.worker_id:
+            return
+
+        if message.get("type") == "config" and self._config is not None:
+            object.__setattr__(
+                self._config, message["key"], json.loads(message["value"])
+            )
+            # Config changes (connections, model settings) invalidate the
+            # model caches built from them
+            self._run_invalidators("config")
+        elif message.get("type") == "invalidate":
+            key = message.get("key")
+            self._run_invalidators(
+                message.get("name"), *(() if key is None else (key,))
+            )
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.async_redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self._handle_message(json.loads(message["data"]))
+                    except Exception as e:
+                        log.warning(f"Invalid shared state message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Shared state listener failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+    def start(self):
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+if WEBSOCKET_MANAGER == "redis":
+    redis_sentinels = get_sentinels_from_env(
+        WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+    )
+    shared_state = SharedState(
+        redis=get_redis_connection(
+            redis_url=WEBSOCKET_REDIS_URL,
+            redis_sentinels=redis_sentinels,
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+        ),
+        async_redis=get_redis_connection(
+            redis_url=WEBSOCKET_REDIS_URL,
+            redis_sentinels=redis_sentinels,
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+            async_mode=True,
+        ),
+        key_prefix=REDIS_KEY_PREFIX,
+    )
+else:
+    shared_state = SharedState()
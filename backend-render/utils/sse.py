@@ -0,0 +1,195 @@
+import json
+from typing import AsyncIterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]):
+    """Decode JSON with orjson when available, falling back to the stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class SSEEvent:
+    """
+    A single server-sent event.
+
+    `raw` is the frame as received (without the terminating blank line) and
+    `data` the joined `data:` lines, both kept as bytes so events can be
+    forwarded without decoding.
+    """
+
+    __slots__ = ("raw", "event", "data", "id", "retry")
+
+    def __init__(
+        self,
+        raw: bytes,
+        event: Optional[str] = None,
+        data: Optional[bytes] = None,
+        id: Optional[str] = None,
+        retry: Optional[int] = None,
+    ):
+        self.raw = raw
+        self.event = event
+        self.data = data
+        self.id = id
+        self.retry = retry
+
+    @property
+    def is_done(self) -> bool:
+        return self.data is not None and self.data.strip() == b"[DONE]"
+
+    def json(self):
+        return loads(self.data)
+
+    def encode(self) -> bytes:
+        return self.raw + b"\n\n"
+
+    @classmethod
+    def from_frame(cls, frame: bytes) -> "SSEEvent":
+        # Fast path for the common single "data:" line frame
+        if frame.startswith(b"data:") and b"\n" not in frame:
+            data = frame[5:]
+            if data.startswith(b" "):
+                data = data[1:]
+            return cls(frame, data=data)
+
+        event = None
+        data_lines = []
+        id = None
+        retry = None
+
+        for line in frame.split(b"\n"):
+            if not line or line.startswith(b":"):
+                # Empty line or comment
+                continue
+
+            field, _, value = line.partition(b":")
+            if value.startswith(b" "):
+                value = value[1:]
+
+            if field == b"data":
+                data_lines.append(value)
+            elif field == b"event":
+                event = value.decode("utf-8", "replace")
+            elif field == b"id":
+                id = value.decode("utf-8", "replace")
+            elif field == b"retry" and value.isdigit():
+                retry = int(value)
+
+        return cls(
+            frame,
+            event=event,
+            data=b"\n".join(data_lines) if data_lines else None,
+            id=id,
+            retry=retry,
+        )
+
+
+class SSEParser:
+    """
+    Incremental parser turning arbitrary byte chunks into SSE frames.
+
+    Chunks do not need to line up with event boundaries: partial events are
+    buffered until their terminating blank line arrives. CRLF and CR line
+    endings are normalized to LF, including a CRLF split across chunks.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # Position up to which the buffer is known to hold no boundary
+        self._scan_offset = 0
+        self._pending_cr = False
+
+    def feed_frames(self, chunk: Union[bytes, str]) -> list[bytes]:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+
+        if self._pending_cr:
+            chunk = b"\r" + chunk
+            self._pending_cr = False
+
+        if b"\r" in chunk:
+            if chunk.endswith(b"\r"):
+                # Might be the first half of a CRLF
+                chunk = chunk[:-1]
+                self._pending_cr = True
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        buffer = self._buffer
+        buffer += chunk
+
+        frames = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n\n", max(start, self._scan_offset))
+            if end == -1:
+                break
+
+            if end > start:
+                frames.append(bytes(buffer[start:end]))
+            start = end + 2
+            self._scan_offset = start
+
+        if start:
+            del buffer[:start]
+        # A boundary can start on the last byte of the buffer
+        self._scan_offset = max(len(buffer) - 1, 0)
+
+        return frames
+
+    def feed(self, chunk: Union[bytes, str]) -> list[SSEEvent]:
+        return [SSEEvent.from_frame(frame) for frame in self.feed_frames(chunk)]
+
+    def flush_frames(self) -> list[bytes]:
+        """Return a trailing event that was not terminated by a blank line."""
+        frame = bytes(self._buffer).strip(b"\n")
+        self._buffer.clear()
+        self._scan_offset = 0
+        self._pending_cr = False
+        return [frame] if frame else []
+
+    def flush(self) -> list[SSEEvent]:
+        return [SSEEvent.from_frame(frame) for frame in self.flush_frames()]
+
+
+def is_side_channel_frame(frame: bytes) -> bool:
+    """
+    Cheap byte scan for frames worth parsing when passing a stream through:
+    the terminating [DONE], usage reports and errors. Content deltas, which
+    make up nearly all of a stream, are not decoded on the relay path.
+    """
+    if b"[DONE]" in frame or b'"error"' in frame:
+        return True
+
+    # With include_usage every chunk carries "usage": null until the last one
+    index = frame.find(b'"usage"')
+    return index != -1 and not frame[index + 7 : index + 16].lstrip(b": ").startswith(
+        b"null"
+    )
+
+
+async def aiter_sse_frames(chunks: AsyncIterable[Union[bytes, str]]):
+    """Re-chunk a byte stream so that every item is one complete SSE frame."""
+    parser = SSEParser()
+    async for chunk in chunks:
+        for frame in parser.feed_frames(chunk):
+            yield frame
+    for frame in parser.flush_frames():
+        yield frame
+
+
+async def aiter_sse_chunks(chunks: AsyncIterable[Union[bytes, str]]):
+    """Like aiter_sse_frames, but keeps the terminating blank line for passthrough."""
+    async for frame in aiter_sse_frames(chunks):
+        yield frame + b"\n\n"
+
+
+async def aiter_sse_events(chunks: AsyncIterable[Union[bytes, str]]):
+    """Parse a byte stream into SSEEvent objects."""
+    async for frame in aiter_sse_frames(chunks):
+        yield SSEEvent.from_frame(frame)
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Flush stats of the most recently finished streams
+STREAM_FLUSH_STATS = deque(maxlen=100)
+
+
+class StreamDeltaFlusher:
+    """
+    Coalesces streaming "chat:completion" updates before they are emitted.
+
+    Streamed data is cumulative (each update carries the whole serialized
+    content), so only the latest pending update is kept. It is emitted once
+    `max_chunks` chunks or `max_bytes` bytes are pending, or once the oldest
+    pending chunk is `max_latency_ms` old, whichever comes first. Zero
+    `max_chunks` flushes on latency and size only.
+
+    Emits run in the background, at most one at a time. While the emitter is
+    still busy with the previous update, new chunks keep being coalesced, so
+    a slow consumer gets fewer, larger updates instead of a growing queue.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[dict], Awaitable[None]],
+        max_chunks: int,
+        max_latency_ms: int,
+        max_bytes: int,
+        stream_id: Optional[str] = None,
+    ):
+        self.emit = emit
+        self.max_chunks = max_chunks
+        self.max_latency = max_latency_ms / 1000
+        self.max_bytes = max_bytes
+
+        self._pending = None
+        self._pending_chunks = 0
+        self._pending_bytes = 0
+        self._pending_since = None
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._draining = False
+
+        self.stats = {
+            "stream_id": stream_id,
+            "chunks": 0,
+            "bytes": 0,
+            "flushes": 0,
+            # Chunks merged into a later flush while the emitter was busy
+            "backpressure_chunks": 0,
+            "flush_latency_max_ms": 0.0,
+            "emit_time_total_ms": 0.0,
+            "emit_time_max_ms": 0.0,
+            "started_at": time.time(),
+        }
+
+    def _is_due(self) -> bool:
+        return (
+            self._draining
+            or (self.max_chunks and self._pending_chunks >= self.max_chunks)
+            or self._pending_bytes >= self.max_bytes
+            or time.monotonic() - self._pending_since >= self.max_latency
+        )
+
+    def _is_emitting(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def push(self, data: dict, size: int = 0):
+        if self._is_emitting() and self._pending is not None:
+            self.stats["backpressure_chunks"] += 1
+
+        if self._pending is None:
+            self._pending_since = time.monotonic()
+
+        self._pending = data
+        self._pending_chunks += 1
+        self._pending_bytes += size
+
+        self.stats["chunks"] += 1
+        self.stats["bytes"] += size
+
+        if self._is_emitting():
+            if self._is_due():
+                self._wakeup.set()
+        else:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending is not None:
+            if not self._is_due():
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        self.max_latency - (time.monotonic() - self._pending_since),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+            await self._emit_pending()
+
+    async def _emit_pending(self):
+        if self._pending is None:
+            return
+
+        data = self._pending
+        latency_ms = (time.monotonic() - self._pending_since) * 1000
+
+        self._pending = None
+        self._pending_chunks = 0
+        self._pending_bytes = 0
+        self._pending_since = None
+
+        start_time = time.perf_counter()
+        try:
+            await self.emit(data)
+        except Exception as e:
+            log.debug(f"Error emitting stream delta: {e}")
+        emit_time_ms = (time.perf_counter() - start_time) * 1000
+
+        self.stats["flushes"] += 1
+        self.stats["flush_latency_max_ms"] = max(
+            self.stats["flush_latency_max_ms"], latency_ms
+        )
+        self.stats["emit_time_total_ms"] += emit_time_ms
+        self.stats["emit_time_max_ms"] = max(
+            self.stats["emit_time_max_ms"], emit_time_ms
+        )
+
+    async def flush(self):
+        """Emit whatever is pending and wait until it has been emitted."""
+        self._draining = True
+        try:
+            if self._is_emitting():
+                self._wakeup.set()
+                await self._task
+            await self._emit_pending()
+        finally:
+            self._draining = False
+
+    async def close(self, flush: bool = True):
+        """
+        Stop the flusher and record its stats. Without `flush`, the pending
+        update is dropped and an emit in progress is cancelled.
+        """
+        if flush:
+            await self.flush()
+        else:
+            self._pending = None
+            if self._is_emitting():
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+
+        STREAM_FLUSH_STATS.append(
+            {
+                **self.stats,
+                "duration_ms": (time.time() - self.stats["started_at"]) * 1000,
+            }
+        )
+
+
+def get_stream_flush_stats() -> dict:
+    streams = list(STREAM_FLUSH_STATS)
+    return {
+        "streams": streams,
+        "chunks": sum(stream["chunks"] for stream in streams),
+        "flushes": sum(stream["flushes"] for stream in streams),
+        "backpressure_chunks": sum(stream["backpressure_chunks"] for stream in streams),
+    }
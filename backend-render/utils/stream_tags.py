@@ -0,0 +1,192 @@
+import re
+import time
+
+
+def get_start_tag_pattern(start_tag: str) -> str:
+    if start_tag.startswith("<") and start_tag.endswith(">"):
+        # Match start tag e.g., <tag> or <tag attr="value">
+        return rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>"
+    return rf"{re.escape(start_tag)}"
+
+
+def extract_attributes(tag_content):
+    """Extract attributes from a tag if they exist."""
+    attributes = {}
+    if not tag_content:  # Ensure tag_content is not None
+        return attributes
+    # Match attributes in the format: key="value" (ignores single quotes for simplicity)
+    matches = re.findall(r'(\w+)\s*=\s*"([^"]+)"', tag_content)
+    for key, value in matches:
+        attributes[key] = value
+    return attributes
+
+
+class StreamingTagDetector:
+    """
+    Detects start/end tags of one content type (reasoning, code_interpreter,
+    solution, ...) while a message streams in.
+
+    Only the trailing block of `content_blocks` is inspected and only from
+    the position where the previous call stopped, keeping enough of the
+    tail to catch tags split across chunks. Per-delta cost is therefore
+    bounded by the delta size instead of the message length.
+    """
+
+    def __init__(self, content_type: str, tags: list[tuple[str, str]]):
+        self.content_type = content_type
+        self.tags = tags
+        self.start_tag_patterns = [
+            re.compile(get_start_tag_pattern(start_tag)) for start_tag, _ in tags
+        ]
+        self.lookback = max(len(start_tag) for start_tag, _ in tags) - 1
+
+        # Block currently being scanned and the offset scanning resumes from
+        self.block = None
+        self.offset = 0
+
+        # (start_tag, end_tag) of the most recently closed block
+        self.closed_tag = None
+
+    def _is_pending_start_tag(self, text: str, pos: int) -> bool:
+        """Whether the "<" at `pos` may still become one of the start tags."""
+        remaining = len(text) - pos
+        for start_tag, _ in self.tags:
+            # A start tag cut off by the end of the content
+            if remaining < len(start_tag) and start_tag.startswith(text[pos:]):
+                return True
+
+            # "<tag attr=..." still missing its ">"
+            if start_tag.startswith("<") and start_tag.endswith(">"):
+                name = start_tag[:-1]
+                if (
+                    remaining > len(name)
+                    and text.startswith(name, pos)
+                    and text[pos + len(name)].isspace()
+                ):
+                    return True
+        return False
+
+    def _get_offset(self, block):
+        if block is not self.block:
+            self.block = block
+            self.offset = 0
+        return self.offset
+
+    def process(self, content_blocks: list) -> bool:
+        """
+        Update `content_blocks` in place for newly streamed content.
+        Returns True when a block of this content type was closed.
+        """
+        if not content_blocks:
+            return False
+
+        if content_blocks[-1]["type"] == "text":
+            return self._process_start_tag(content_blocks)
+        elif content_blocks[-1]["type"] == self.content_type:
+            return self._process_end_tag(content_blocks)
+        return False
+
+    def _process_start_tag(self, content_blocks: list) -> bool:
+        block = content_blocks[-1]
+        text = block["content"]
+        offset = self._get_offset(block)
+
+        for (start_tag, end_tag), pattern in zip(self.tags, self.start_tag_patterns):
+            match = pattern.search(text, offset)
+            if not match:
+                continue
+
+            try:
+                attr_content = (
+                    match.group(1) if match.group(1) else ""
+                )  # Ensure it's not None
+            except IndexError:
+                attr_content = ""
+
+            before_tag = text[: match.start()]  # Content before opening tag
+            after_tag = text[match.end() :]  # Content after opening tag
+
+            block["content"] = before_tag
+            if not block["content"]:
+                content_blocks.pop()
+
+            content_blocks.append(
+                {
+                    "type": self.content_type,
+                    "start_tag": start_tag,
+                    "end_tag": end_tag,
+                    "attributes": extract_attributes(attr_content),
+                    "content": after_tag,
+                    "started_at": time.time(),
+                }
+            )
+
+            if after_tag:
+                return self._process_end_tag(content_blocks)
+            return False
+
+        # Resume before any tag that may still be incomplete: the last
+        # `lookback` characters, or an opened "<tag ..." still missing its ">".
+        # A "<" that can no longer start a tag doesn't hold the offset back.
+        resume_offset = max(offset, len(text) - self.lookback)
+        boundary = max(text.rfind("\n", offset), text.rfind(">", offset))
+        pending_tag_offset = text.find("<", max(boundary + 1, offset))
+        while pending_tag_offset != -1 and pending_tag_offset < resume_offset:
+            if self._is_pending_start_tag(text, pending_tag_offset):
+                resume_offset = pending_tag_offset
+                break
+            pending_tag_offset = text.find("<", pending_tag_offset + 1)
+
+        self.offset = resume_offset
+        return False
+
+    def _process_end_tag(self, content_blocks: list) -> bool:
+        block = content_blocks[-1]
+        start_tag = block["start_tag"]
+        end_tag = block["end_tag"]
+
+        offset = self._get_offset(block)
+        if block["content"].find(end_tag, max(offset - len(end_tag) + 1, 0)) == -1:
+            self.offset = len(block["content"])
+            return False
+
+        block_content = block["content"]
+        # Strip start and end tags from the content
+        start_tag_pattern = rf"<{re.escape(start_tag)}(.*?)>"
+        block_content = re.sub(start_tag_pattern, "", block_content).strip()
+
+        end_tag_regex = re.compile(re.escape(end_tag), re.DOTALL)
+        split_content = end_tag_regex.split(block_content, maxsplit=1)
+
+        # Content inside the tag
+        block_content = split_content[0].strip() if split_content else ""
+
+        # Leftover content (everything after `</tag>`)
+        leftover_content = split_content[1].strip() if len(split_content) > 1 else ""
+
+        if block_content:
+            block["content"] = block_content
+            block["ended_at"] = time.time()
+            block["duration"] = int(block["ended_at"] - block["started_at"])
+
+            # Reset the content_blocks by appending a new text block
+            if self.content_type != "code_interpreter":
+                content_blocks.append(
+                    {
+                        "type": "text",
+                        "content": leftover_content,
+                    }
+                )
+        else:
+            # Remove the block if content is empty
+            content_blocks.pop()
+            content_blocks.append(
+                {
+                    "type": "text",
+                    "content": leftover_content,
+                }
+            )
+
+        self.offset = len(block["content"])
+        self.closed_tag = (start_tag, end_tag)
+        return True
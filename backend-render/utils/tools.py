@@ -218,6 +218,10 @@ async def get_tools(
                         "file_handler": hasattr(module, "file_handler")
                         and module.file_handler,
                         "citation": hasattr(module, "citation") and module.citation,
+                        # Execution options
+                        "concurrency": getattr(module, "concurrency", None),
+                        "timeout": getattr(module, "timeout", None),
+                        "sequential": getattr(module, "sequential", False),
                     },
                 }
 
@@ -0,0 +1,182 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from open_webui.models.users import Users, UserModel, get_api_key_hash
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.utils.shared_state import shared_state
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_KEY_PREFIX,
+    USER_CACHE_TTL,
+    USER_CACHE_MAX_ENTRIES,
+    WEBSOCKET_MANAGER,
+    WEBSOCKET_REDIS_URL,
+    WEBSOCKET_REDIS_CLUSTER,
+    WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_SENTINEL_PORT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class UserCache:
+    """
+    Short-lived cache of users by id for request authentication.
+
+    Users are kept in a size-bounded in-process LRU for `ttl` seconds and,
+    with Redis, in a shared layer so a worker's first lookup doesn't hit
+    the database either. Writes to a user (role, profile, settings, API
+    key, deletion) must call `invalidate`, which also drops the user from the
+    other workers' in-process entries.
+
+    API keys are resolved to user ids by their hash, kept in process only;
+    the user itself then comes from the cache above.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, redis=None, key_prefix: str = ""):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis = redis
+        self.key_prefix = f"{key_prefix}:users"
+
+        self._entries: OrderedDict[str, tuple[float, UserModel]] = OrderedDict()
+        self._api_keys: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "api_key_hits": 0,
+            "api_key_misses": 0,
+            "invalidations": 0,
+        }
+
+    def _get_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    def _set_local(self, user: UserModel):
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_from_redis(self, user_id: str) -> Optional[UserModel]:
+        try:
+            value = self.redis.get(self._get_key(user_id))
+        except Exception as e:
+            log.debug(f"User cache lookup failed: {e}")
+            return None
+        return UserModel.model_validate_json(value) if value else None
+
+    def get_user_by_id(self, user_id: str) -> Optional[UserModel]:
+        if not self.ttl:
+            return Users.get_user_by_id(user_id)
+
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return user
+            del self._entries[user_id]
+
+        if self.redis is not None:
+            user = self._get_from_redis(user_id)
+            if user is not None:
+                self.stats["redis_hits"] += 1
+                self._set_local(user)
+                return user
+
+        self.stats["misses"] += 1
+        user = Users.get_user_by_id(user_id)
+        if user is None:
+            return None
+
+        self._set_local(user)
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    self._get_key(user.id), user.model_dump_json(), ex=self.ttl
+                )
+            except Exception as e:
+                log.debug(f"User cache store failed: {e}")
+        return user
+
+    def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
+        if not self.ttl:
+            return Users.get_user_by_api_key(api_key)
+
+        api_key_hash = get_api_key_hash(api_key)
+        entry = self._api_keys.get(api_key_hash)
+        if entry is not None:
+            expires_at, user_id = entry
+            if expires_at >= time.monotonic():
+                user = self.get_user_by_id(user_id)
+                if user is not None:
+                    self._api_keys.move_to_end(api_key_hash)
+                    self.stats["api_key_hits"] += 1
+                    return user
+            self._api_keys.pop(api_key_hash, None)
+
+        self.stats["api_key_misses"] += 1
+        user = Users.get_user_by_api_key(api_key)
+        if user is None:
+            return None
+
+        self._set_local(user)
+        self._api_keys[api_key_hash] = (time.monotonic() + self.ttl, user.id)
+        while len(self._api_keys) > self.max_entries:
+            self._api_keys.popitem(last=False)
+        return user
+
+    def clear(self):
+        self._entries.clear()
+        self._api_keys.clear()
+
+    def drop(self, user_id: str):
+        """Forget the user and the API keys resolved to them, in process."""
+        self._entries.pop(user_id, None)
+        for api_key_hash, (_, key_user_id) in list(self._api_keys.items()):
+            if key_user_id == user_id:
+                del self._api_keys[api_key_hash]
+
+    def invalidate(self, user_id: str):
+        self.stats["invalidations"] += 1
+        if self.redis is not None:
+            try:
+                self.redis.delete(self._get_key(user_id))
+            except Exception as e:
+                log.warning(f"Failed to invalidate cached user {user_id}: {e}")
+
+        # Drops the in-process copies here and in the other workers
+        shared_state.invalidate("users", user_id)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "api_keys": len(self._api_keys),
+            "ttl": self.ttl,
+        }
+
+
+if WEBSOCKET_MANAGER == "redis":
+    user_cache = UserCache(
+        USER_CACHE_TTL,
+        USER_CACHE_MAX_ENTRIES,
+        redis=get_redis_connection(
+            redis_url=WEBSOCKET_REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+            ),
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+        ),
+        key_prefix=REDIS_KEY_PREFIX,
+    )
+else:
+    user_cache = UserCache(USER_CACHE_TTL, USER_CACHE_MAX_ENTRIES)
+
+shared_state.register_invalidator("users", user_cache.drop)